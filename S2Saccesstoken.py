@@ -1,38 +1,178 @@
-import requests
 import base64
+import json
 import os
+import threading
+import time
+
+import requests
+
+import http_client
+import metrics
+import tracing
 from credentials import get_credentials
+from file_lock import atomic_write, locked
+from zoom_urls import OAUTH_TOKEN_URL
+
+token_url = OAUTH_TOKEN_URL
+
+# Shared token cache; every process on the host reuses the token stored here
+cache_path = os.getenv(
+    "ZOOM_S2S_TOKEN_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".s2s_token_cache.json"),
+)
+
+# Fetch a new token this many seconds before the cached one expires
+REFRESH_MARGIN = 300
+
+# Shared with access_request's user-OAuth token calls
+TOKEN_REQUESTS = metrics.counter(
+    "zoom_oauth_token_requests_total", "OAuth token endpoint calls by grant type and outcome.",
+    ("grant_type", "outcome"))
+TOKEN_REQUEST_SECONDS = metrics.histogram(
+    "zoom_oauth_token_request_duration_seconds", "OAuth token endpoint latency.", ("grant_type",))
 
-# Set up the API credentials
-client_id = get_credentials("ZOOM_CLIENTID")
-client_secret = get_credentials("ZOOM_CLIENTSECRET")
-account_id = get_credentials("ZOOM_ACCOUNTID")
 
 # Encode the client ID and secret in base64 format
-auth_string = f"{client_id}:{client_secret}"
-auth_bytes = auth_string.encode("ascii")
-base64_bytes = base64.b64encode(auth_bytes)
-base64_string = base64_bytes.decode("ascii")
-
-# Set up the headers for API requests
-headers = {
-    "Content-Type": "application/x-www-form-urlencoded",
-    "Authorization": f"Basic {base64_string}"
-}
-
-# Set up the data for the token API request
-data = {
-    "grant_type": "account_credentials",
-    "account_id": account_id
-}
+def get_basic_auth_header(client_id, client_secret):
+    auth_string = f"{client_id}:{client_secret}"
+    auth_bytes = auth_string.encode("ascii")
+    base64_bytes = base64.b64encode(auth_bytes)
+    base64_string = base64_bytes.decode("ascii")
+    return {
+        "Content-Type": "application/x-www-form-urlencoded",
+        "Authorization": f"Basic {base64_string}"
+    }
+
 
 # Send a POST request to the token API to get an access token
-url = "https://zoom.us/oauth/token"
-response = requests.post(url, data=data, headers=headers)
-
-# Parse the JSON response and extract the access token
-if response.status_code == 200:
-    token = response.json()["access_token"]
-    print(f"Access token: {token}")
-else:
-    print("Error getting access token")
+def request_s2s_token(client_id, client_secret, account_id):
+    data = {
+        "grant_type": "account_credentials",
+        "account_id": account_id
+    }
+    response = None
+    try:
+        with metrics.timed(TOKEN_REQUEST_SECONDS, "account_credentials", counter=TOKEN_REQUESTS), \
+                tracing.span("oauth.token", grant_type="account_credentials"):
+            response = http_client.get_session().post(
+                token_url, data=data, headers=get_basic_auth_header(client_id, client_secret)
+            )
+            response.raise_for_status()
+    except requests.HTTPError as exc:
+        raise requests.HTTPError(
+            f"Failed to get S2S access token: {response.status_code} - {response.text}"
+        ) from exc
+    except requests.RequestException as exc:
+        raise requests.RequestException(f"Network error during S2S token request: {exc}") from exc
+    return response.json()
+
+
+def _read_cache():
+    try:
+        with open(cache_path, encoding="utf-8") as handle:
+            return json.load(handle)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+class S2STokenProvider:
+    """
+    Server-to-Server OAuth tokens shared across threads and processes.
+
+    Tokens are kept in memory and in a JSON cache file guarded by a file
+    lock, so concurrent workers on one host reuse a single token until it
+    nears expiry and only one of them fetches the replacement. Exposes the
+    same access_token()/refresh() interface as token_manager.TokenManager,
+    so request_handler can use either as its auth source.
+    """
+
+    def __init__(self, client_id=None, client_secret=None, account_id=None, margin=REFRESH_MARGIN):
+        self._client_id = client_id
+        self._client_secret = client_secret
+        self._account_id = account_id
+        self._margin = margin
+        self._lock = threading.Lock()
+        self._token = None
+        self._expires_at = 0.0
+        self.refresh_count = 0
+
+    def _credentials(self):
+        # Resolved on first use so importing this module stays cheap
+        if self._client_id is None:
+            self._client_id = get_credentials("ZOOM_CLIENTID")
+            self._client_secret = get_credentials("ZOOM_CLIENTSECRET")
+            self._account_id = get_credentials("ZOOM_ACCOUNTID")
+        return self._client_id, self._client_secret, self._account_id
+
+    @property
+    def cache_key(self):
+        client_id, _, account_id = self._credentials()
+        return f"{account_id}:{client_id}"
+
+    def _fresh(self, expires_at):
+        return time.time() < expires_at - self._margin
+
+    def access_token(self):
+        token = self._token
+        if token and self._fresh(self._expires_at):
+            return token
+        return self.refresh(stale_token=token, force=False)["access_token"]
+
+    def can_refresh(self):
+        return True
+
+    def refresh(self, stale_token=None, force=True):
+        """
+        Return a fresh token, fetching one only if no other thread or process
+        already replaced stale_token. force=False also reuses any cached
+        token that is not close to expiry.
+        """
+        with self._lock:
+            if stale_token is not None and self._token and self._token != stale_token and self._fresh(self._expires_at):
+                return {"access_token": self._token, "expires_at": self._expires_at}
+            with locked(cache_path):
+                entry = _read_cache().get(self.cache_key)
+                if entry and self._fresh(entry["expires_at"]) and (
+                    not force or entry["access_token"] != stale_token
+                ):
+                    self._token, self._expires_at = entry["access_token"], entry["expires_at"]
+                    return entry
+                client_id, client_secret, account_id = self._credentials()
+                tokens = request_s2s_token(client_id, client_secret, account_id)
+                entry = {
+                    "access_token": tokens["access_token"],
+                    "expires_at": time.time() + float(tokens.get("expires_in", 3600)),
+                }
+                cache = _read_cache()
+                cache[self.cache_key] = entry
+                atomic_write(cache_path, json.dumps(cache))
+                self._token, self._expires_at = entry["access_token"], entry["expires_at"]
+                self.refresh_count += 1
+                return entry
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    """Return the shared provider for the ZOOM_CLIENTID/ZOOM_ACCOUNTID app."""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = S2STokenProvider()
+    return _provider
+
+
+def get_s2s_token():
+    """Return a cached or newly issued S2S access token."""
+    return get_provider().access_token()
+
+
+if __name__ == "__main__":
+    try:
+        token = get_s2s_token()
+        print(f"Access token: {token}")
+    except requests.RequestException:
+        print("Error getting access token")
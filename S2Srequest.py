@@ -1,15 +1,18 @@
-import requests
 import os
+import http_client
 from credentials import get_credentials
+from S2Saccesstoken import get_s2s_token
+from zoom_urls import API_BASE_URL
 
 # Enter access token. Can also be used for Video SDK JWT Token
-access_token = get_credentials("ZOOM_ACCESSTOKEN")
+# Without ZOOM_ACCESSTOKEN, the cached S2S token from S2Saccesstoken.py is used
+access_token = get_credentials("ZOOM_ACCESSTOKEN") or get_s2s_token()
 
 # Set up the API endpoint to query (this gets your user info)
-endpoint = "https://api.zoom.us/v2/users/me"
+endpoint = f"{API_BASE_URL}/users/me"
 
 # Get Video SDK settings
-# endpoint = "https://api.zoom.us/v2/accounts/me/settings"
+# endpoint = f"{API_BASE_URL}/accounts/me/settings"
 
 # Set up the headers with the access token
 headers = {
@@ -18,7 +21,7 @@ headers = {
 }
 
 # Send a GET request to the endpoint with the headers
-response = requests.get(endpoint, headers=headers)
+response = http_client.get_session().get(endpoint, headers=headers)
 
 # Check the response status code
 if response.status_code == 200:
@@ -4,19 +4,65 @@
 
 import requests
 import base64
-import os
 import urllib.parse
-from credentials import get_credentials
-from dotenv import set_key
+import http_client
+import metrics
+import tracing
+import token_store
+from credentials import get_all_credentials
+from zoom_urls import OAUTH_AUTHORIZE_URL, OAUTH_TOKEN_URL
 
-# Load environment variables path
-env_path = os.path.join(os.path.dirname(__file__), '.env')
+# Module attributes resolved on first access, not at import
+_CREDENTIAL_NAMES = {
+    'client_id': 'CLIENT_ID',
+    'client_secret': 'CLIENT_SECRET',
+    'redirect_uri': 'REDIRECT_URI',
+}
+# Initial tokens from .env; once tokens are saved, the token store is authoritative
+_TOKEN_NAMES = {
+    'access_token': 'ACCESS_TOKEN',
+    'refresh_token': 'REFRESH_TOKEN',
+}
+_env_tokens = None
 
-client_id = get_credentials('CLIENT_ID')
-client_secret = get_credentials('CLIENT_SECRET')
-redirect_uri = get_credentials('REDIRECT_URI')
-access_token = get_credentials('ACCESS_TOKEN')
-refresh_token = get_credentials('REFRESH_TOKEN')
+TOKEN_REQUESTS = metrics.counter(
+    "zoom_oauth_token_requests_total", "OAuth token endpoint calls by grant type and outcome.",
+    ("grant_type", "outcome"))
+TOKEN_REQUEST_SECONDS = metrics.histogram(
+    "zoom_oauth_token_request_duration_seconds", "OAuth token endpoint latency.", ("grant_type",))
+
+
+def load_credentials():
+    """Resolve all OAuth credentials with a single 1Password call."""
+    global _env_tokens
+    values = get_all_credentials(list(_CREDENTIAL_NAMES.values()) + list(_TOKEN_NAMES.values()))
+    for attr, name in _CREDENTIAL_NAMES.items():
+        # Keep values already assigned by callers
+        globals().setdefault(attr, values[name])
+    if _env_tokens is None:
+        _env_tokens = {attr: values[name] for attr, name in _TOKEN_NAMES.items()}
+
+
+def env_tokens():
+    """ACCESS_TOKEN and REFRESH_TOKEN as configured in .env or 1Password."""
+    if _env_tokens is None:
+        load_credentials()
+    return dict(_env_tokens)
+
+
+def current_tokens():
+    """The latest tokens saved by any process, falling back to the configured ones."""
+    return token_store.get_store().load() or env_tokens()
+
+
+def __getattr__(name):
+    if name in _CREDENTIAL_NAMES:
+        load_credentials()
+        return globals()[name]
+    if name in _TOKEN_NAMES:
+        # Read on every access, so tokens refreshed elsewhere are never stale here
+        return current_tokens()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # --- Utility: Encode client credentials ---
@@ -32,7 +78,7 @@ def get_basic_auth_header(client_id, client_secret):
 
 # -- Step 1: Generate Authorization URL ---
 def generate_authorization_url(client_id, redirect_uri, scope="user:read"):
-    authorization_endpoint = "https://zoom.us/oauth/authorize"
+    authorization_endpoint = OAUTH_AUTHORIZE_URL
     params = {
         "response_type": "code",
         "client_id": client_id,
@@ -45,7 +91,7 @@ def generate_authorization_url(client_id, redirect_uri, scope="user:read"):
 
 # -- Step 2: Exchange Authorization Code for Tokens ---
 def exchange_code_for_tokens(client_id, client_secret, redirect_uri, authorization_code):
-    token_endpoint = "https://zoom.us/oauth/token"
+    token_endpoint = OAUTH_TOKEN_URL
     headers = get_basic_auth_header(client_id, client_secret)
     data = {
         "grant_type": "authorization_code",
@@ -54,8 +100,10 @@ def exchange_code_for_tokens(client_id, client_secret, redirect_uri, authorizati
     }
     response = None
     try:
-        response = requests.post(token_endpoint, headers=headers, data=data)
-        response.raise_for_status()
+        with metrics.timed(TOKEN_REQUEST_SECONDS, "authorization_code", counter=TOKEN_REQUESTS), \
+                tracing.span("oauth.token", grant_type="authorization_code"):
+            response = http_client.get_session().post(token_endpoint, headers=headers, data=data)
+            response.raise_for_status()
     except requests.HTTPError as exc:
         error_message = (
             f"Failed to exchange authorization code: {response.status_code} - {response.text}"
@@ -66,18 +114,13 @@ def exchange_code_for_tokens(client_id, client_secret, redirect_uri, authorizati
     except requests.RequestException as exc:
         raise requests.RequestException(f"Network error during token exchange: {exc}") from exc
     print("Authorization code exchanged successfully.")
-    tokens = response.json()
-    
-    # Save tokens to .env file
-    set_key(env_path, "ACCESS_TOKEN", tokens["access_token"])
-    set_key(env_path, "REFRESH_TOKEN", tokens["refresh_token"])
-    
-    return tokens
+    # Saved to the token store by TokenManager.set_tokens()
+    return response.json()
 
 
 # -- Step 3: Refresh Access Token ---
 def refresh_access_token(client_id, client_secret, refresh_token):
-    token_endpoint = "https://zoom.us/oauth/token"
+    token_endpoint = OAUTH_TOKEN_URL
     headers = get_basic_auth_header(client_id, client_secret)
     data = {
         "grant_type": "refresh_token",
@@ -85,8 +128,10 @@ def refresh_access_token(client_id, client_secret, refresh_token):
     }
     response = None
     try:
-        response = requests.post(token_endpoint, headers=headers, data=data)
-        response.raise_for_status()
+        with metrics.timed(TOKEN_REQUEST_SECONDS, "refresh_token", counter=TOKEN_REQUESTS), \
+                tracing.span("oauth.token", grant_type="refresh_token"):
+            response = http_client.get_session().post(token_endpoint, headers=headers, data=data)
+            response.raise_for_status()
     except requests.HTTPError as exc:
         error_message = (
             f"Failed to refresh access token: {response.status_code} - {response.text}"
@@ -97,19 +142,18 @@ def refresh_access_token(client_id, client_secret, refresh_token):
     except requests.RequestException as exc:
         raise requests.RequestException(f"Network error during token refresh: {exc}") from exc
     print("Access token refreshed successfully.")
-    tokens = response.json()
-    
-    # Update tokens in .env file
-    set_key(env_path, "ACCESS_TOKEN", tokens["access_token"])
-    set_key(env_path, "REFRESH_TOKEN", tokens["refresh_token"])
-    
-    return tokens
+    # Saved to the token store by TokenManager.refresh()
+    return response.json()
 
 # --- Main workflow ---
 if __name__ == "__main__":
+    import token_manager
     from request_handler import get_user_info
 
-    if not access_token or not refresh_token:
+    load_credentials()
+    tokens = current_tokens()
+
+    if not tokens["access_token"] or not tokens["refresh_token"]:
         print("No access or refresh token found. Please authorize the application first.")
         auth_url = generate_authorization_url(client_id, redirect_uri)
         print("Go to the following URL to authorize the application:")
@@ -117,8 +161,7 @@ if __name__ == "__main__":
 
         authorization_code = input("Enter the authorization code from the URL: ")
         tokens = exchange_code_for_tokens(client_id, client_secret, redirect_uri, authorization_code)
-        access_token = tokens["access_token"]
-        refresh_token = tokens["refresh_token"]
+        token_manager.get_manager().set_tokens(tokens)
 
     user_info = get_user_info()
     print("\nUser data:", user_info)
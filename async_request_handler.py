@@ -0,0 +1,218 @@
+# async_request_handler.py
+# Usage: asyncio counterpart of request_handler, multiplexing calls over HTTP/2
+#
+#   async with AsyncZoomClient() as client:
+#       user = await client.get_user_info()
+#       results = await asyncio.gather(*(client.make_request(method="GET", endpoint=url) for url in urls))
+#
+# Requires the optional dependency: pip install "httpx[http2]"
+
+import asyncio
+import time
+import weakref
+
+import requests
+
+import rate_limiter
+import request_handler
+import tracing
+from rate_limiter import MAX_RETRY_WAIT, MAX_THROTTLE_RETRIES, PRIORITY_BULK, PRIORITY_INTERACTIVE
+from request_handler import DEFAULT_TIMEOUT, USER_INFO_ENDPOINT
+
+try:
+    import httpx
+except ImportError:  # Optional dependency
+    httpx = None
+
+# Few connections are needed: HTTP/2 multiplexes concurrent calls over each one
+DEFAULT_MAX_CONNECTIONS = 4
+# Re-read the token from the (thread-safe, possibly blocking) auth source at most this often
+TOKEN_RECHECK_SECONDS = 30
+
+
+class AsyncZoomClient:
+    """
+    asyncio Zoom API client with the same surface as request_handler:
+    make_request(resource, method=, endpoint=, params=, data=, json=, ...)
+    and get_user_info(). Tokens come from request_handler's auth source and
+    a 401 triggers the same coalesced refresh-and-retry. Requests are paced
+    by the shared rate limiter without blocking the event loop.
+    """
+
+    def __init__(self, http2=True, max_connections=DEFAULT_MAX_CONNECTIONS,
+                 timeout=DEFAULT_TIMEOUT, auth_source=None):
+        if httpx is None:
+            raise ImportError('AsyncZoomClient requires httpx: pip install "httpx[http2]"')
+        try:
+            self._client = httpx.AsyncClient(
+                http2=http2,
+                timeout=timeout,
+                limits=httpx.Limits(max_connections=max_connections,
+                                    max_keepalive_connections=max_connections),
+            )
+        except ImportError as exc:
+            raise ImportError('HTTP/2 support requires h2: pip install "httpx[http2]"') from exc
+        self._auth_source = auth_source
+        self._token = None
+        self._token_checked_at = 0.0
+        self._token_lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    # --- Auth ---
+    def _source(self):
+        return self._auth_source or request_handler.get_auth_source()
+
+    async def _access_token(self):
+        if self._token and time.monotonic() - self._token_checked_at < TOKEN_RECHECK_SECONDS:
+            return self._token
+        async with self._token_lock:
+            if not self._token or time.monotonic() - self._token_checked_at >= TOKEN_RECHECK_SECONDS:
+                # The source may refresh over the network, so keep it off the event loop
+                self._token = await asyncio.to_thread(self._source().access_token)
+                self._token_checked_at = time.monotonic()
+        if not self._token:
+            raise RuntimeError("Missing access token. Authorize the application first.")
+        return self._token
+
+    async def _refresh(self, stale_token):
+        async with self._token_lock:
+            if self._token == stale_token:
+                await asyncio.to_thread(self._source().refresh, stale_token=stale_token)
+                self._token = await asyncio.to_thread(self._source().access_token)
+                self._token_checked_at = time.monotonic()
+
+    # --- Sending ---
+    async def _paced_send(self, method, endpoint, priority, **kwargs):
+        limiter = rate_limiter.get_limiter()
+        attempts = 0
+        while True:
+            category = limiter.classify(method, endpoint)
+            waited = 0.0
+            while (delay := limiter.try_acquire(category, priority)) > 0:
+                await asyncio.sleep(delay)
+                waited += delay
+            if waited:
+                limiter.record_wait(waited)
+            rate_limiter.WAIT_SECONDS.observe(waited, category)
+            route = rate_limiter.route_key(method, endpoint)
+            started = time.perf_counter()
+            # Spans follow the asyncio task through contextvars
+            with tracing.span("http.attempt", route=route) as current:
+                try:
+                    response = await self._client.request(method, endpoint, **kwargs)
+                except Exception:
+                    rate_limiter.RESPONSES.inc(route, "error")
+                    raise
+                current.set(status=response.status_code)
+            rate_limiter.REQUEST_SECONDS.observe(time.perf_counter() - started, route)
+            rate_limiter.RESPONSES.inc(route, str(response.status_code))
+            retry_after = limiter.observe(method, endpoint, response)
+            if retry_after is None or attempts >= MAX_THROTTLE_RETRIES or retry_after > MAX_RETRY_WAIT:
+                return response
+            attempts += 1
+
+    async def _send(self, method, endpoint, *, params, data, json, headers, timeout, priority):
+        token = await self._access_token()
+        request_headers = {"Authorization": f"Bearer {token}", **(headers or {})}
+        kwargs = dict(params=params, data=data, json=json, timeout=timeout)
+        try:
+            response = await self._paced_send(method, endpoint, priority, headers=request_headers, **kwargs)
+        except httpx.HTTPError as exc:
+            raise requests.RequestException(f"Network error during Zoom API request: {exc}") from exc
+
+        if response.status_code == 401:
+            if not self._source().can_refresh():
+                raise requests.HTTPError(f"Unauthorized request: {response.text}", response=response)
+            request_handler.UNAUTHORIZED_REFRESHES.inc()
+            await self._refresh(token)
+            request_headers["Authorization"] = f"Bearer {await self._access_token()}"
+            try:
+                response = await self._paced_send(method, endpoint, priority, headers=request_headers, **kwargs)
+            except httpx.HTTPError as exc:
+                raise requests.RequestException(f"Network error during Zoom API retry: {exc}") from exc
+        return response
+
+    async def make_request(
+        self,
+        resource="user_info",
+        *,
+        method=None,
+        endpoint=None,
+        params=None,
+        data=None,
+        json=None,
+        headers=None,
+        timeout=DEFAULT_TIMEOUT,
+        priority=PRIORITY_BULK,
+    ):
+        if resource == "user_info":
+            method = method or "GET"
+            endpoint = endpoint or USER_INFO_ENDPOINT
+        elif not (method and endpoint):
+            raise ValueError("Custom requests require both method and endpoint.")
+
+        method = method.upper()
+        with tracing.span("zoom.request", method=method, endpoint=endpoint):
+            response = await self._send(method, endpoint, params=params, data=data, json=json,
+                                        headers=headers, timeout=timeout, priority=priority)
+
+            if response.status_code >= 400:
+                raise requests.HTTPError(
+                    f"Zoom API request failed: {response.status_code} - {response.text}",
+                    response=response,
+                )
+
+            with tracing.span("http.decode", mode="json", bytes=len(response.content)):
+                return response.json()
+
+    async def get_user_info(self):
+        return await self.make_request("user_info", priority=PRIORITY_INTERACTIVE)
+
+
+# --- Module-level helpers mirroring request_handler ---
+# event loop -> (client, task closing it when the loop shuts down)
+_clients = weakref.WeakKeyDictionary()
+
+
+def _default_client():
+    # One client per event loop; httpx clients cannot be shared across loops
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(loop)
+    if entry is None:
+        client = AsyncZoomClient()
+        entry = _clients[loop] = (client, loop.create_task(_close_with_loop(loop, client)))
+    return entry[0]
+
+
+async def _close_with_loop(loop, client):
+    # asyncio.run() cancels leftover tasks before closing its loop, which lands here
+    try:
+        await loop.create_future()
+    finally:
+        if _clients.get(loop, (None,))[0] is client:
+            del _clients[loop]
+        await client.aclose()
+
+
+async def make_request(resource="user_info", **kwargs):
+    return await _default_client().make_request(resource, **kwargs)
+
+
+async def get_user_info():
+    return await _default_client().get_user_info()
+
+
+async def aclose():
+    entry = _clients.pop(asyncio.get_running_loop(), None)
+    if entry is not None:
+        client, closer = entry
+        closer.cancel()
+        await client.aclose()
@@ -0,0 +1,312 @@
+# attendance.py
+# Usage: Compact columnar participant reports and one-pass attendance analytics
+#
+#   table = ParticipantTable()
+#   table.extend(meeting["uuid"], participants)   # or from_store() / from_ndjson()
+#   print(summarize(table)["unique_attendees"])
+#
+# numpy is used for the aggregates when installed (pip install numpy);
+# otherwise they are computed in a single pure-Python pass.
+
+import json
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timezone
+
+from metrics import percentile
+
+try:
+    import numpy
+except ImportError:  # Optional dependency
+    numpy = None
+
+# Upper bounds (seconds) of the duration histogram buckets; the last bucket is open-ended
+DURATION_BUCKETS = (60, 300, 900, 1800, 3600, 7200)
+DEFAULT_TIMELINE_BUCKET = 300
+# Zoom timestamps repeat heavily within a meeting; parsed values are memoized up to this many
+_TIME_CACHE_LIMIT = 100000
+
+
+class StringPool:
+    """Interns strings to dense integer ids; id 0 is the empty string."""
+
+    __slots__ = ("ids", "values")
+
+    def __init__(self):
+        self.ids = {"": 0}
+        self.values = [""]
+
+    def intern(self, value):
+        value = value or ""
+        index = self.ids.get(value)
+        if index is None:
+            index = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+    def __len__(self):
+        return len(self.values)
+
+
+class ParticipantTable:
+    """
+    Participant report rows stored column-wise in typed arrays. Strings
+    (meeting UUIDs, names, emails) are interned once, so a row costs a few
+    dozen bytes instead of a dict per participant. Timestamps are epoch
+    seconds (NaN when missing); durations are seconds.
+    """
+
+    def __init__(self):
+        self.meetings = StringPool()
+        self.names = StringPool()
+        self.emails = StringPool()
+        # One attendee per email, falling back to name for guests without one
+        self.attendees = StringPool()
+        self.meeting = array("I")
+        self.name = array("I")
+        self.email = array("I")
+        self.attendee = array("I")
+        self.join = array("d")
+        self.leave = array("d")
+        self.duration = array("d")
+        self._times = {}
+
+    def __len__(self):
+        return len(self.meeting)
+
+    def _epoch(self, value):
+        if not value:
+            return float("nan")
+        parsed = self._times.get(value)
+        if parsed is None:
+            try:
+                moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            except ValueError:
+                return float("nan")
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=timezone.utc)
+            parsed = moment.timestamp()
+            if len(self._times) < _TIME_CACHE_LIMIT:
+                self._times[value] = parsed
+        return parsed
+
+    def append(self, meeting_uuid, record):
+        name = record.get("name") or ""
+        email = (record.get("user_email") or "").lower()
+        join = self._epoch(record.get("join_time"))
+        leave = self._epoch(record.get("leave_time"))
+        duration = record.get("duration")
+        if duration is None:
+            duration = leave - join if leave == leave and join == join else 0.0
+        self.meeting.append(self.meetings.intern(meeting_uuid))
+        self.name.append(self.names.intern(name))
+        self.email.append(self.emails.intern(email))
+        self.attendee.append(self.attendees.intern(f"email:{email}" if email else f"name:{name}"))
+        self.join.append(join)
+        self.leave.append(leave)
+        self.duration.append(float(duration))
+
+    def extend(self, meeting_uuid, records):
+        for record in records:
+            self.append(meeting_uuid, record)
+
+    @classmethod
+    def from_store(cls, store, user_id="me"):
+        """Load every stored participant report of a sync_store.SyncStore."""
+        table = cls()
+        for meeting in store.meetings(user_id):
+            meeting_uuid = meeting.get("uuid") or str(meeting["id"])
+            table.extend(meeting_uuid, store.participants(meeting_uuid) or ())
+        return table
+
+    @classmethod
+    def from_ndjson(cls, paths):
+        """Load participants/<window>.ndjson files written by export.py."""
+        table = cls()
+        for path in [paths] if isinstance(paths, str) else paths:
+            with open(path, encoding="utf-8") as handle:
+                for line in handle:
+                    record = json.loads(line)
+                    table.append(record["meeting_uuid"], record)
+        return table
+
+    def names_for(self, meeting_uuid):
+        """Participant names of one meeting, in report order."""
+        index = self.meetings.ids.get(meeting_uuid)
+        if index is None:
+            return []
+        values = self.names.values
+        return [values[name] for meeting, name in zip(self.meeting, self.name) if meeting == index]
+
+    def nbytes(self):
+        """Approximate memory held by the column arrays."""
+        columns = (self.meeting, self.name, self.email, self.attendee, self.join, self.leave, self.duration)
+        return sum(column.itemsize * len(column) for column in columns)
+
+
+def _iso(epoch):
+    if epoch is None or epoch != epoch:
+        return None
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def summarize(table):
+    """
+    Attendance totals, duration distribution and per-meeting rollups:
+    {"rows", "meetings", "unique_attendees", "duration": {...},
+     "per_meeting": {uuid: {"rows", "unique_attendees", "total_duration",
+                            "mean_duration", "first_join", "last_leave"}}}
+    """
+    if numpy is not None and len(table):
+        return _summarize_numpy(table)
+    return _summarize_python(table)
+
+
+def _result(table, unique, durations_sorted, total, histogram, meeting_rows, meeting_unique,
+            meeting_duration, first_join, last_leave):
+    per_meeting = {}
+    for index, uuid in enumerate(table.meetings.values):
+        rows = int(meeting_rows[index]) if index < len(meeting_rows) else 0
+        if not rows:
+            continue
+        per_meeting[uuid] = {
+            "rows": rows,
+            "unique_attendees": int(meeting_unique[index]),
+            "total_duration": float(meeting_duration[index]),
+            "mean_duration": round(float(meeting_duration[index]) / rows, 1),
+            "first_join": _iso(first_join[index]),
+            "last_leave": _iso(last_leave[index]),
+        }
+    count = len(table)
+    return {
+        "rows": count,
+        "meetings": len(per_meeting),
+        "unique_attendees": int(unique),
+        "duration": {
+            "total": float(total),
+            "mean": round(float(total) / count, 1) if count else 0.0,
+            "p50": float(percentile(durations_sorted, 0.50)),
+            "p90": float(percentile(durations_sorted, 0.90)),
+            "p99": float(percentile(durations_sorted, 0.99)),
+            "max": float(durations_sorted[-1]) if count else 0.0,
+            "histogram": [
+                {"le": bound, "count": int(histogram[position])}
+                for position, bound in enumerate(list(DURATION_BUCKETS) + [None])
+            ],
+        },
+        "per_meeting": per_meeting,
+    }
+
+
+def _summarize_python(table):
+    meeting_count = len(table.meetings)
+    meeting_rows = [0] * meeting_count
+    meeting_unique = [0] * meeting_count
+    meeting_duration = [0.0] * meeting_count
+    first_join = [None] * meeting_count
+    last_leave = [None] * meeting_count
+    histogram = [0] * (len(DURATION_BUCKETS) + 1)
+    seen = set()
+    seen_in_meeting = set()
+    total = 0.0
+    width = len(table.attendees)
+    # Single pass over the columns
+    for meeting, attendee, join, leave, duration in zip(
+            table.meeting, table.attendee, table.join, table.leave, table.duration):
+        meeting_rows[meeting] += 1
+        meeting_duration[meeting] += duration
+        total += duration
+        histogram[bisect_left(DURATION_BUCKETS, duration)] += 1
+        seen.add(attendee)
+        key = meeting * width + attendee
+        if key not in seen_in_meeting:
+            seen_in_meeting.add(key)
+            meeting_unique[meeting] += 1
+        if join == join and (first_join[meeting] is None or join < first_join[meeting]):
+            first_join[meeting] = join
+        if leave == leave and (last_leave[meeting] is None or leave > last_leave[meeting]):
+            last_leave[meeting] = leave
+    durations_sorted = sorted(table.duration)
+    return _result(table, len(seen), durations_sorted, total, histogram, meeting_rows, meeting_unique,
+                   meeting_duration, first_join, last_leave)
+
+
+def _summarize_numpy(table):
+    meeting_count = len(table.meetings)
+    meeting = numpy.frombuffer(table.meeting, dtype=numpy.uint32)
+    attendee = numpy.frombuffer(table.attendee, dtype=numpy.uint32)
+    join = numpy.frombuffer(table.join, dtype=numpy.float64)
+    leave = numpy.frombuffer(table.leave, dtype=numpy.float64)
+    duration = numpy.frombuffer(table.duration, dtype=numpy.float64)
+
+    meeting_rows = numpy.bincount(meeting, minlength=meeting_count)
+    meeting_duration = numpy.bincount(meeting, weights=duration, minlength=meeting_count)
+    pairs = numpy.unique(meeting.astype(numpy.uint64) << numpy.uint64(32) | attendee.astype(numpy.uint64))
+    meeting_unique = numpy.bincount((pairs >> numpy.uint64(32)).astype(numpy.int64), minlength=meeting_count)
+    first_join = numpy.full(meeting_count, numpy.inf)
+    numpy.fmin.at(first_join, meeting, join)
+    last_leave = numpy.full(meeting_count, -numpy.inf)
+    numpy.fmax.at(last_leave, meeting, leave)
+    first_join[numpy.isinf(first_join)] = numpy.nan
+    last_leave[numpy.isinf(last_leave)] = numpy.nan
+    histogram = numpy.bincount(numpy.searchsorted(DURATION_BUCKETS, duration, side="left"),
+                               minlength=len(DURATION_BUCKETS) + 1)
+    return _result(table, len(numpy.unique(attendee)), numpy.sort(duration), duration.sum(), histogram,
+                   meeting_rows, meeting_unique, meeting_duration,
+                   first_join.tolist(), last_leave.tolist())
+
+
+def timeline(table, bucket_seconds=DEFAULT_TIMELINE_BUCKET, meeting_uuid=None):
+    """
+    Concurrent attendance over time as [(bucket_start_iso, attendees), ...]:
+    joins and leaves are counted per bucket and accumulated, so the cost is
+    one pass over the rows plus one over the buckets.
+    """
+    index = None
+    if meeting_uuid is not None:
+        index = table.meetings.ids.get(meeting_uuid)
+        if index is None:
+            return []
+    if numpy is not None and len(table):
+        return _timeline_numpy(table, bucket_seconds, index)
+    rows = [(join, leave) for meeting, join, leave in zip(table.meeting, table.join, table.leave)
+            if (index is None or meeting == index) and join == join]
+    if not rows:
+        return []
+    start = min(join for join, _ in rows)
+    start -= start % bucket_seconds
+    end = max((leave if leave == leave else join) for join, leave in rows)
+    buckets = int((end - start) // bucket_seconds) + 1
+    delta = [0] * (buckets + 1)
+    for join, leave in rows:
+        delta[int((join - start) // bucket_seconds)] += 1
+        if leave == leave:
+            # Present through the bucket in which they left
+            delta[int((leave - start) // bucket_seconds) + 1] -= 1
+    points = []
+    current = 0
+    for bucket in range(buckets):
+        current += delta[bucket]
+        points.append((_iso(start + bucket * bucket_seconds), current))
+    return points
+
+
+def _timeline_numpy(table, bucket_seconds, index):
+    join = numpy.frombuffer(table.join, dtype=numpy.float64)
+    leave = numpy.frombuffer(table.leave, dtype=numpy.float64)
+    mask = ~numpy.isnan(join)
+    if index is not None:
+        mask &= numpy.frombuffer(table.meeting, dtype=numpy.uint32) == index
+    join, leave = join[mask], leave[mask]
+    if not len(join):
+        return []
+    start = join.min()
+    start -= start % bucket_seconds
+    # Attendees without a leave time are still present at the end
+    left_mask = ~numpy.isnan(leave)
+    buckets = int((numpy.fmax(leave, join).max() - start) // bucket_seconds) + 1
+    joined = numpy.bincount(((join - start) // bucket_seconds).astype(numpy.int64), minlength=buckets + 1)
+    left = numpy.bincount(((leave[left_mask] - start) // bucket_seconds).astype(numpy.int64) + 1,
+                          minlength=buckets + 1)
+    current = numpy.cumsum(joined[:buckets] - left[:buckets])
+    return [(_iso(start + bucket * bucket_seconds), int(value)) for bucket, value in enumerate(current)]
@@ -0,0 +1,385 @@
+# benchmarks/mock_zoom_server.py
+# Usage: Local stand-in for the Zoom OAuth and REST endpoints used by this repo
+#
+#   python benchmarks/mock_zoom_server.py --port 8080 --latency 0.02 --throttle-ratio 0.05
+#   export ZOOM_API_BASE_URL=http://127.0.0.1:8080/v2 ZOOM_OAUTH_BASE_URL=http://127.0.0.1:8080/oauth
+#   ZOOM_ACCESSTOKEN=mock-access-token python zoom_dash.py
+#
+# Implements /oauth/token, /v2/users/me, /v2/users/me/meetings,
+# /v2/report/users/{id}/meetings, /v2/report/meetings/{id}/participants and
+# /v2/accounts/{id}/settings with
+# next_page_token paging, artificial latency, slow outliers, expiring tokens
+# (401), injected 429 and 503 responses. GET /__stats returns the server's counters.
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Accepted without expiry, e.g. as ZOOM_ACCESSTOKEN for zoom_dash.py
+STATIC_ACCESS_TOKEN = "mock-access-token"
+# Accepted once by the refresh_token grant, like a freshly authorized app
+SEED_REFRESH_TOKEN = "mock-refresh-token"
+
+DEFAULT_MEETINGS = 20
+DEFAULT_PARTICIPANTS = 250
+MAX_PAGE_SIZE = 300
+# Fixture meetings start every MEETING_SPACING from FIRST_MEETING
+FIRST_MEETING = datetime(2026, 1, 1, 10, 0, tzinfo=timezone.utc)
+MEETING_SPACING = timedelta(hours=6)
+
+# X-RateLimit-Category Zoom documents for each route
+RATE_LIMIT_CATEGORIES = {
+    "users_me": "Light",
+    "meetings": "Medium",
+    "report_meetings": "Heavy",
+    "participants": "Heavy",
+    "settings": "Medium",
+}
+
+_ROUTES = [
+    ("users_me", re.compile(r"^/v2/users/me$")),
+    ("meetings", re.compile(r"^/v2/users/me/meetings$")),
+    ("report_meetings", re.compile(r"^/v2/report/users/(?P<id>[^/]+)/meetings$")),
+    ("participants", re.compile(r"^/v2/report/meetings/(?P<id>[^/]+)/participants$")),
+    ("settings", re.compile(r"^/v2/accounts/(?P<id>[^/]+)/settings$")),
+]
+
+
+class MockZoomState:
+    """Tokens, fixtures, fault injection settings and counters shared by all handler threads."""
+
+    def __init__(self, latency=0.0, jitter=0.0, token_ttl=3600, throttle_ratio=0.0,
+                 retry_after=1, meetings=DEFAULT_MEETINGS, participants=DEFAULT_PARTICIPANTS, seed=0,
+                 error_ratio=0.0, slow_ratio=0.0, slow_latency=1.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.token_ttl = token_ttl
+        self.throttle_ratio = throttle_ratio
+        self.error_ratio = error_ratio
+        self.slow_ratio = slow_ratio
+        self.slow_latency = slow_latency
+        self.retry_after = retry_after
+        self.meeting_count = meetings
+        self.participant_count = participants
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._access_tokens = {STATIC_ACCESS_TOKEN: float("inf")}
+        self._refresh_tokens = {SEED_REFRESH_TOKEN}
+        self._settings = {}
+        self.counters = {"requests": 0, "token_grants": 0, "unauthorized": 0, "throttled": 0, "failed": 0}
+        self.routes = {}
+
+    # --- Fault injection ---
+    def _chance(self, ratio):
+        if ratio <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < ratio
+
+    def delay(self):
+        extra = self.slow_latency if self._chance(self.slow_ratio) else 0.0
+        if self.jitter:
+            with self._lock:
+                extra += self._random.uniform(0, self.jitter)
+        if self.latency or extra:
+            time.sleep(self.latency + extra)
+
+    def should_throttle(self):
+        return self._chance(self.throttle_ratio)
+
+    def should_fail(self):
+        return self._chance(self.error_ratio)
+
+    def count(self, key, route=None):
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+            if route:
+                self.routes[route] = self.routes.get(route, 0) + 1
+
+    # --- Tokens ---
+    def issue_tokens(self, grant_type, refresh_token=None):
+        with self._lock:
+            if grant_type == "refresh_token":
+                # Zoom rotates refresh tokens: each one can be used only once
+                if refresh_token not in self._refresh_tokens:
+                    return None
+                self._refresh_tokens.discard(refresh_token)
+            access_token = "mock-" + secrets.token_urlsafe(16)
+            self._access_tokens[access_token] = time.time() + self.token_ttl
+            tokens = {"access_token": access_token, "token_type": "bearer", "expires_in": self.token_ttl}
+            if grant_type != "account_credentials":
+                new_refresh = "mock-refresh-" + secrets.token_urlsafe(16)
+                self._refresh_tokens.add(new_refresh)
+                tokens["refresh_token"] = new_refresh
+            self.counters["token_grants"] += 1
+            return tokens
+
+    def token_valid(self, token):
+        with self._lock:
+            return self._access_tokens.get(token, 0) > time.time()
+
+    # --- Fixtures ---
+    def meetings(self):
+        meetings = []
+        for number in range(self.meeting_count):
+            start = FIRST_MEETING + number * MEETING_SPACING
+            meetings.append({
+                "id": 90000000000 + number, "uuid": f"mock-meeting-{number}", "topic": f"Meeting {number}",
+                "type": 2, "start_time": start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "end_time": (start + timedelta(minutes=30)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "duration": 30, "participants_count": self.participant_count,
+            })
+        return meetings
+
+    def meetings_between(self, start_date, end_date):
+        """Meetings whose start date lies within [start_date, end_date] (YYYY-MM-DD, inclusive)."""
+        return [meeting for meeting in self.meetings()
+                if (not start_date or meeting["start_time"][:10] >= start_date)
+                and (not end_date or meeting["start_time"][:10] <= end_date)]
+
+    def participants(self, meeting_id):
+        return [{"id": f"{meeting_id}-{number}", "name": f"Participant {number}",
+                 "user_email": f"participant{number}@example.com",
+                 "join_time": "2026-01-01T10:00:00Z", "leave_time": "2026-01-01T10:30:00Z",
+                 "duration": 1800}
+                for number in range(self.participant_count)]
+
+    def settings(self, account_id):
+        with self._lock:
+            return self._settings.setdefault(account_id, {
+                "schedule_meeting": {"host_video": False, "participants_video": False},
+                "in_meeting": {"chat": True, "waiting_room": True},
+                "recording": {"cloud_recording": True},
+            })
+
+    def update_settings(self, account_id, patch):
+        current = self.settings(account_id)
+        with self._lock:
+            for group, values in patch.items():
+                if isinstance(values, dict):
+                    current.setdefault(group, {}).update(values)
+                else:
+                    current[group] = values
+
+    def stats(self):
+        with self._lock:
+            return {**self.counters, "routes": dict(self.routes)}
+
+
+def _page(records, query, records_key):
+    """Slice records by page_size/next_page_token the way Zoom's list endpoints do."""
+    try:
+        page_size = min(max(int(query.get("page_size", ["30"])[0]), 1), MAX_PAGE_SIZE)
+        start = int(query.get("next_page_token", ["0"])[0] or 0)
+    except ValueError:
+        page_size, start = 30, 0
+    end = start + page_size
+    return {
+        "page_size": page_size,
+        "total_records": len(records),
+        "next_page_token": str(end) if end < len(records) else "",
+        records_key: records[start:end],
+    }
+
+
+class MockZoomHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so pooled client connections are reused as they are against Zoom
+    protocol_version = "HTTP/1.1"
+    server_version = "MockZoom/1.0"
+    # Headers and body go out in separate writes; with Nagle on, the body waits for
+    # the client's delayed ACK of the headers (~40 ms per keep-alive call)
+    disable_nagle_algorithm = True
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload=None, headers=None):
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.send_response(status)
+        if payload is not None:
+            self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PATCH(self):
+        self._dispatch("PATCH")
+
+    def _dispatch(self, method):
+        url = urlsplit(self.path)
+        body = self._read_body()
+        state = self.state
+        state.count("requests")
+
+        if url.path == "/__stats" and method == "GET":
+            return self._send_json(200, state.stats())
+        if url.path == "/oauth/token" and method == "POST":
+            return self._token(parse_qs(body.decode("utf-8")))
+
+        for route, pattern in _ROUTES:
+            match = pattern.match(url.path)
+            if match:
+                break
+        else:
+            return self._send_json(404, {"code": 404, "message": "Not found."})
+
+        state.delay()
+        rate_headers = {"X-RateLimit-Category": RATE_LIMIT_CATEGORIES[route]}
+        token = (self.headers.get("Authorization") or "").removeprefix("Bearer ").strip()
+        if not state.token_valid(token):
+            state.count("unauthorized", route)
+            return self._send_json(401, {"code": 124, "message": "Invalid access token."}, rate_headers)
+        if state.should_throttle():
+            state.count("throttled", route)
+            return self._send_json(429, {"code": 429, "message": "Too many requests."},
+                                   {**rate_headers, "X-RateLimit-Type": "QPS",
+                                    "Retry-After": str(state.retry_after)})
+        if state.should_fail():
+            state.count("failed", route)
+            return self._send_json(503, {"code": 503, "message": "Service unavailable."}, rate_headers)
+        state.count("served", route)
+
+        query = parse_qs(url.query)
+        if route == "users_me" and method == "GET":
+            return self._send_json(200, {"id": "mock-user", "email": "mock.user@example.com",
+                                         "first_name": "Mock", "last_name": "User",
+                                         "account_id": "mock-account", "type": 2}, rate_headers)
+        if route == "meetings" and method == "GET":
+            return self._send_json(200, _page(state.meetings(), query, "meetings"), rate_headers)
+        if route == "report_meetings" and method == "GET":
+            meetings = state.meetings_between(query.get("from", [""])[0], query.get("to", [""])[0])
+            return self._send_json(200, _page(meetings, query, "meetings"), rate_headers)
+        if route == "participants" and method == "GET":
+            return self._send_json(200, _page(state.participants(match["id"]), query, "participants"),
+                                   rate_headers)
+        if route == "settings":
+            return self._settings(method, match["id"], body, rate_headers)
+        return self._send_json(405, {"code": 405, "message": "Method not allowed."}, rate_headers)
+
+    def _token(self, form):
+        grant_type = (form.get("grant_type") or [""])[0]
+        if grant_type not in ("refresh_token", "account_credentials", "authorization_code"):
+            return self._send_json(400, {"reason": "unsupported_grant_type", "error": "invalid_request"})
+        if not (self.headers.get("Authorization") or "").startswith("Basic "):
+            return self._send_json(401, {"reason": "Invalid client_id or client_secret", "error": "invalid_client"})
+        self.state.delay()
+        tokens = self.state.issue_tokens(grant_type, (form.get("refresh_token") or [None])[0])
+        if tokens is None:
+            return self._send_json(400, {"reason": "Invalid Token!", "error": "invalid_grant"})
+        return self._send_json(200, tokens)
+
+    def _settings(self, method, account_id, body, rate_headers):
+        if method == "PATCH":
+            try:
+                self.state.update_settings(account_id, json.loads(body or b"{}"))
+            except ValueError:
+                return self._send_json(400, {"code": 300, "message": "Invalid request body."}, rate_headers)
+            return self._send_json(204, None, rate_headers)
+        if method != "GET":
+            return self._send_json(405, {"code": 405, "message": "Method not allowed."}, rate_headers)
+        settings = self.state.settings(account_id)
+        option = parse_qs(urlsplit(self.path).query).get("option", [None])[0]
+        payload = settings.get(option, {}) if option else settings
+        etag = '"' + hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()[:32] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send_json(304, None, {**rate_headers, "ETag": etag})
+        return self._send_json(200, payload, {**rate_headers, "ETag": etag})
+
+
+class MockZoomServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address, state):
+        super().__init__(address, MockZoomHandler)
+        self.state = state
+
+    def handle_error(self, request, client_address):
+        # Clients that disconnect mid-response (killed exports, timeouts) are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_base_url(self):
+        return f"{self.base_url}/v2"
+
+    @property
+    def oauth_base_url(self):
+        return f"{self.base_url}/oauth"
+
+
+def start(host="127.0.0.1", port=0, **options):
+    """Serve a MockZoomState(**options) on a background thread; return the server."""
+    server = MockZoomServer((host, port), MockZoomState(**options))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the Zoom API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every API call.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds.")
+    parser.add_argument("--token-ttl", type=float, default=3600, help="Lifetime of issued access tokens.")
+    parser.add_argument("--throttle-ratio", type=float, default=0.0, help="Share of API calls answered with 429.")
+    parser.add_argument("--retry-after", type=float, default=1, help="Retry-After seconds sent with 429s.")
+    parser.add_argument("--error-ratio", type=float, default=0.0, help="Share of API calls answered with 503.")
+    parser.add_argument("--slow-ratio", type=float, default=0.0, help="Share of calls delayed by --slow-latency.")
+    parser.add_argument("--slow-latency", type=float, default=1.0)
+    parser.add_argument("--meetings", type=int, default=DEFAULT_MEETINGS)
+    parser.add_argument("--participants", type=int, default=DEFAULT_PARTICIPANTS, help="Participants per meeting.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = MockZoomServer((args.host, args.port), MockZoomState(
+        latency=args.latency, jitter=args.jitter, token_ttl=args.token_ttl,
+        throttle_ratio=args.throttle_ratio, retry_after=args.retry_after,
+        error_ratio=args.error_ratio, slow_ratio=args.slow_ratio, slow_latency=args.slow_latency,
+        meetings=args.meetings, participants=args.participants, seed=args.seed,
+    ))
+    print(f"Mock Zoom API listening on {server.base_url}")
+    print(f"  export ZOOM_API_BASE_URL={server.api_base_url}")
+    print(f"  export ZOOM_OAUTH_BASE_URL={server.oauth_base_url}")
+    print(f"  static access token: {STATIC_ACCESS_TOKEN}; seed refresh token: {SEED_REFRESH_TOKEN}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+# benchmarks/request_handler_bench.py
+# Usage: Offline throughput benchmark of request_handler against the mock Zoom API
+#
+#   python benchmarks/request_handler_bench.py                       # all scenarios
+#   python benchmarks/request_handler_bench.py --latency 0.02 --concurrency 32
+#   python benchmarks/request_handler_bench.py --scenario refresh --token-ttl 0.5
+#   python benchmarks/request_handler_bench.py --save client.json    # record a baseline
+#   python benchmarks/request_handler_bench.py --compare client.json # fail on regressions
+#
+# Scenarios, all through make_request()/iter_records() with a user-OAuth TokenManager:
+#   user_info     GET /users/me at --concurrency
+#   participants  iter_records() over every meeting's participant report
+#   refresh       user_info with access tokens expiring every --token-ttl seconds
+#   throttled     user_info with --throttle-ratio of calls answered with 429
+#   flaky         user_info with --error-ratio 503s and --slow-ratio slow responses,
+#                 exercising retries and (with --hedge-after) hedged GETs
+#
+# --decode fast, --stream and --fields NAME,... select the low-allocation decoding paths.
+# --no-coalesce makes user_info send every concurrent identical GET instead of sharing one call.
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import mock_zoom_server
+from webhook_load import percentile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+SCENARIOS = ["user_info", "participants", "refresh", "throttled", "flaky"]
+# Scenarios run with GET coalescing; the others measure one HTTP call per request
+COALESCED_SCENARIOS = {"user_info"}
+BENCH_CLIENT_ID = "benchmark-client"
+BENCH_CLIENT_SECRET = "benchmark-secret"
+
+
+def _configure_client(server, paced):
+    # zoom_urls reads these at import, so they must be set before any repo import
+    os.environ["ZOOM_API_BASE_URL"] = server.api_base_url
+    os.environ["ZOOM_OAUTH_BASE_URL"] = server.oauth_base_url
+    import rate_limiter
+    import token_store
+
+    # Keep benchmark tokens out of the real token store
+    bench_dir = tempfile.mkdtemp(prefix="zoom-bench-")
+    token_store.set_store(token_store.open_store(os.path.join(bench_dir, "tokens.json")))
+    if not paced:
+        # Measure the client, not Zoom's published ceilings
+        rate_limiter.configure({category: 1e6 for category in rate_limiter.DEFAULT_LIMITS})
+
+
+def _authorize():
+    """Authorize against the mock with its seed refresh token and install the manager."""
+    import access_request
+    import request_handler
+    import token_manager
+
+    # margin=0 and no background timer: tokens are used until they expire, so
+    # the refresh scenario exercises both the proactive and the 401 paths
+    manager = token_manager.TokenManager(
+        lambda refresh_token: access_request.refresh_access_token(
+            BENCH_CLIENT_ID, BENCH_CLIENT_SECRET, refresh_token),
+        refresh_token=mock_zoom_server.SEED_REFRESH_TOKEN,
+        margin=0,
+        background=False,
+    )
+    _reauthorize(manager)
+    request_handler.set_auth_source(manager)
+    return manager
+
+
+def _reauthorize(manager):
+    # Pick up a token issued with the server's current token_ttl
+    with contextlib.redirect_stdout(io.StringIO()):
+        manager.refresh()
+
+
+def _drive(call, total, concurrency):
+    """Run call(index) `total` times from `concurrency` threads; return latencies, errors, elapsed."""
+    counter = itertools.count()
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        own_latencies = []
+        own_errors = []
+        while (index := next(counter)) < total:
+            started = time.perf_counter()
+            try:
+                call(index)
+            except Exception as exc:
+                own_errors.append(type(exc).__name__)
+            own_latencies.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(own_latencies)
+            errors.extend(own_errors)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    # Token refreshes print a line each; keep them out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return latencies, errors, time.perf_counter() - started
+
+
+def _summarize(latencies, errors, elapsed):
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": len(errors),
+        "error_types": sorted(set(errors)),
+        "throughput_rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+    }
+
+
+def _server_delta(server, before):
+    after = server.state.stats()
+    return {key: after[key] - before.get(key, 0)
+            for key in ("requests", "token_grants", "unauthorized", "throttled", "failed")}
+
+
+def _coalesced():
+    import request_handler
+
+    stats = request_handler.get_coalescing_stats()
+    return stats["coalesced"] if stats else 0
+
+
+def run_user_info(server, manager, args):
+    import request_handler
+
+    before = server.state.stats()
+    coalesced = _coalesced()
+    result = _summarize(*_drive(lambda _: request_handler.get_user_info(), args.requests, args.concurrency))
+    result["server"] = _server_delta(server, before)
+    result["coalesced"] = _coalesced() - coalesced
+    return result
+
+
+def run_participants(server, manager, args):
+    import request_handler
+
+    meeting_ids = [meeting["id"] for meeting in server.state.meetings()]
+    records = []
+
+    def export(index):
+        endpoint = f"{request_handler.API_BASE_URL}/report/meetings/{meeting_ids[index]}/participants"
+        records.append(sum(1 for _ in request_handler.iter_records(
+            endpoint, "participants", page_size=args.page_size, prefetch=args.prefetch,
+            fields=args.fields, stream=args.stream)))
+
+    before = server.state.stats()
+    latencies, errors, elapsed = _drive(export, len(meeting_ids), args.concurrency)
+    # Latencies here are per meeting report (all of its pages)
+    result = _summarize(latencies, errors, elapsed)
+    result["records"] = sum(records)
+    result["records_per_second"] = round(sum(records) / elapsed, 1) if elapsed else 0.0
+    result["server"] = _server_delta(server, before)
+    return result
+
+
+def run_refresh(server, manager, args):
+    import request_handler
+
+    token_ttl = server.state.token_ttl
+    server.state.token_ttl = args.token_ttl
+    try:
+        _reauthorize(manager)
+        refreshes, refresh_seconds = manager.refresh_count, manager.refresh_seconds
+        before = server.state.stats()
+        result = _summarize(*_drive(lambda _: request_handler.get_user_info(), args.requests, args.concurrency))
+    finally:
+        server.state.token_ttl = token_ttl
+        _reauthorize(manager)
+    result["server"] = _server_delta(server, before)
+    refreshes = manager.refresh_count - refreshes
+    refresh_seconds = manager.refresh_seconds - refresh_seconds
+    result["refreshes"] = refreshes
+    result["refresh_ms_mean"] = round(refresh_seconds / refreshes * 1000, 3) if refreshes else 0.0
+    return result
+
+
+def run_throttled(server, manager, args):
+    import rate_limiter
+    import request_handler
+
+    server.state.throttle_ratio = args.throttle_ratio
+    server.state.retry_after = args.retry_after
+    try:
+        before = server.state.stats()
+        result = _summarize(*_drive(lambda _: request_handler.get_user_info(), args.requests, args.concurrency))
+    finally:
+        server.state.throttle_ratio = 0.0
+    result["server"] = _server_delta(server, before)
+    result["limiter"] = rate_limiter.get_limiter().stats()
+    return result
+
+
+def run_flaky(server, manager, args):
+    import request_handler
+
+    state = server.state
+    state.error_ratio, state.slow_ratio, state.slow_latency = args.error_ratio, args.slow_ratio, args.slow_latency
+    # Short backoff keeps the scenario about the client, not the sleep
+    request_handler.configure_retries(base_delay=0.01, max_delay=0.1, failure_threshold=10 ** 6,
+                                      hedge_after=args.hedge_after)
+    try:
+        before = state.stats()
+        result = _summarize(*_drive(lambda _: request_handler.get_user_info(), args.requests, args.concurrency))
+        result["retry"] = {key: value for key, value in request_handler.get_retry_stats().items()
+                           if key != "open_circuits"}
+    finally:
+        state.error_ratio = state.slow_ratio = 0.0
+        request_handler.configure_retries()
+    result["server"] = _server_delta(server, before)
+    return result
+
+
+RUNNERS = {
+    "user_info": run_user_info,
+    "participants": run_participants,
+    "refresh": run_refresh,
+    "throttled": run_throttled,
+    "flaky": run_flaky,
+}
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        for key in ("p50_ms", "p99_ms"):
+            if result[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{name}.{key}: {base[key]} -> {result[key]}")
+        if result["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}.throughput_rps: {base['throughput_rps']} -> {result['throughput_rps']}")
+        if result["errors"] > base["errors"]:
+            regressions.append(f"{name}.errors: {base['errors']} -> {result['errors']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="request_handler benchmark against a local mock Zoom API.")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS,
+                        help="Scenario to run (repeatable; default: all).")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock server latency per call, in seconds.")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--meetings", type=int, default=mock_zoom_server.DEFAULT_MEETINGS)
+    parser.add_argument("--participants", type=int, default=mock_zoom_server.DEFAULT_PARTICIPANTS)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--prefetch", action="store_true", help="Prefetch pages in the participants scenario.")
+    parser.add_argument("--stream", action="store_true", help="Stream-parse pages in the participants scenario.")
+    parser.add_argument("--fields", type=lambda value: value.split(","),
+                        help="Comma-separated participant fields to keep, e.g. name,user_email.")
+    parser.add_argument("--decode", choices=("json", "fast"), default="json",
+                        help="make_request body decoding (fast uses orjson when installed).")
+    parser.add_argument("--token-ttl", type=float, default=0.5, help="Access token lifetime in the refresh scenario.")
+    parser.add_argument("--throttle-ratio", type=float, default=0.05, help="Share of 429s in the throttled scenario.")
+    parser.add_argument("--retry-after", type=float, default=0, help="Retry-After seconds in the throttled scenario.")
+    parser.add_argument("--error-ratio", type=float, default=0.05, help="Share of 503s in the flaky scenario.")
+    parser.add_argument("--slow-ratio", type=float, default=0.02,
+                        help="Share of slow responses in the flaky scenario.")
+    parser.add_argument("--slow-latency", type=float, default=0.5)
+    parser.add_argument("--hedge-after", type=float, default=None,
+                        help="Hedge GETs after this many seconds in the flaky scenario.")
+    parser.add_argument("--no-coalesce", action="store_true", help="Disable GET coalescing in make_request.")
+    parser.add_argument("--paced", action="store_true", help="Keep the default client-side rate limits.")
+    parser.add_argument("--save", metavar="PATH", help="Write results as a JSON baseline.")
+    parser.add_argument("--compare", metavar="PATH", help="Compare against a saved baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    server = mock_zoom_server.start(latency=args.latency, jitter=args.jitter,
+                                    meetings=args.meetings, participants=args.participants)
+    _configure_client(server, args.paced)
+    import request_handler
+    request_handler.set_decode_mode(args.decode)
+    manager = _authorize()
+
+    results = {}
+    try:
+        for name in args.scenario or SCENARIOS:
+            request_handler.set_request_coalescing(name in COALESCED_SCENARIOS and not args.no_coalesce)
+            results[name] = RUNNERS[name](server, manager, args)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    user_info = results.get("user_info")
+    refresh = results.get("refresh")
+    if user_info and refresh and user_info["throughput_rps"]:
+        refresh["throughput_overhead"] = round(1 - refresh["throughput_rps"] / user_info["throughput_rps"], 3)
+
+    report = {
+        "concurrency": args.concurrency,
+        "latency": args.latency,
+        "paced": args.paced,
+        "coalesce": not args.no_coalesce,
+        "decode": "stream" if args.stream else args.decode,
+        "scenarios": results,
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"Baseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("request_handler regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print("No request_handler regressions.")
+
+
+if __name__ == "__main__":
+    main()
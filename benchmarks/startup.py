@@ -0,0 +1,103 @@
+# benchmarks/startup.py
+# Usage: Measure import-time cost of the CLI and request helpers
+#
+#   python benchmarks/startup.py                     # print a report
+#   python benchmarks/startup.py --save base.json    # record a baseline
+#   python benchmarks/startup.py --compare base.json # fail on regressions
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODULES = ["zoom_cli", "request_handler", "access_request", "credentials"]
+
+
+def _parse_importtime(stderr):
+    """Return {module: (self_us, cumulative_us)} from -X importtime output."""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            timings[name.strip()] = (int(self_us), int(cumulative_us))
+        except ValueError:
+            continue
+    return timings
+
+
+def measure(module, runs):
+    """Import `module` in `runs` fresh interpreters and return timing stats."""
+    env = dict(os.environ)
+    # Any 'op' call during import would show up as a large self time
+    env.setdefault("PYTHONDONTWRITEBYTECODE", "1")
+    totals = []
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=REPO_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            stdin=subprocess.DEVNULL,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+        timings = _parse_importtime(result.stderr)
+        totals.append(timings[module][1])
+        samples.append(timings)
+    median_run = samples[totals.index(sorted(totals)[len(totals) // 2])]
+    slowest = sorted(median_run.items(), key=lambda item: item[1][0], reverse=True)[:8]
+    return {
+        "median_us": int(statistics.median(totals)),
+        "min_us": min(totals),
+        "max_us": max(totals),
+        "slowest_self_us": {name: self_us for name, (self_us, _) in slowest},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time benchmark for zoomsamples modules.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--save", metavar="PATH", help="Write results as a JSON baseline.")
+    parser.add_argument("--compare", metavar="PATH", help="Compare against a saved baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown versus the baseline (0.25 = 25%%).")
+    args = parser.parse_args()
+
+    results = {module: measure(module, args.runs) for module in args.modules}
+    for module, stats in results.items():
+        print(f"{module}: median {stats['median_us'] / 1000:.1f} ms "
+              f"(min {stats['min_us'] / 1000:.1f}, max {stats['max_us'] / 1000:.1f})")
+        for name, self_us in stats["slowest_self_us"].items():
+            print(f"    {self_us / 1000:8.2f} ms  {name}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+        print(f"Baseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        regressions = []
+        for module, stats in results.items():
+            if module not in baseline:
+                continue
+            before = baseline[module]["median_us"]
+            if stats["median_us"] > before * (1 + args.tolerance):
+                regressions.append(f"{module}: {before / 1000:.1f} ms -> {stats['median_us'] / 1000:.1f} ms")
+        if regressions:
+            print("Import-time regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print("No import-time regressions.")
+
+
+if __name__ == "__main__":
+    main()
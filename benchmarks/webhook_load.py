@@ -0,0 +1,237 @@
+# benchmarks/webhook_load.py
+# Usage: Load-test the webhook endpoint with synthetic CRC and signed event payloads
+#
+#   python benchmarks/webhook_load.py                        # Flask test client, in-process
+#   python benchmarks/webhook_load.py --serve                # real HTTP on a local threaded server
+#   python benchmarks/webhook_load.py --url http://127.0.0.1:8000/zoom-webhook --secret s3cret
+#   python benchmarks/webhook_load.py --save webhook.json    # record a baseline
+#   python benchmarks/webhook_load.py --compare webhook.json # fail on regressions
+
+import argparse
+import hashlib
+import hmac
+import itertools
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WEBHOOK_DIR = os.path.join(REPO_DIR, "validatewebhook")
+sys.path.insert(0, REPO_DIR)
+
+from metrics import percentile  # noqa: E402
+
+# Zoom's deadline for answering a webhook delivery
+SLO_SECONDS = 3.0
+BENCH_SECRET = "benchmark-webhook-secret"
+
+
+class PayloadFactory:
+    """Builds CRC challenges and signed event deliveries with unique bodies."""
+
+    def __init__(self, secret, crc_ratio, duplicate_ratio):
+        self.secret = secret.encode("utf-8")
+        self.crc_every = round(1 / crc_ratio) if crc_ratio > 0 else 0
+        self.duplicate_every = round(1 / duplicate_ratio) if duplicate_ratio > 0 else 0
+        self._counter = itertools.count()
+        self._last_event = None
+
+    def next(self):
+        number = next(self._counter)
+        if self.crc_every and number % self.crc_every == 0:
+            body = json.dumps({
+                "event": "endpoint.url_validation",
+                "payload": {"plainToken": f"token-{number}"},
+                "event_ts": int(time.time() * 1000),
+            }).encode("utf-8")
+            return body, {"Content-Type": "application/json"}
+        if self.duplicate_every and self._last_event and number % self.duplicate_every == 0:
+            body = self._last_event
+        else:
+            body = json.dumps({
+                "event": "meeting.participant_joined",
+                "event_ts": int(time.time() * 1000),
+                "payload": {
+                    "account_id": "benchmark",
+                    "object": {
+                        "id": number,
+                        "uuid": f"bench-{number}",
+                        "participant": {"user_name": f"User {number}", "join_time": "2026-01-01T00:00:00Z"},
+                    },
+                },
+            }).encode("utf-8")
+            self._last_event = body
+        timestamp = str(int(time.time()))
+        signature = "v0=" + hmac.new(self.secret, b"v0:" + timestamp.encode() + b":" + body,
+                                     hashlib.sha256).hexdigest()
+        return body, {
+            "Content-Type": "application/json",
+            "x-zm-request-timestamp": timestamp,
+            "x-zm-signature": signature,
+        }
+
+
+def _load_app():
+    os.environ.setdefault("YOUR_WEBHOOK_SECRET", BENCH_SECRET)
+    os.environ.setdefault("WEBHOOK_EVENT_LOG_DIR", tempfile.mkdtemp(prefix="webhook-bench-"))
+    sys.path.insert(0, WEBHOOK_DIR)
+    import app as webhook_app
+    # Keep per-event console logging out of the measurement
+    webhook_app.app.logger.setLevel(logging.WARNING)
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    return webhook_app
+
+
+def _client_sender(webhook_app):
+    local = threading.local()
+
+    def send(body, headers):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = webhook_app.app.test_client()
+        return client.post("/zoom-webhook", data=body, headers=headers).status_code
+    return send
+
+
+def _http_sender(url):
+    import http_client
+
+    def send(body, headers):
+        return http_client.get_session().post(url, data=body, headers=headers, timeout=10).status_code
+    return send
+
+
+def _serve(webhook_app):
+    from werkzeug.serving import make_server
+    server = make_server("127.0.0.1", 0, webhook_app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/zoom-webhook"
+
+
+def run(send, factory, requests_total, concurrency, warmup):
+    """Drive `send` from `concurrency` threads; return per-request latencies and errors."""
+    for _ in range(warmup):
+        send(*factory.next())
+    counter = itertools.count()
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        own_latencies = []
+        own_errors = []
+        while next(counter) < requests_total:
+            body, headers = factory.next()
+            started = time.perf_counter()
+            try:
+                status = send(body, headers)
+            except Exception as exc:
+                status = type(exc).__name__
+            own_latencies.append(time.perf_counter() - started)
+            if status not in (200, 204):
+                own_errors.append(status)
+        with lock:
+            latencies.extend(own_latencies)
+            errors.extend(own_errors)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - started
+
+
+def summarize(latencies, errors, elapsed):
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": len(errors),
+        "error_codes": sorted({str(code) for code in errors}),
+        "throughput_rps": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "p999_ms": round(percentile(ordered, 0.999) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+        "slo_violations": sum(1 for value in ordered if value > SLO_SECONDS),
+    }
+
+
+def compare(result, baseline, tolerance):
+    regressions = []
+    for key in ("p50_ms", "p99_ms", "p999_ms"):
+        if result[key] > baseline[key] * (1 + tolerance):
+            regressions.append(f"{key}: {baseline[key]} -> {result[key]}")
+    if result["throughput_rps"] < baseline["throughput_rps"] * (1 - tolerance):
+        regressions.append(f"throughput_rps: {baseline['throughput_rps']} -> {result['throughput_rps']}")
+    if result["slo_violations"] > baseline.get("slo_violations", 0):
+        regressions.append(f"slo_violations: {baseline.get('slo_violations', 0)} -> {result['slo_violations']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Webhook endpoint load test.")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="Endpoint of a running deployment (gunicorn, etc.).")
+    target.add_argument("--serve", action="store_true", help="Serve the app over local HTTP first.")
+    parser.add_argument("--secret", default=None, help="Webhook secret of the target (with --url).")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--crc-ratio", type=float, default=0.05, help="Share of CRC challenges.")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.0, help="Share of redelivered events.")
+    parser.add_argument("--save", metavar="PATH", help="Write results as a JSON baseline.")
+    parser.add_argument("--compare", metavar="PATH", help="Compare against a saved baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    secret = args.secret
+    server = None
+    webhook_app = None
+    if args.url:
+        send = _http_sender(args.url)
+        secret = secret or os.getenv("YOUR_WEBHOOK_SECRET", BENCH_SECRET)
+    else:
+        webhook_app = _load_app()
+        secret = webhook_app.YOUR_WEBHOOK_SECRET
+        if args.serve:
+            server, url = _serve(webhook_app)
+            send = _http_sender(url)
+        else:
+            send = _client_sender(webhook_app)
+
+    factory = PayloadFactory(secret, args.crc_ratio, args.duplicate_ratio)
+    latencies, errors, elapsed = run(send, factory, args.requests, args.concurrency, args.warmup)
+    result = summarize(latencies, errors, elapsed)
+    result["mode"] = "url" if args.url else "serve" if args.serve else "in-process"
+    result["concurrency"] = args.concurrency
+    if webhook_app is not None:
+        webhook_app.pipeline.join()
+        result["pipeline"] = webhook_app.pipeline.stats()
+    if server is not None:
+        server.shutdown()
+
+    print(json.dumps(result, indent=2))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as handle:
+            json.dump(result, handle, indent=2)
+        print(f"Baseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        regressions = compare(result, baseline, args.tolerance)
+        if regressions:
+            print("Webhook latency regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print("No webhook latency regressions.")
+
+
+if __name__ == "__main__":
+    main()
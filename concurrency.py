@@ -0,0 +1,52 @@
+# concurrency.py
+# Usage: Bounded-concurrency fan-out helpers for per-item Zoom API calls
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+DEFAULT_WORKERS = 8
+
+
+def bounded_map(func, items, workers=DEFAULT_WORKERS, ordered=True):
+    """
+    Call func(item) for every item on a pool of `workers` threads and yield
+    (item, result, error) tuples. Exactly one of result/error is meaningful:
+    a failure in one call is reported as its error and does not stop the
+    others.
+
+    With ordered=True results come back in input order; otherwise they are
+    yielded as soon as each call completes. At most 2 * workers calls are
+    queued at once, so `items` may be a lazy iterator of any length.
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1.")
+    window = workers * 2
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque() if ordered else set()
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < window:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                future = executor.submit(func, item)
+                future.item = item
+                if ordered:
+                    pending.append(future)
+                else:
+                    pending.add(future)
+            if not pending:
+                return
+            if ordered:
+                done = [pending.popleft()]
+                wait(done)
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                pending -= done
+            for future in done:
+                error = future.exception()
+                result = None if error is not None else future.result()
+                yield future.item, result, error
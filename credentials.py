@@ -1,39 +1,181 @@
+import json
 import os
+import re
 import subprocess
+import threading
+import time
 from dotenv import load_dotenv
 
+import tracing
+
 # Find the .env file in the same directory as this file
 env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')
 load_dotenv(env_path)
 
+# Seconds a resolved 1Password secret is reused before 'op' is asked again
+CACHE_TTL = float(os.getenv("CREDENTIALS_CACHE_TTL", "300"))
+
+# Opt-in: share resolved secrets between processes through this file (mode 0600).
+# Secrets are then stored on disk in plain text, so only enable it on trusted hosts.
+CACHE_FILE = os.getenv("CREDENTIALS_CACHE_FILE")
+
+_cache = {}
+_cache_lock = threading.Lock()
+_INJECT_PATTERN = re.compile(r"@@zs-begin (\d+)@@(.*?)@@zs-end@@", re.DOTALL)
+
+
+def _is_reference(value):
+    return bool(value) and value.startswith("op://")
+
+
+# --- Cache ---
+def _cache_get(reference, now):
+    entry = _cache.get(reference)
+    if entry and entry[1] > now:
+        return entry[0]
+    return None
+
+
+def _load_cache_file(now):
+    try:
+        with open(CACHE_FILE, encoding="utf-8") as handle:
+            stored = json.load(handle)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return {ref: item["value"] for ref, item in stored.items() if item["expires_at"] > now}
+
+
+def _save_cache_file(resolved, now):
+    from file_lock import atomic_write, locked
+
+    with locked(CACHE_FILE):
+        try:
+            with open(CACHE_FILE, encoding="utf-8") as handle:
+                stored = json.load(handle)
+        except (FileNotFoundError, ValueError):
+            stored = {}
+        stored = {ref: item for ref, item in stored.items() if item["expires_at"] > now}
+        for reference, value in resolved.items():
+            stored[reference] = {"value": value, "expires_at": now + CACHE_TTL}
+        atomic_write(CACHE_FILE, json.dumps(stored))
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+# --- 1Password resolution ---
+def _read_secret(reference, var_name):
+    try:
+        # Use 1Password CLI to read the secret
+        with tracing.span("credentials.op_read"):
+            result = subprocess.run(
+                ["op", "read", reference],
+                capture_output=True,
+                text=True,
+                check=True
+            )
+        return result.stdout.strip()
+    except subprocess.CalledProcessError as e:
+        print(f"Error reading secret from 1Password for {var_name}: {e.stderr}")
+        return None
+    except FileNotFoundError:
+        print("1Password CLI ('op') not found. Please install it to use secret references.")
+        return None
+
+
+def _inject_secrets(references):
+    """Resolve many references with a single 'op inject' call; None if it fails."""
+    template = "".join(
+        f"@@zs-begin {index}@@{{{{ {reference} }}}}@@zs-end@@\n"
+        for index, reference in enumerate(references)
+    )
+    try:
+        with tracing.span("credentials.op_inject", references=len(references)):
+            result = subprocess.run(
+                ["op", "inject"],
+                input=template,
+                capture_output=True,
+                text=True,
+                check=True
+            )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+    values = {int(index): value.strip() for index, value in _INJECT_PATTERN.findall(result.stdout)}
+    if len(values) != len(references):
+        return None
+    return {reference: values[index] for index, reference in enumerate(references)}
+
+
+def resolve_references(references, names=None):
+    """
+    Resolve 1Password references, returning {reference: value}. Cached values
+    are reused; the rest are resolved together in one 'op inject' call, with
+    a per-reference 'op read' fallback so one bad reference does not hide
+    the others. names maps references to variable names for error messages.
+    """
+    with tracing.span("credentials.resolve", references=len(references)):
+        return _resolve(references, names or {})
+
+
+def _resolve(references, names):
+    now = time.monotonic()
+    wall_now = time.time()
+    resolved = {}
+    with _cache_lock:
+        for reference in references:
+            value = _cache_get(reference, now)
+            if value is not None:
+                resolved[reference] = value
+    missing = [ref for ref in dict.fromkeys(references) if ref not in resolved]
+    if missing and CACHE_FILE:
+        stored = _load_cache_file(wall_now)
+        for reference in missing:
+            if reference in stored:
+                resolved[reference] = stored[reference]
+        missing = [ref for ref in missing if ref not in resolved]
+    tracing.current_span().set(cached=len(resolved))
+    if not missing:
+        return resolved
+
+    fetched = _inject_secrets(missing) if len(missing) > 1 else None
+    if fetched is None:
+        fetched = {}
+        for reference in missing:
+            value = _read_secret(reference, names.get(reference, reference))
+            if value is not None:
+                fetched[reference] = value
+    with _cache_lock:
+        for reference, value in fetched.items():
+            _cache[reference] = (value, now + CACHE_TTL)
+    if fetched and CACHE_FILE:
+        _save_cache_file(fetched, wall_now)
+    resolved.update(fetched)
+    return resolved
+
+
 def get_credentials(var_name):
     """
-    Get the value of an environment variable. If the value is a 1Password 
+    Get the value of an environment variable. If the value is a 1Password
     secret reference (starts with 'op://'), it resolves it using the 1Password CLI.
     """
     value = os.getenv(var_name)
-    
-    if value and value.startswith("op://"):
-        try:
-            # Use 1Password CLI to read the secret
-            result = subprocess.run(
-                ["op", "read", value], 
-                capture_output=True, 
-                text=True, 
-                check=True
-            )
-            return result.stdout.strip()
-        except subprocess.CalledProcessError as e:
-            print(f"Error reading secret from 1Password for {var_name}: {e.stderr}")
-            return None
-        except FileNotFoundError:
-            print("1Password CLI ('op') not found. Please install it to use secret references.")
-            return None
-    
+
+    if _is_reference(value):
+        return resolve_references([value], {value: var_name}).get(value)
+
     return value
 
 def get_all_credentials(var_names):
     """
-    Helper function to get multiple credentials at once.
+    Helper function to get multiple credentials at once. All 1Password
+    references are resolved in a single 'op' invocation.
     """
-    return {name: get_credentials(name) for name in var_names}
+    values = {name: os.getenv(name) for name in var_names}
+    references = {value: name for name, value in values.items() if _is_reference(value)}
+    resolved = resolve_references(list(references), references) if references else {}
+    return {
+        name: resolved.get(value) if _is_reference(value) else value
+        for name, value in values.items()
+    }
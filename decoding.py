@@ -0,0 +1,154 @@
+# decoding.py
+# Usage: Low-allocation decoding of Zoom API response bodies
+#
+#   data = loads(response.content)              # orjson when installed, else json
+#   for record in RecordStream(response.iter_content(CHUNK_SIZE), "participants", fields=("name",)):
+#       ...
+
+import codecs
+import json
+
+try:
+    import orjson
+except ImportError:  # Optional dependency: pip install orjson
+    orjson = None
+
+# make_request(decode=...) modes
+DECODE_JSON = "json"  # response.json(), the requests default
+DECODE_FAST = "fast"  # orjson (if installed) straight from the body bytes
+DECODE_RAW = "raw"    # undecoded body bytes, e.g. to store or forward as-is
+DECODE_MODES = (DECODE_JSON, DECODE_FAST, DECODE_RAW)
+
+# Bytes read from the socket per step when streaming a body
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+def loads(data):
+    """Decode JSON bytes or text with orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def decode_response(response, mode=DECODE_JSON):
+    if mode == DECODE_RAW:
+        return response.content
+    if mode == DECODE_FAST:
+        return loads(response.content)
+    if mode == DECODE_JSON:
+        return response.json()
+    raise ValueError(f"Unknown decode mode {mode!r}; expected one of {DECODE_MODES}.")
+
+
+def select_fields(record, fields):
+    """Project a record onto `fields` (missing fields become None)."""
+    return {field: record.get(field) for field in fields}
+
+
+class RecordStream:
+    """
+    Incrementally parse a JSON object body and yield the items of its
+    `records_key` array one at a time, without building the whole
+    document. Only the unparsed tail of the body is buffered, so memory
+    stays at about one chunk plus one record. Other top-level members
+    (next_page_token, total_records, ...) are collected in `meta`, which
+    is complete once iteration finishes.
+
+    chunks is an iterable of bytes, e.g. response.iter_content(CHUNK_SIZE).
+    With `fields`, each record is reduced to just those fields.
+    """
+
+    def __init__(self, chunks, records_key, fields=None):
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self.records_key = records_key
+        self.fields = tuple(fields) if fields else None
+        self.meta = {}
+        self.count = 0
+
+    # --- Buffer handling ---
+    def _fill(self):
+        """Read one more chunk; False at end of body."""
+        if self._eof:
+            return False
+        # Drop the consumed prefix so the buffer never holds more than the unparsed tail
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+        for chunk in self._chunks:
+            if chunk:
+                self._buffer += self._text_decoder.decode(chunk)
+                return True
+        self._buffer += self._text_decoder.decode(b"", final=True)
+        self._eof = True
+        return False
+
+    def _peek(self):
+        """Next non-whitespace character (not consumed), or '' at end of body."""
+        while True:
+            buffer = self._buffer
+            while self._pos < len(buffer) and buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(buffer):
+                return buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, chars):
+        char = self._peek()
+        if not char or char not in chars:
+            raise ValueError(f"Malformed JSON body: expected {chars!r} at offset {self._pos}, got {char!r}")
+        self._pos += 1
+        return char
+
+    def _value(self):
+        """Decode the next complete JSON value, reading more chunks as needed."""
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number that ends the buffer may continue in the next chunk
+            if end == len(self._buffer) and not self._eof and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    # --- Parsing ---
+    def __iter__(self):
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                raise ValueError("Malformed JSON body: object keys must be strings")
+            self._expect(":")
+            if key == self.records_key and self._peek() == "[":
+                yield from self._records()
+            else:
+                self.meta[key] = self._value()
+            if self._expect(",}") == "}":
+                return
+
+    def _records(self):
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        fields = self.fields
+        while True:
+            record = self._value()
+            self.count += 1
+            yield select_fields(record, fields) if fields else record
+            if self._expect(",]") == "]":
+                return
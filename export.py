@@ -0,0 +1,305 @@
+# export.py
+# Usage: Resumable bulk export of meeting and participant reports
+#
+#   python export.py --from 2026-01-01 --to 2026-03-31 --out exports
+#   python export.py --from 2026-01-01 --to 2026-03-31 --out exports --format parquet
+#
+# Meetings are listed per date window from /report/users/{user}/meetings and
+# every meeting's participant report is streamed to NDJSON under --out:
+#   meetings/<window>.ndjson, participants/<window>.ndjson[, .parquet]
+# Progress is checkpointed after each meeting, so re-running the same
+# command after a crash or stall resumes where it stopped.
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+from datetime import date, timedelta
+
+import requests
+
+from concurrency import DEFAULT_WORKERS, bounded_map
+from request_handler import API_BASE_URL, iter_records
+from sync_store import report_id
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # Optional dependency for --format parquet
+    pyarrow = None
+
+# Zoom's report endpoints accept at most one month per request
+MAX_WINDOW_DAYS = 30
+DEFAULT_WINDOW_DAYS = 7
+DEFAULT_WINDOW_WORKERS = 2
+CHECKPOINT_FILE = "checkpoint.ndjson"
+# Participant rows per Parquet row group (bounds memory while converting)
+PARQUET_BATCH_ROWS = 50000
+# Bytes of one report's encoded rows held in memory before spilling to a temp file
+SPOOL_BYTES = 1024 * 1024
+
+# Fixed Parquet schema; any other participant fields are kept in NDJSON only
+PARTICIPANT_COLUMNS = [
+    ("meeting_uuid", "string"),
+    ("meeting_id", "string"),
+    ("id", "string"),
+    ("user_id", "string"),
+    ("name", "string"),
+    ("user_email", "string"),
+    ("join_time", "string"),
+    ("leave_time", "string"),
+    ("duration", "int64"),
+    ("status", "string"),
+]
+
+
+def date_windows(start, end, days=DEFAULT_WINDOW_DAYS):
+    """Split the inclusive range [start, end] into consecutive windows of at most `days` days."""
+    if not 1 <= days <= MAX_WINDOW_DAYS:
+        raise ValueError(f"Window size must be between 1 and {MAX_WINDOW_DAYS} days.")
+    windows = []
+    while start <= end:
+        window_end = min(start + timedelta(days=days - 1), end)
+        windows.append((start, window_end))
+        start = window_end + timedelta(days=1)
+    return windows
+
+
+def window_name(window):
+    return f"{window[0].isoformat()}_{window[1].isoformat()}"
+
+
+class Checkpoint:
+    """
+    Append-only progress log shared by all window workers. Each line is
+    either a finished meeting with the participants file size after its
+    rows were written, or a finished window.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.windows = {}
+        try:
+            with open(path, encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # Torn final line from a crash
+                    state = self._state(entry["window"])
+                    if entry.get("done"):
+                        state["done"] = True
+                    else:
+                        state["meetings"].add(entry["meeting"])
+                        state["offset"] = entry["offset"]
+        except FileNotFoundError:
+            pass
+        self._handle = open(path, "a", encoding="utf-8")
+
+    def _state(self, name):
+        return self.windows.setdefault(name, {"done": False, "meetings": set(), "offset": 0})
+
+    def state(self, name):
+        with self._lock:
+            return self._state(name)
+
+    def _append(self, entry):
+        with self._lock:
+            self._handle.write(json.dumps(entry) + "\n")
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+
+    def meeting_done(self, name, meeting_uuid, offset):
+        self._append({"window": name, "meeting": meeting_uuid, "offset": offset})
+        with self._lock:
+            state = self._state(name)
+            state["meetings"].add(meeting_uuid)
+            state["offset"] = offset
+
+    def window_done(self, name, rows):
+        self._append({"window": name, "done": True, "rows": rows})
+        with self._lock:
+            self._state(name)["done"] = True
+
+    def close(self):
+        self._handle.close()
+
+
+def _meeting_uuid(meeting):
+    return meeting.get("uuid") or str(meeting["id"])
+
+
+def _spool_participants(meeting, page_size):
+    """Stream one meeting's participant rows as NDJSON into a spool file; returns (spool, rows)."""
+    endpoint = f"{API_BASE_URL}/report/meetings/{report_id(meeting)}/participants"
+    extra = {"meeting_uuid": _meeting_uuid(meeting), "meeting_id": str(meeting["id"])}
+    # A meeting's rows are written in one piece, so a resumed export never holds half a report
+    spool = tempfile.SpooledTemporaryFile(SPOOL_BYTES)
+    rows = 0
+    try:
+        for participant in iter_records(endpoint, "participants", page_size=page_size, stream=True):
+            spool.write(json.dumps({**extra, **participant}).encode("utf-8") + b"\n")
+            rows += 1
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, rows
+
+
+def export_window(window, out_dir, checkpoint, user_id="me", workers=DEFAULT_WORKERS,
+                  page_size=300, parquet=False):
+    """Export one date window; returns a summary dict. Safe to call again after a failure."""
+    name = window_name(window)
+    state = checkpoint.state(name)
+    summary = {"window": name, "meetings": 0, "skipped": 0, "rows": 0, "failed": 0}
+    participants_path = os.path.join(out_dir, "participants", f"{name}.ndjson")
+    if state["done"]:
+        summary["skipped"] = len(state["meetings"])
+        if parquet and not os.path.exists(participants_path[:-len(".ndjson")] + ".parquet"):
+            write_parquet(participants_path)
+        return summary
+
+    # Meetings are re-listed on every attempt; the listing is cheap next to the reports
+    meetings_path = os.path.join(out_dir, "meetings", f"{name}.ndjson")
+    meetings = iter_records(
+        f"{API_BASE_URL}/report/users/{user_id}/meetings", "meetings",
+        params={"from": window[0].isoformat(), "to": window[1].isoformat(), "type": "past"},
+        page_size=page_size,
+    )
+    done = state["meetings"]
+
+    def pending(meetings_file):
+        for meeting in meetings:
+            meetings_file.write(json.dumps(meeting) + "\n")
+            summary["meetings"] += 1
+            if _meeting_uuid(meeting) in done:
+                summary["skipped"] += 1
+                continue
+            yield meeting
+
+    with open(meetings_path, "w", encoding="utf-8") as meetings_file, \
+            open(participants_path, "a+b") as participants_file:
+        # Drop rows written after the last checkpoint; those meetings are fetched again
+        participants_file.truncate(state["offset"])
+        participants_file.seek(state["offset"])
+        for meeting, result, error in bounded_map(lambda meeting: _spool_participants(meeting, page_size),
+                                                  pending(meetings_file), workers, ordered=False):
+            if error is not None:
+                summary["failed"] += 1
+                print(f"Unable to export participants for meeting {meeting.get('id')}: {error}")
+                continue
+            spool, rows = result
+            with spool:
+                shutil.copyfileobj(spool, participants_file)
+            participants_file.flush()
+            os.fsync(participants_file.fileno())
+            checkpoint.meeting_done(name, _meeting_uuid(meeting), participants_file.tell())
+            summary["rows"] += rows
+
+    if not summary["failed"]:
+        checkpoint.window_done(name, summary["rows"])
+        if parquet:
+            write_parquet(participants_path)
+    return summary
+
+
+def write_parquet(ndjson_path):
+    """Convert a finished participants NDJSON file to Parquet, one row group per batch."""
+    if pyarrow is None:
+        raise ImportError("Parquet export requires pyarrow: pip install pyarrow")
+    schema = pyarrow.schema([(column, getattr(pyarrow, kind)()) for column, kind in PARTICIPANT_COLUMNS])
+    parquet_path = ndjson_path[:-len(".ndjson")] + ".parquet"
+    tmp_path = parquet_path + ".tmp"
+
+    def to_batch(rows):
+        columns = {}
+        for column, kind in PARTICIPANT_COLUMNS:
+            values = [row.get(column) for row in rows]
+            if kind == "string":
+                values = [None if value is None else str(value) for value in values]
+            columns[column] = values
+        return pyarrow.Table.from_pydict(columns, schema=schema)
+
+    with pyarrow.parquet.ParquetWriter(tmp_path, schema) as writer, \
+            open(ndjson_path, encoding="utf-8") as source:
+        rows = []
+        for line in source:
+            rows.append(json.loads(line))
+            if len(rows) >= PARQUET_BATCH_ROWS:
+                writer.write_table(to_batch(rows))
+                rows = []
+        if rows:
+            writer.write_table(to_batch(rows))
+    os.replace(tmp_path, parquet_path)
+    return parquet_path
+
+
+def export(start, end, out_dir, user_id="me", window_days=DEFAULT_WINDOW_DAYS, workers=DEFAULT_WORKERS,
+           window_workers=DEFAULT_WINDOW_WORKERS, page_size=300, parquet=False):
+    """
+    Export every window in [start, end], `window_workers` windows at a time
+    with up to `workers` participant reports in flight per window. Yields
+    one summary per window as it finishes.
+    """
+    if parquet and pyarrow is None:
+        raise ImportError("Parquet export requires pyarrow: pip install pyarrow")
+    for folder in ("meetings", "participants"):
+        os.makedirs(os.path.join(out_dir, folder), exist_ok=True)
+    checkpoint = Checkpoint(os.path.join(out_dir, CHECKPOINT_FILE))
+    try:
+        def run(window):
+            return export_window(window, out_dir, checkpoint, user_id, workers, page_size, parquet)
+
+        for window, summary, error in bounded_map(run, date_windows(start, end, window_days),
+                                                  window_workers, ordered=False):
+            if error is not None:
+                summary = {"window": window_name(window), "error": str(error)}
+            yield summary
+    finally:
+        checkpoint.close()
+
+
+def main():
+    today = date.today()
+    parser = argparse.ArgumentParser(description="Export meeting and participant reports.")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, default=today - timedelta(days=30),
+                        help="First day to export (YYYY-MM-DD, default: 30 days ago).")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, default=today,
+                        help="Last day to export (YYYY-MM-DD, default: today).")
+    parser.add_argument("--out", default="exports", help="Output directory (also holds the checkpoint).")
+    parser.add_argument("--user", default="me", help="User ID or email whose meetings are exported.")
+    parser.add_argument("--format", choices=("ndjson", "parquet"), default="ndjson",
+                        help="parquet also writes a Parquet file per finished window (needs pyarrow).")
+    parser.add_argument("--window-days", type=int, default=DEFAULT_WINDOW_DAYS)
+    parser.add_argument("--window-workers", type=int, default=DEFAULT_WINDOW_WORKERS,
+                        help="Date windows exported in parallel.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Participant reports fetched in parallel per window.")
+    args = parser.parse_args()
+
+    totals = {"rows": 0, "failed": 0, "errors": 0}
+    try:
+        for summary in export(args.start, args.end, args.out, args.user, args.window_days, args.workers,
+                              args.window_workers, parquet=args.format == "parquet"):
+            if "error" in summary:
+                totals["errors"] += 1
+                print(f"{summary['window']}: failed ({summary['error']})")
+                continue
+            totals["rows"] += summary["rows"]
+            totals["failed"] += summary["failed"]
+            print(f"{summary['window']}: {summary['meetings']} meetings, {summary['rows']} new rows, "
+                  f"{summary['skipped']} already exported, {summary['failed']} failed")
+    except (ImportError, ValueError, requests.RequestException) as exc:
+        print(f"Export failed: {exc}")
+        return
+    print(f"Exported {totals['rows']} participant rows to {args.out}.")
+    if totals["failed"] or totals["errors"]:
+        print("Some reports were not exported; run the same command again to resume.")
+
+
+if __name__ == "__main__":
+    main()
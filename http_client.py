@@ -0,0 +1,184 @@
+# http_client.py
+# Usage: Shared, pooled HTTP session for all Zoom API and OAuth calls
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import tracing
+
+# Number of distinct hosts to keep pools for (api.zoom.us, zoom.us, ...)
+DEFAULT_POOL_SIZE = 10
+# Connections kept open per host; size this to your worker thread count
+DEFAULT_MAX_PER_HOST = 20
+
+_session = None
+_session_lock = threading.Lock()
+_config = {
+    "pool_size": DEFAULT_POOL_SIZE,
+    "max_per_host": DEFAULT_MAX_PER_HOST,
+    "keep_alive": True,
+    "block": False,
+}
+
+
+# --- Pool statistics ---
+class PoolStats:
+    """Thread-safe counters for connection checkouts and new connections."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_new_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+    def snapshot(self):
+        with self._lock:
+            requests_seen = self.requests
+            misses = self.new_connections
+        return {
+            "requests": requests_seen,
+            "hits": max(requests_seen - misses, 0),
+            "misses": misses,
+        }
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.new_connections = 0
+
+
+pool_stats = PoolStats()
+
+
+# --- Connection tracing ---
+# http.connect covers DNS, TCP and (for HTTPS) TLS; its child http.tcp_connect
+# covers DNS and TCP, so the TLS handshake is http.connect's self time.
+class _TracedHTTPConnection(HTTPConnection):
+    def connect(self):
+        with tracing.span("http.connect", host=self.host):
+            super().connect()
+
+    def _new_conn(self):
+        with tracing.span("http.tcp_connect", host=self.host):
+            return super()._new_conn()
+
+
+class _TracedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        with tracing.span("http.connect", host=self.host, tls=True):
+            super().connect()
+
+    def _new_conn(self):
+        with tracing.span("http.tcp_connect", host=self.host):
+            return super()._new_conn()
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TracedHTTPConnection
+
+    def _get_conn(self, timeout=None):
+        pool_stats.record_request()
+        return super()._get_conn(timeout=timeout)
+
+    def _new_conn(self):
+        pool_stats.record_new_connection()
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TracedHTTPSConnection
+
+    def _get_conn(self, timeout=None):
+        pool_stats.record_request()
+        return super()._get_conn(timeout=timeout)
+
+    def _new_conn(self):
+        pool_stats.record_new_connection()
+        return super()._new_conn()
+
+
+class _CountingAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+
+# --- Session management ---
+def _build_session():
+    adapter = _CountingAdapter(
+        pool_connections=_config["pool_size"],
+        pool_maxsize=_config["max_per_host"],
+        pool_block=_config["block"],
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not _config["keep_alive"]:
+        session.headers["Connection"] = "close"
+    return session
+
+
+def configure(pool_size=None, max_per_host=None, keep_alive=None, block=None):
+    """
+    Change the pool settings. The shared session is rebuilt on next use;
+    connections held by the previous session are closed.
+    """
+    global _session
+    with _session_lock:
+        if pool_size is not None:
+            _config["pool_size"] = pool_size
+        if max_per_host is not None:
+            _config["max_per_host"] = max_per_host
+        if keep_alive is not None:
+            _config["keep_alive"] = keep_alive
+        if block is not None:
+            _config["block"] = block
+        old_session, _session = _session, None
+    if old_session is not None:
+        old_session.close()
+
+
+def get_session():
+    """
+    Return the process-wide session. The underlying urllib3 pools are
+    thread-safe, so a single session is shared by every worker thread.
+    """
+    global _session
+    session = _session
+    if session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+            session = _session
+    return session
+
+
+def close():
+    global _session
+    with _session_lock:
+        old_session, _session = _session, None
+    if old_session is not None:
+        old_session.close()
+
+
+def get_pool_stats():
+    """Return pool hits (reused connections) and misses (new handshakes)."""
+    return pool_stats.snapshot()
+
+
+def reset_pool_stats():
+    pool_stats.reset()
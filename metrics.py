@@ -0,0 +1,253 @@
+# metrics.py
+# Usage: Process-wide metrics registry with Prometheus text exposition
+#
+#   REQUESTS = counter("zoom_api_responses_total", "Responses by route and status.", ("route", "status"))
+#   REQUESTS.inc("GET /v2/users/me", "200")
+#   LATENCY = histogram("zoom_api_request_duration_seconds", "HTTP latency.", ("route",))
+#   LATENCY.observe(0.12, "GET /v2/users/me")
+#   print(render())                  # Prometheus text format
+#   snapshot()                       # the same data as a dict
+#   parse_text(text)                 # samples of another process's exposition, as a dict
+#   percentile(sorted(latencies), 0.99)
+
+import math
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Seconds; covers a fast cached call up to a slow report page
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# One name="value" label pair in the text format, with \\, \" and \n escapes
+_LABEL_PAIR = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def _label_text(names, values):
+    if not names:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for value in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+
+class Counter:
+    """Monotonic count per label combination. inc() is one dict update under an uncontended lock."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def collect(self):
+        with self._lock:
+            return dict(self._values)
+
+    def render(self):
+        return [f"{self.name}{_label_text(self.labelnames, labels)} {value}"
+                for labels, value in sorted(self.collect().items())]
+
+
+class Histogram:
+    """
+    Bucketed distribution per label combination. observe() does one bisect
+    outside the lock and two increments inside it; buckets are made
+    cumulative only when rendered.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                # One slot per bucket, one for +Inf, then the running sum
+                row = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            row[index] += 1
+            row[-1] += value
+
+    def collect(self):
+        """{labels: {"count", "sum", "buckets": [(le, cumulative_count), ...]}}"""
+        with self._lock:
+            rows = {labels: list(row) for labels, row in self._values.items()}
+        result = {}
+        for labels, row in rows.items():
+            cumulative = 0
+            buckets = []
+            for bound, count in zip(list(self.buckets) + ["+Inf"], row[:-1]):
+                cumulative += count
+                buckets.append((bound, cumulative))
+            result[labels] = {"count": cumulative, "sum": row[-1], "buckets": buckets}
+        return result
+
+    def render(self):
+        lines = []
+        names = self.labelnames + ("le",)
+        for labels, data in sorted(self.collect().items()):
+            for bound, count in data["buckets"]:
+                lines.append(f"{self.name}_bucket{_label_text(names, labels + (bound,))} {count}")
+            suffix = _label_text(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{suffix} {round(data['sum'], 6)}")
+            lines.append(f"{self.name}_count{suffix} {data['count']}")
+        return lines
+
+
+class Gauge:
+    """
+    Current value per label combination, either set() directly or read from
+    func() at collection time. func returns a number, or {labels: value}
+    when the gauge has labels. kind="counter" exposes a callback that reads
+    an existing counter, e.g. a component's own stats.
+    """
+
+    def __init__(self, name, documentation, labelnames=(), func=None, kind="gauge"):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.kind = kind
+        self._func = func
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def collect(self):
+        if self._func is None:
+            with self._lock:
+                return dict(self._values)
+        value = self._func()
+        if isinstance(value, dict):
+            return {labels if isinstance(labels, tuple) else (labels,): item for labels, item in value.items()}
+        return {(): value} if value is not None else {}
+
+    def render(self):
+        return [f"{self.name}{_label_text(self.labelnames, labels)} {value}"
+                for labels, value in sorted(self.collect().items())]
+
+
+def _register(cls, name, *args, **kwargs):
+    # Get-or-create, so modules can declare their metrics at import in any order
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = cls(name, *args, **kwargs)
+        return metric
+
+
+def counter(name, documentation, labelnames=()):
+    return _register(Counter, name, documentation, labelnames)
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return _register(Histogram, name, documentation, labelnames, buckets)
+
+
+def gauge(name, documentation, labelnames=(), func=None, kind="gauge"):
+    """Register a gauge; with func, an existing one is rebound to the new callback."""
+    metric = _register(Gauge, name, documentation, labelnames, func, kind)
+    if func is not None:
+        metric._func = func
+    return metric
+
+
+@contextmanager
+def timed(histogram, *labels, counter=None):
+    """Observe the duration of the block; with counter, also count it by outcome ("ok" or "error")."""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        histogram.observe(time.perf_counter() - started, *labels)
+        if counter is not None:
+            counter.inc(*labels, outcome)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of already sorted values: the p99 of 100 values is the 99th, 0 when empty."""
+    if len(sorted_values) == 0:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def render():
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    with _registry_lock:
+        metrics = sorted(_registry.values(), key=lambda metric: metric.name)
+    lines = []
+    for metric in metrics:
+        samples = metric.render()
+        if not samples:
+            continue
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def _unescape(text):
+    return re.sub(r"\\(.)", lambda match: "\n" if match.group(1) == "n" else match.group(1), text)
+
+
+def parse_text(text):
+    """{name: {label_text: value}} for every sample in Prometheus text, e.g. fetched from /metrics."""
+    result = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        sample, _, value = line.rpartition(" ")
+        name, brace, labels = sample.partition("{")
+        # Keyed like snapshot(): name=value pairs joined by commas
+        key = ",".join(f"{label}={_unescape(text)}" for label, text in _LABEL_PAIR.findall(labels)) if brace else ""
+        try:
+            result.setdefault(name, {})[key] = float(value)
+        except ValueError:
+            continue
+    return result
+
+
+def snapshot():
+    """{name: {label_text: value}} for every metric; histograms give count, sum and mean."""
+    with _registry_lock:
+        metrics = sorted(_registry.values(), key=lambda metric: metric.name)
+    result = {}
+    for metric in metrics:
+        values = {}
+        for labels, value in sorted(metric.collect().items()):
+            key = ",".join(f"{name}={label}" for name, label in zip(metric.labelnames, labels))
+            if isinstance(metric, Histogram):
+                value = {"count": value["count"], "sum": round(value["sum"], 6),
+                         "mean": round(value["sum"] / value["count"], 6) if value["count"] else 0.0}
+            values[key] = value
+        if values:
+            result[metric.name] = values
+    return result
+
@@ -0,0 +1,54 @@
+# pagination.py
+# Usage: Lazy iteration over Zoom list and report endpoints that use next_page_token
+
+from concurrent.futures import ThreadPoolExecutor
+
+# Zoom caps page_size at 300 for list and report endpoints
+DEFAULT_PAGE_SIZE = 300
+
+
+def paginate(fetch_page, records_key, params=None, page_size=DEFAULT_PAGE_SIZE, prefetch=False):
+    """
+    Follow next_page_token and yield records one at a time.
+
+    fetch_page(params) must return the decoded JSON body of one page. The
+    first page is fetched before this function returns, so authorization
+    and not-found errors surface immediately; later pages are fetched
+    lazily as the caller consumes records. With prefetch=True the next page
+    is requested in the background while the current one is being consumed.
+    At most two pages are held in memory at any time.
+    """
+    base_params = dict(params or {})
+    base_params["page_size"] = page_size
+    first_page = fetch_page(dict(base_params))
+    return _iter_records(fetch_page, records_key, base_params, first_page, prefetch)
+
+
+def _next_params(base_params, page):
+    token = page.get("next_page_token")
+    if not token:
+        return None
+    next_params = dict(base_params)
+    next_params["next_page_token"] = token
+    return next_params
+
+
+def _iter_records(fetch_page, records_key, base_params, page, prefetch):
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        while page is not None:
+            next_params = _next_params(base_params, page)
+            pending = None
+            if next_params is not None and executor is not None:
+                pending = executor.submit(fetch_page, next_params)
+            records = page.get(records_key) or []
+            page = None
+            for record in records:
+                yield record
+            records = None
+            if next_params is None:
+                break
+            page = pending.result() if pending is not None else fetch_page(next_params)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
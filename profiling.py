@@ -0,0 +1,180 @@
+# profiling.py
+# Usage: Run a script or zoom_cli action under a profiler, writing flamegraph-ready output
+#
+#   python profiling.py zoom_dash.py --workers 16                  # cProfile -> zoom_profile.prof
+#   python profiling.py --mode sample --out dash.folded zoom_dash.py
+#   ZOOM_PROFILE=sample python zoom_cli.py batch requests.jsonl    # any zoom_cli action
+#
+# cprofile writes pstats data (snakeviz, flameprof, gprof2dot). sample
+# writes folded stacks, one "frame;frame;frame count" line per stack, for
+# flamegraph.pl, speedscope or inferno.
+
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+MODES = ("cprofile", "sample")
+# Seconds between samples of every thread's stack
+DEFAULT_INTERVAL = 0.005
+DEFAULT_OUTPUTS = {"cprofile": "zoom_profile.prof", "sample": "zoom_profile.folded"}
+
+_active = False
+
+
+class SamplingProfiler:
+    """
+    Samples the stack of every thread from a background thread. Overhead
+    scales with the sampling rate rather than the number of calls, so it
+    suits long concurrent runs where cProfile would distort timings.
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                frames.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(frames))] += 1
+            self.samples += 1
+
+    def write_folded(self, path):
+        with open(path, "w", encoding="utf-8") as handle:
+            for stack, count in self.stacks.most_common():
+                handle.write(f"{stack} {count}\n")
+
+
+class ThreadedProfile:
+    """
+    cProfile for every thread. cProfile only sees the thread that enabled
+    it, so threads started while profiling get their own profiler and the
+    results are merged when written.
+    """
+
+    def __init__(self):
+        self._profiles = []
+        self._lock = threading.Lock()
+        self._stats = None
+
+    def _add(self):
+        import cProfile
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+: one profiler already covers every thread
+            return
+        with self._lock:
+            self._profiles.append(profile)
+
+    def _thread_hook(self, *args):
+        sys.setprofile(None)
+        self._add()
+
+    def start(self):
+        threading.setprofile(self._thread_hook)
+        self._add()
+
+    def stop(self):
+        import pstats
+
+        threading.setprofile(None)
+        with self._lock:
+            profiles = list(self._profiles)
+        for profile in profiles:
+            profile.disable()
+        # Before 3.12, disable() only unhooks the calling thread: threads still running keep
+        # their cProfile hook (and its overhead) until they exit. Their stats are merged now,
+        # so calls made after the stop are not written
+        self._stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            self._stats.add(profile)
+
+    def write(self, path):
+        self._stats.dump_stats(path)
+
+
+@contextmanager
+def profiled(mode="cprofile", out=None, interval=DEFAULT_INTERVAL):
+    """Profile the block with cProfile or the sampling profiler and write the result to `out`."""
+    global _active
+    if mode not in MODES:
+        raise ValueError(f"Unknown profile mode {mode!r}; expected one of {', '.join(MODES)}.")
+    out = out or DEFAULT_OUTPUTS[mode]
+    profiler = SamplingProfiler(interval) if mode == "sample" else ThreadedProfile()
+    started = time.perf_counter()
+    _active = True
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        _active = False
+        if mode == "sample":
+            profiler.write_folded(out)
+        else:
+            profiler.write(out)
+        print(f"Profile ({mode}, {time.perf_counter() - started:.2f}s) written to {out}", file=sys.stderr)
+
+
+def run_main(main, *args, **kwargs):
+    """Call main(), profiled when ZOOM_PROFILE is set (to cprofile or sample; ZOOM_PROFILE_OUT sets the file)."""
+    mode = os.getenv("ZOOM_PROFILE")
+    if not mode or _active:
+        # Already profiled by `python profiling.py script.py`
+        return main(*args, **kwargs)
+    with profiled(mode, os.getenv("ZOOM_PROFILE_OUT"),
+                  float(os.getenv("ZOOM_PROFILE_INTERVAL", DEFAULT_INTERVAL))):
+        return main(*args, **kwargs)
+
+
+def main():
+    import runpy
+
+    parser = argparse.ArgumentParser(description="Run a Python script under a profiler.")
+    parser.add_argument("--mode", choices=MODES, default=os.getenv("ZOOM_PROFILE") or "cprofile")
+    parser.add_argument("--out", help="Output file (default: zoom_profile.prof or zoom_profile.folded).")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="Seconds between samples.")
+    parser.add_argument("script")
+    parser.add_argument("args", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+
+    # Run the script as if started directly: its own argv, directory on sys.path and __main__ name
+    sys.argv = [args.script, *args.args]
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.script)))
+    with profiled(args.mode, args.out, args.interval):
+        try:
+            runpy.run_path(args.script, run_name="__main__")
+        except SystemExit as exc:
+            if exc.code not in (None, 0):
+                raise
+
+
+if __name__ == "__main__":
+    main()
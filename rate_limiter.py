@@ -0,0 +1,298 @@
+# rate_limiter.py
+# Usage: Client-side pacing of Zoom API calls per rate-limit category
+
+import functools
+import heapq
+import itertools
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import http_client
+import metrics
+import tracing
+
+LIGHT = "light"
+MEDIUM = "medium"
+HEAVY = "heavy"
+RESOURCE_INTENSIVE = "resource-intensive"
+
+# Requests per second for a Pro account. Business and higher plans can raise
+# these with configure(); the limiter never paces faster than these ceilings.
+DEFAULT_LIMITS = {
+    LIGHT: 30.0,
+    MEDIUM: 20.0,
+    HEAVY: 10.0,
+    RESOURCE_INTENSIVE: 10.0 / 60,
+}
+# Endpoints are paced as Medium until a response reports their real category
+DEFAULT_CATEGORY = MEDIUM
+
+# Lower values are served first when callers are queued on the same bucket
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 10
+
+# 429s are retried after Retry-After, unless the server asks us to wait longer
+MAX_THROTTLE_RETRIES = 3
+MAX_RETRY_WAIT = 60.0
+
+_ID_SEGMENT = re.compile(r"^(?=.*[\d@=])[^/]+$|^[^/]{20,}$")
+
+REQUEST_SECONDS = metrics.histogram(
+    "zoom_api_request_duration_seconds", "Zoom API HTTP request latency per attempt.", ("route",))
+RESPONSES = metrics.counter(
+    "zoom_api_responses_total", "Zoom API responses by route and status code (error: no response).",
+    ("route", "status"))
+WAIT_SECONDS = metrics.histogram(
+    "zoom_api_rate_limit_wait_seconds", "Time spent waiting for a rate-limit token.", ("category",),
+    buckets=(0.0, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0))
+
+
+# Memoized: called several times per request with a small set of endpoints
+@functools.lru_cache(maxsize=4096)
+def route_key(method, endpoint):
+    """Reduce an endpoint to a template, e.g. GET /v2/report/meetings/{id}/participants."""
+    path = urlsplit(endpoint).path
+    segments = ["{id}" if _ID_SEGMENT.match(segment) and segment != "v2" else segment
+                for segment in path.split("/")]
+    return f"{method.upper()} {'/'.join(segments)}"
+
+
+def parse_retry_after(value, now=None):
+    """Return the number of seconds to wait for a Retry-After header value."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            when = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max((when - now).total_seconds(), 0.0)
+
+
+# --- Token bucket ---
+class TokenBucket:
+    """
+    Token bucket whose rate adapts to throttling: it is halved on every 429
+    and grows back additively on success, up to the configured ceiling.
+    """
+
+    def __init__(self, ceiling):
+        self.ceiling = ceiling
+        self.rate = ceiling
+        self.capacity = max(ceiling, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.waiters = []
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def delay(self, now):
+        """Seconds until a token can be taken; 0 when one is available now."""
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def throttled(self, now, retry_after):
+        self.rate = max(self.rate / 2, self.ceiling / 32)
+        self.tokens = 0.0
+        self.updated = now
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+
+    def succeeded(self):
+        if self.rate < self.ceiling:
+            self.rate = min(self.ceiling, self.rate + self.ceiling / 50)
+
+
+# --- Scheduler ---
+class RateLimiter:
+    """
+    Paces requests per Zoom rate-limit category. Each category has its own
+    adaptive token bucket; callers waiting on the same bucket are served by
+    priority, then in arrival order, so interactive calls jump ahead of
+    queued bulk traffic.
+    """
+
+    def __init__(self, limits=None):
+        self._cond = threading.Condition()
+        self._sequence = itertools.count()
+        self._limits = dict(DEFAULT_LIMITS)
+        self._limits.update(limits or {})
+        self._buckets = {}
+        self._categories = {}
+        self.throttled_count = 0
+        self.wait_seconds = 0.0
+
+    def _bucket(self, category):
+        bucket = self._buckets.get(category)
+        if bucket is None:
+            bucket = self._buckets[category] = TokenBucket(
+                self._limits.get(category, self._limits[DEFAULT_CATEGORY])
+            )
+        return bucket
+
+    def classify(self, method, endpoint):
+        return self._categories.get(route_key(method, endpoint), DEFAULT_CATEGORY)
+
+    def acquire(self, category, priority=PRIORITY_BULK):
+        """Block until a request in `category` may be sent; return seconds waited."""
+        start = time.monotonic()
+        with self._cond:
+            bucket = self._bucket(category)
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(bucket.waiters, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    delay = bucket.delay(now)
+                    if bucket.waiters[0] == ticket:
+                        if delay <= 0:
+                            heapq.heappop(bucket.waiters)
+                            bucket.take()
+                            waited = now - start
+                            self.wait_seconds += waited
+                            self._cond.notify_all()
+                            return waited
+                        self._cond.wait(delay)
+                    else:
+                        self._cond.wait()
+            except BaseException:
+                if ticket in bucket.waiters:
+                    bucket.waiters.remove(ticket)
+                    heapq.heapify(bucket.waiters)
+                    self._cond.notify_all()
+                raise
+
+    def try_acquire(self, category, priority=PRIORITY_BULK):
+        """
+        Non-blocking acquire for asyncio callers: take a token and return 0,
+        or return the number of seconds to sleep before trying again. Queued
+        blocking callers of higher or equal priority keep precedence.
+        """
+        with self._cond:
+            bucket = self._bucket(category)
+            delay = bucket.delay(time.monotonic())
+            if delay <= 0 and (not bucket.waiters or bucket.waiters[0][0] > priority):
+                bucket.take()
+                return 0.0
+            return max(delay, 0.001)
+
+    def record_wait(self, seconds):
+        with self._cond:
+            self.wait_seconds += seconds
+
+    def observe(self, method, endpoint, response):
+        """
+        Learn from a response's rate-limit headers. Returns the number of
+        seconds to wait before retrying a 429, or None for other responses.
+        """
+        headers = response.headers
+        # Category is Light/Medium/Heavy/Resource-intensive; Type says which limit applies:
+        # QPS (per-second pacing) or Daily-limit (a quota that only resets the next day)
+        category = (headers.get("X-RateLimit-Category") or "").strip().lower() or None
+        daily = (headers.get("X-RateLimit-Type") or "").strip().lower() == "daily-limit"
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        remaining = headers.get("X-RateLimit-Remaining")
+        now = time.monotonic()
+        with self._cond:
+            if category:
+                self._categories[route_key(method, endpoint)] = category
+            else:
+                category = self.classify(method, endpoint)
+            bucket = self._bucket(category)
+            if response.status_code == 429:
+                self.throttled_count += 1
+                if daily:
+                    # Sending slower does not help against a daily quota; hold the category until it resets
+                    if retry_after:
+                        bucket.blocked_until = max(bucket.blocked_until, now + retry_after)
+                else:
+                    bucket.throttled(now, retry_after if retry_after is not None else 1.0)
+                self._cond.notify_all()
+                return retry_after if retry_after is not None else 1.0
+            if remaining is not None and remaining.strip() == "0" and retry_after:
+                # Daily quota exhausted: hold the category until it resets
+                bucket.blocked_until = max(bucket.blocked_until, now + retry_after)
+            else:
+                bucket.succeeded()
+        return None
+
+    def stats(self):
+        with self._cond:
+            return {
+                "throttled": self.throttled_count,
+                "wait_seconds": round(self.wait_seconds, 3),
+                "rates": {name: round(bucket.rate, 3) for name, bucket in self._buckets.items()},
+            }
+
+
+_limiter = RateLimiter()
+
+
+def get_limiter():
+    return _limiter
+
+
+def configure(limits=None):
+    """Replace the shared limiter, e.g. configure({"light": 80, "medium": 60})."""
+    global _limiter
+    _limiter = RateLimiter(limits)
+    return _limiter
+
+
+def send(method, url, *, priority=PRIORITY_BULK, **kwargs):
+    """
+    Send a request through the shared session, paced by the shared limiter.
+    429 responses are retried after Retry-After; the final response is
+    returned either way so callers keep their own status handling.
+    """
+    limiter = _limiter
+    session = http_client.get_session()
+    route = route_key(method, url)
+    attempts = 0
+    while True:
+        category = limiter.classify(method, url)
+        with tracing.span("rate_limit.wait", category=category):
+            WAIT_SECONDS.observe(limiter.acquire(category, priority), category)
+        started = time.perf_counter()
+        with tracing.span("http.attempt", route=route) as attempt:
+            try:
+                response = session.request(method, url, **kwargs)
+            except Exception:
+                RESPONSES.inc(route, "error")
+                raise
+            # elapsed ends when the headers are parsed; the rest of the span is reading the body
+            attempt.set(status=response.status_code, headers_ms=round(response.elapsed.total_seconds() * 1000, 3))
+        REQUEST_SECONDS.observe(time.perf_counter() - started, route)
+        RESPONSES.inc(route, str(response.status_code))
+        retry_after = limiter.observe(method, url, response)
+        if retry_after is None or attempts >= MAX_THROTTLE_RETRIES or retry_after > MAX_RETRY_WAIT:
+            return response
+        # Return the connection to the pool even if the body was not read (stream=True)
+        response.close()
+        attempts += 1
@@ -1,14 +1,62 @@
 # request_handler.py
 # Usage: Centralized request handling for Zoom API interactions
 
+import os
+
 import requests
-import access_request
+import decoding
+import metrics
+import rate_limiter
+import retry
+import token_manager
+import tracing
+from decoding import CHUNK_SIZE, DECODE_JSON, DECODE_RAW, RecordStream, select_fields
+from pagination import DEFAULT_PAGE_SIZE, paginate
+from rate_limiter import PRIORITY_BULK, PRIORITY_INTERACTIVE
+from zoom_urls import API_BASE_URL
+from response_cache import DEFAULT_MAX_ENTRIES, DEFAULT_TTL, ResponseCache
+from single_flight import SingleFlight
 
 DEFAULT_TIMEOUT = 10
+USER_INFO_ENDPOINT = f"{API_BASE_URL}/users/me"
+
+UNAUTHORIZED_REFRESHES = metrics.counter(
+    "zoom_api_unauthorized_refreshes_total", "401 responses answered with a token refresh and one retry.")
+
+_auth_source = None
+# Body decoding used when make_request is called without decode=
+_decode_mode = os.getenv("ZOOM_DECODE_MODE", DECODE_JSON)
+
+
+def set_auth_source(source):
+    """
+    Choose where bearer tokens come from: "oauth" (user tokens in .env,
+    the default), "s2s" (Server-to-Server app, cached across processes), or
+    any object with access_token(), refresh(stale_token=...) and
+    can_refresh(). The ZOOM_AUTH_SOURCE environment variable sets the
+    initial choice.
+    """
+    global _auth_source
+    if source == "oauth":
+        _auth_source = token_manager.get_manager()
+    elif source == "s2s":
+        import S2Saccesstoken
+        _auth_source = S2Saccesstoken.get_provider()
+    elif isinstance(source, str):
+        raise ValueError(f"Unknown auth source: {source}")
+    else:
+        _auth_source = source
+    return _auth_source
+
+
+def get_auth_source():
+    if _auth_source is None:
+        return set_auth_source(os.getenv("ZOOM_AUTH_SOURCE", "oauth"))
+    return _auth_source
 
 
 def _build_headers(extra_headers=None):
-    access_token = access_request.access_token
+    access_token = get_auth_source().access_token()
     if not access_token:
         raise RuntimeError("Missing access token. Authorize the application first.")
     headers = {"Authorization": f"Bearer {access_token}"}
@@ -17,15 +65,63 @@ def _build_headers(extra_headers=None):
     return headers
 
 
-def _refresh_tokens():
-    tokens = access_request.refresh_access_token(
-        access_request.client_id,
-        access_request.client_secret,
-        access_request.refresh_token,
-    )
-    access_request.access_token = tokens["access_token"]
-    access_request.refresh_token = tokens["refresh_token"]
-    return tokens
+def _refresh_tokens(stale_token=None):
+    # Coalesced with any refresh already in flight on other threads
+    return get_auth_source().refresh(stale_token=stale_token)
+
+
+def set_decode_mode(mode):
+    """Default body decoding for make_request: "json", "fast" (orjson if installed) or "raw" bytes."""
+    global _decode_mode
+    if mode not in decoding.DECODE_MODES:
+        raise ValueError(f"Unknown decode mode {mode!r}; expected one of {decoding.DECODE_MODES}.")
+    _decode_mode = mode
+
+
+def _send(method, endpoint, *, params, data, json, headers, timeout, priority, stream=False, idempotent=None):
+    """Send one request with auth, pacing, retries and the 401 refresh-and-retry fallback."""
+    with tracing.span("http.send", method=method, endpoint=endpoint):
+        request_headers = _build_headers(headers)
+
+        def attempt():
+            return rate_limiter.send(
+                method,
+                endpoint,
+                priority=priority,
+                params=params,
+                data=data,
+                json=json,
+                headers=request_headers,
+                timeout=timeout,
+                stream=stream,
+            )
+
+        try:
+            response = _retry_engine.execute(method, endpoint, attempt, idempotent)
+        except retry.CircuitOpenError:
+            raise
+        except requests.RequestException as exc:
+            raise requests.RequestException(f"Network error during Zoom API request: {exc}") from exc
+
+        if response.status_code == 401:
+            if not get_auth_source().can_refresh():
+                raise requests.HTTPError(
+                    f"Unauthorized request: {response.text}",
+                    response=response,
+                )
+            # Release the connection of an unread (streamed) 401 body
+            response.close()
+            UNAUTHORIZED_REFRESHES.inc()
+            _refresh_tokens(stale_token=request_headers["Authorization"][len("Bearer "):])
+            request_headers = _build_headers(headers)
+            try:
+                response = _retry_engine.execute(method, endpoint, attempt, idempotent)
+            except retry.CircuitOpenError:
+                raise
+            except requests.RequestException as exc:
+                raise requests.RequestException(f"Network error during Zoom API retry: {exc}") from exc
+
+        return response
 
 
 def make_request(
@@ -38,58 +134,236 @@ def make_request(
     json=None,
     headers=None,
     timeout=DEFAULT_TIMEOUT,
+    priority=PRIORITY_BULK,
+    cache=True,
+    decode=None,
+    idempotent=None,
 ):
+    """
+    Send a Zoom API request and return its decoded body. decode overrides
+    the default set by set_decode_mode(): "json", "fast" (same result,
+    parsed by orjson when installed) or "raw" (the body as bytes, which
+    bypasses the response cache).
+
+    Network errors and 5xx responses are retried (see configure_retries())
+    for GET, PUT and DELETE; pass idempotent=True to also retry a POST or
+    PATCH that is safe to repeat. With set_request_coalescing(), identical
+    GETs made concurrently share one HTTP call and its result.
+    """
+    decode = decode or _decode_mode
     if resource == "user_info":
         method = method or "GET"
-        endpoint = endpoint or "https://api.zoom.us/v2/users/me"
+        endpoint = endpoint or USER_INFO_ENDPOINT
     elif not (method and endpoint):
         raise ValueError("Custom requests require both method and endpoint.")
 
     method = method.upper()
-    request_headers = _build_headers(headers)
-
-    try:
-        response = requests.request(
-            method,
-            endpoint,
-            params=params,
-            data=data,
-            json=json,
-            headers=request_headers,
+    send_args = dict(params=params, data=data, json=json, timeout=timeout, priority=priority,
+                     idempotent=idempotent)
+
+    with tracing.span("zoom.request", method=method, endpoint=endpoint):
+        flights = _single_flight
+        if flights is not None and method == "GET":
+            key = (ResponseCache.make_key(method, endpoint, params, id(get_auth_source())),
+                   tuple(sorted((headers or {}).items())), decode, cache)
+            # A coalesced caller's span has no http.send child: it waited for the leader's call
+            return flights.do(key, lambda: _request(method, endpoint, headers, send_args, cache, decode))
+        return _request(method, endpoint, headers, send_args, cache, decode)
+
+
+def _request(method, endpoint, headers, send_args, cache, decode):
+    response_cache = _response_cache if cache and decode != DECODE_RAW else None
+    cache_key = None
+    if response_cache is not None and method == "GET":
+        cache_key = response_cache.make_key(method, endpoint, send_args["params"], id(get_auth_source()))
+        cached, validators = response_cache.lookup(cache_key)
+        if cached is not None:
+            tracing.current_span().set(cache="hit")
+            return cached
+        if validators:
+            response = _send(method, endpoint, headers={**(headers or {}), **validators}, **send_args)
+            if response.status_code == 304:
+                revalidated = response_cache.revalidate(cache_key, endpoint)
+                if revalidated is not None:
+                    tracing.current_span().set(cache="revalidated")
+                    return revalidated
+                response = _send(method, endpoint, headers=headers, **send_args)
+        else:
+            response = _send(method, endpoint, headers=headers, **send_args)
+    else:
+        response = _send(method, endpoint, headers=headers, **send_args)
+
+    if not response.ok:
+        raise requests.HTTPError(
+            f"Zoom API request failed: {response.status_code} - {response.text}",
+            response=response,
+        )
+
+    if _response_cache is not None and method != "GET":
+        # Any successful write makes cached reads of the same resource stale
+        _response_cache.invalidate(endpoint)
+
+    with tracing.span("http.decode", mode=decode) as current:
+        # Non-streamed bodies are already in memory; this times parsing only
+        current.set(bytes=len(response.content))
+        result = decoding.decode_response(response, decode)
+    if cache_key is not None:
+        response_cache.store(cache_key, endpoint, result, response.headers)
+    return result
+
+
+# --- Request coalescing ---
+# Off by default: coalesced callers receive the same decoded object
+_single_flight = None
+
+
+def set_request_coalescing(enabled=True):
+    """
+    Turn GET coalescing in make_request on or off (the default). While on,
+    callers of an identical GET (endpoint, params, headers and auth source)
+    that is already in flight wait for it and share its decoded result,
+    which must then be treated as read-only.
+    """
+    global _single_flight
+    _single_flight = SingleFlight() if enabled else None
+    return _single_flight
+
+
+def get_coalescing_stats():
+    return _single_flight.stats() if _single_flight is not None else None
+
+
+# --- Retries ---
+_retry_engine = retry.RetryEngine()
+
+
+def configure_retries(
+    max_attempts=retry.DEFAULT_MAX_ATTEMPTS,
+    base_delay=retry.DEFAULT_BASE_DELAY,
+    max_delay=retry.DEFAULT_MAX_DELAY,
+    failure_threshold=retry.DEFAULT_FAILURE_THRESHOLD,
+    reset_timeout=retry.DEFAULT_RESET_TIMEOUT,
+    hedge_after=None,
+    hedge_workers=retry.DEFAULT_HEDGE_WORKERS,
+):
+    """
+    Replace the retry engine used by make_request. max_attempts=1 disables
+    retries. hedge_after (seconds) sends a duplicate GET when the first has
+    not answered by then, trading extra requests for lower tail latency.
+    hedge_workers bounds the hedged attempts in flight; GETs beyond it are
+    sent unhedged on the calling thread.
+    """
+    global _retry_engine
+    _retry_engine.shutdown()
+    _retry_engine = retry.RetryEngine(
+        retry.RetryPolicy(max_attempts=max_attempts, base_delay=base_delay, max_delay=max_delay),
+        failure_threshold=failure_threshold,
+        reset_timeout=reset_timeout,
+        hedge_after=hedge_after,
+        hedge_workers=hedge_workers,
+    )
+    return _retry_engine
+
+
+def get_retry_stats():
+    return _retry_engine.stats()
+
+
+# --- Response cache ---
+_response_cache = None
+
+
+def enable_response_cache(max_entries=DEFAULT_MAX_ENTRIES, default_ttl=DEFAULT_TTL, ttls=None):
+    """
+    Cache GET responses in make_request. ttls maps endpoint path patterns to
+    seconds, e.g. {"*/users/me": 300}; see response_cache.DEFAULT_TTLS.
+    Pass cache=False to make_request to bypass the cache for one call.
+    """
+    global _response_cache
+    _response_cache = ResponseCache(max_entries=max_entries, default_ttl=default_ttl, ttls=ttls)
+    return _response_cache
+
+
+def disable_response_cache():
+    global _response_cache
+    _response_cache = None
+
+
+def get_cache_stats():
+    return _response_cache.stats() if _response_cache is not None else None
+
+
+def get_user_info():
+    return make_request("user_info", priority=PRIORITY_INTERACTIVE)
+
+
+def iter_records(
+    endpoint,
+    records_key,
+    *,
+    params=None,
+    page_size=DEFAULT_PAGE_SIZE,
+    prefetch=False,
+    headers=None,
+    timeout=DEFAULT_TIMEOUT,
+    priority=PRIORITY_BULK,
+    fields=None,
+    stream=False,
+):
+    """
+    Yield every record of a paginated list or report endpoint, e.g.
+    iter_records(".../report/meetings/{id}/participants", "participants").
+
+    fields reduces each record to the named fields. stream=True parses each
+    page incrementally as it arrives instead of decoding it whole, so only
+    one record (plus one network chunk) is held at a time; pages are then
+    fetched sequentially and prefetch is ignored.
+    """
+    if stream:
+        return _iter_streamed(endpoint, records_key, params, page_size, fields, headers, timeout, priority)
+
+    def fetch_page(page_params):
+        page = make_request(
+            method="GET",
+            endpoint=endpoint,
+            params=page_params,
+            headers=headers,
             timeout=timeout,
+            priority=priority,
         )
-    except requests.RequestException as exc:
-        raise requests.RequestException(f"Network error during Zoom API request: {exc}") from exc
-
-    if response.status_code == 401:
-        if not access_request.refresh_token:
-            raise requests.HTTPError(
-                f"Unauthorized request: {response.text}",
-                response=response,
-            )
-        _refresh_tokens()
-        request_headers = _build_headers(headers)
-        try:
-            response = requests.request(
-                method,
-                endpoint,
-                params=params,
-                data=data,
-                json=json,
-                headers=request_headers,
-                timeout=timeout,
-            )
-        except requests.RequestException as exc:
-            raise requests.RequestException(f"Network error during Zoom API retry: {exc}") from exc
+        if fields and page.get(records_key):
+            # The page may be a cached or coalesced object shared with other callers
+            page = {**page, records_key: [select_fields(record, fields) for record in page[records_key]]}
+        return page
+
+    return paginate(fetch_page, records_key, params=params, page_size=page_size, prefetch=prefetch)
+
 
+def _open_stream(endpoint, params, headers, timeout, priority):
+    response = _send("GET", endpoint, params=params, data=None, json=None, headers=headers,
+                     timeout=timeout, priority=priority, stream=True)
     if not response.ok:
         raise requests.HTTPError(
             f"Zoom API request failed: {response.status_code} - {response.text}",
             response=response,
         )
+    return response
 
-    return response.json()
 
+def _iter_streamed(endpoint, records_key, params, page_size, fields, headers, timeout, priority):
+    page_params = {**(params or {}), "page_size": page_size}
+    # The first page is requested up front so errors surface immediately, as in paginate()
+    response = _open_stream(endpoint, page_params, headers, timeout, priority)
 
-def get_user_info():
-    return make_request("user_info")
+    def records(response, page_params):
+        while True:
+            with response:
+                page = RecordStream(response.iter_content(CHUNK_SIZE), records_key, fields)
+                yield from page
+            token = page.meta.get("next_page_token")
+            if not token:
+                return
+            page_params = {**page_params, "next_page_token": token}
+            response = _open_stream(endpoint, page_params, headers, timeout, priority)
+
+    return records(response, page_params)
@@ -0,0 +1,140 @@
+# response_cache.py
+# Usage: Opt-in TTL + LRU cache for GET responses with ETag/Last-Modified revalidation
+
+import threading
+import time
+from collections import OrderedDict
+from fnmatch import fnmatch
+from urllib.parse import urlsplit
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_TTL = 30
+# Endpoints that are polled far more often than they change
+DEFAULT_TTLS = {
+    "*/users/me": 300,
+    "*/accounts/*/settings": 600,
+}
+
+
+class _Entry:
+    __slots__ = ("path", "data", "expires_at", "etag", "last_modified")
+
+    def __init__(self, path, data, expires_at, etag, last_modified):
+        self.path = path
+        self.data = data
+        self.expires_at = expires_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of decoded GET responses.
+
+    Entries are fresh for a per-endpoint TTL (the first matching fnmatch
+    pattern in `ttls`, else `default_ttl`; a TTL of 0 disables caching for
+    that endpoint). Expired entries that carried an ETag or Last-Modified
+    header are kept so the next request can be revalidated with a
+    conditional GET. Cached data is shared between callers and must be
+    treated as read-only.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, default_ttl=DEFAULT_TTL, ttls=None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(method, endpoint, params=None, identity=None):
+        items = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+        return (identity, method.upper(), endpoint, items)
+
+    def ttl_for(self, endpoint):
+        path = urlsplit(endpoint).path
+        for pattern, ttl in self.ttls.items():
+            if fnmatch(path, pattern):
+                return ttl
+        return self.default_ttl
+
+    def lookup(self, key):
+        """
+        Return (data, None) for a fresh hit, (None, validators) when a stale
+        entry can be revalidated, or (None, None) on a miss. validators is a
+        dict of conditional request headers.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, None
+            self._entries.move_to_end(key)
+            if time.monotonic() < entry.expires_at:
+                self.hits += 1
+                return entry.data, None
+            self.misses += 1
+            validators = {}
+            if entry.etag:
+                validators["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                validators["If-Modified-Since"] = entry.last_modified
+            return None, validators or None
+
+    def store(self, key, endpoint, data, headers):
+        ttl = self.ttl_for(endpoint)
+        if ttl <= 0:
+            return
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        entry = _Entry(urlsplit(endpoint).path.rstrip("/"), data, time.monotonic() + ttl, etag, last_modified)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def revalidate(self, key, endpoint):
+        """Mark a stale entry fresh again after a 304 and return its data."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry.expires_at = time.monotonic() + self.ttl_for(endpoint)
+            self._entries.move_to_end(key)
+            self.revalidated += 1
+            return entry.data
+
+    def invalidate(self, endpoint):
+        """Drop every entry for `endpoint` and its sub-resources, whatever the params."""
+        path = urlsplit(endpoint).path.rstrip("/")
+        prefix = f"{path}/"
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if entry.path == path or entry.path.startswith(prefix)]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidated": self.revalidated,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
@@ -0,0 +1,269 @@
+# retry.py
+# Usage: Retries with backoff and jitter, per-endpoint circuit breakers and hedged GETs
+
+import contextvars
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+import metrics
+from rate_limiter import parse_retry_after, route_key
+
+# Methods that may be repeated without changing the result a second time
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 10.0
+# Consecutive failures that open an endpoint's circuit, and how long it stays open
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+# Attempts in flight on the hedging pool; GETs beyond this are sent unhedged on the caller's thread
+DEFAULT_HEDGE_WORKERS = 32
+
+EVENTS = metrics.counter(
+    "zoom_api_retry_events_total",
+    "Retry engine events: retries, hedges, hedge_wins, circuit_opened, short_circuited.", ("event",))
+
+# Failures raised before any request bytes reached Zoom; safe to retry for every method
+_NOT_SENT_ERRORS = (requests.ConnectTimeout,)
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised without sending when an endpoint's circuit breaker is open."""
+
+
+def _not_sent(exc):
+    if isinstance(exc, _NOT_SENT_ERRORS):
+        return True
+    # Refused or unresolvable connections also fail before the request is written
+    reason = str(exc)
+    return isinstance(exc, requests.ConnectionError) and (
+        "NewConnectionError" in reason or "NameResolutionError" in reason
+    )
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter: attempt n waits a random time in
+    [0, min(max_delay, base_delay * 2**n)], or at least Retry-After when a
+    5xx response carries one.
+    """
+
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY,
+                 max_delay=DEFAULT_MAX_DELAY, retry_statuses=RETRY_STATUSES):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = frozenset(retry_statuses)
+
+    def backoff(self, attempt, retry_after=None):
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures; open ->
+    half-open after `reset_timeout`, when a single probe is let through. A
+    successful probe closes the circuit, a failed one reopens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, reset_timeout=DEFAULT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._prober = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                self._prober = threading.get_ident()
+                return True
+            return False
+
+    def release(self):
+        """Give up this thread's half-open probe if it ended without a recorded outcome."""
+        with self._lock:
+            if self._probing and self._prober == threading.get_ident():
+                self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        """Count a failure; returns True if this one opened the circuit."""
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.failures >= self.failure_threshold
+            ):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+
+class RetryEngine:
+    """
+    Runs one logical request through retries, the endpoint's circuit
+    breaker and, for GETs, optional hedging: if the first attempt has not
+    answered after `hedge_after` seconds a duplicate is sent and whichever
+    response arrives first wins.
+
+    Network errors and 5xx responses are retried for idempotent methods.
+    POST and PATCH are only retried when the request provably never reached
+    Zoom (connect timeout or refused connection), unless the caller marks
+    the call idempotent.
+    """
+
+    def __init__(self, policy=None, failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout=DEFAULT_RESET_TIMEOUT, hedge_after=None, hedge_workers=DEFAULT_HEDGE_WORKERS):
+        self.policy = policy or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.hedge_after = hedge_after
+        self._hedge_workers = hedge_workers
+        self._hedge_slots = threading.BoundedSemaphore(hedge_workers)
+        self._executor = None
+        self._breakers = {}
+        self._lock = threading.Lock()
+        self.counters = {"retries": 0, "hedges": 0, "hedge_wins": 0, "circuit_opened": 0, "short_circuited": 0}
+
+    def _count(self, key):
+        with self._lock:
+            self.counters[key] += 1
+        EVENTS.inc(key)
+
+    def breaker(self, method, endpoint):
+        key = route_key(method, endpoint)
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = self._breakers[key] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def execute(self, method, endpoint, send, idempotent=None):
+        """Call send() (one attempt, returning a response) until it succeeds or retries run out."""
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        breaker = self.breaker(method, endpoint)
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                self._count("short_circuited")
+                raise CircuitOpenError(f"Circuit open for {route_key(method, endpoint)}; not sending request.")
+            last_attempt = attempt + 1 >= self.policy.max_attempts
+            try:
+                try:
+                    if self.hedge_after is not None and method == "GET":
+                        response = self._hedged(send)
+                    else:
+                        response = send()
+                except requests.RequestException as exc:
+                    self._failure(breaker)
+                    if last_attempt or not (idempotent or _not_sent(exc)):
+                        raise
+                    delay = self.policy.backoff(attempt)
+                else:
+                    if response.status_code not in self.policy.retry_statuses:
+                        breaker.record_success()
+                        return response
+                    self._failure(breaker)
+                    if last_attempt or not idempotent:
+                        return response
+                    delay = self.policy.backoff(attempt, parse_retry_after(response.headers.get("Retry-After")))
+                    response.close()
+            finally:
+                # Any other exception (no token, a bug in send) must not leave the probe claimed
+                breaker.release()
+            self._count("retries")
+            attempt += 1
+            time.sleep(delay)
+
+    def _failure(self, breaker):
+        if breaker.record_failure():
+            self._count("circuit_opened")
+
+    # --- Hedging ---
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._hedge_workers,
+                                                    thread_name_prefix="hedge")
+            return self._executor
+
+    def _submit(self, send):
+        # Attempts run on pool threads; copying the context keeps their trace spans under the caller's
+        try:
+            future = self._pool().submit(contextvars.copy_context().run, send)
+        except BaseException:
+            self._hedge_slots.release()
+            raise
+        future.add_done_callback(lambda _: self._hedge_slots.release())
+        return future
+
+    def _hedged(self, send):
+        # Never queue behind busy pool threads: that would cap every caller's concurrency at the pool size
+        if not self._hedge_slots.acquire(blocking=False):
+            return send()
+        primary = self._submit(send)
+        done, _ = wait([primary], timeout=self.hedge_after)
+        if done:
+            return primary.result()
+        if not self._hedge_slots.acquire(blocking=False):
+            return primary.result()
+        self._count("hedges")
+        backup = self._submit(send)
+        done, _ = wait([primary, backup], return_when=FIRST_COMPLETED)
+        winner = primary if primary in done else backup
+        if winner.exception() is not None:
+            # The first attempt to finish failed; wait for the other one instead
+            winner = backup if winner is primary else primary
+        loser = backup if winner is primary else primary
+        if winner is backup:
+            self._count("hedge_wins")
+        loser.add_done_callback(_close_result)
+        return winner.result()
+
+    def stats(self):
+        with self._lock:
+            open_circuits = sorted(key for key, breaker in self._breakers.items()
+                                   if breaker.state != CircuitBreaker.CLOSED)
+            return {**self.counters, "open_circuits": open_circuits}
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def _close_result(future):
+    # Return the losing hedge's connection to the pool
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
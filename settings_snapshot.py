@@ -0,0 +1,367 @@
+# settings_snapshot.py
+# Usage: Snapshot account settings across many accounts and diff snapshots for drift
+#
+#   python settings_snapshot.py snapshot --account ACCOUNT_ID ... [--accounts-file ids.txt]
+#   python settings_snapshot.py snapshot --accounts-file ids.txt --option security --workers 16
+#   python settings_snapshot.py diff                 # latest snapshot against the one before
+#   python settings_snapshot.py diff 3 7 --json      # two given snapshot IDs, as NDJSON
+#   python settings_snapshot.py list
+#
+# Each account's settings are split into their top-level groups
+# (schedule_meeting, in_meeting, recording, ...) plus any --option groups.
+# Every group is stored once per distinct content, keyed by its SHA-256
+# hash, and snapshots only record hashes; diffs only open groups whose
+# hash changed.
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+import zlib
+
+import requests
+
+from concurrency import DEFAULT_WORKERS, bounded_map
+
+DEFAULT_PATH = os.getenv(
+    "ZOOM_SETTINGS_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "settings_snapshots.db"),
+)
+
+# Group name for an `option` query, e.g. "option:security"
+OPTION_PREFIX = "option:"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    taken_at REAL NOT NULL,
+    label TEXT
+);
+CREATE TABLE IF NOT EXISTS snapshot_groups (
+    snapshot_id INTEGER NOT NULL,
+    account_id TEXT NOT NULL,
+    group_name TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    PRIMARY KEY (snapshot_id, account_id, group_name)
+);
+CREATE TABLE IF NOT EXISTS snapshot_failures (
+    snapshot_id INTEGER NOT NULL,
+    account_id TEXT NOT NULL,
+    error TEXT NOT NULL,
+    PRIMARY KEY (snapshot_id, account_id)
+);
+"""
+
+
+def canonical(value):
+    """Compact JSON with sorted keys, so equal settings always serialize identically."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def content_hash(value):
+    return hashlib.sha256(canonical(value)).hexdigest()
+
+
+def split_groups(settings):
+    """Break a settings document into {group: value} by top-level key."""
+    return dict(settings) if isinstance(settings, dict) else {"": settings}
+
+
+class SettingsStore:
+    """
+    Content-addressed SQLite store of account settings snapshots. Group
+    contents live in `blobs` (zlib-compressed canonical JSON) keyed by hash,
+    so a group shared by many accounts or unchanged across snapshots is
+    stored once. Use from one thread; take_snapshot() fetches on workers
+    and writes here.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._known = set()
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # --- Snapshots ---
+    def create_snapshot(self, label=None):
+        with self._conn:
+            cursor = self._conn.execute("INSERT INTO snapshots (taken_at, label) VALUES (?, ?)",
+                                        (time.time(), label))
+        return cursor.lastrowid
+
+    def snapshots(self):
+        """[{"id", "taken_at", "label", "accounts", "groups"}, ...], oldest first."""
+        rows = self._conn.execute(
+            "SELECT s.id, s.taken_at, s.label, COUNT(DISTINCT g.account_id), COUNT(g.hash) "
+            "FROM snapshots s LEFT JOIN snapshot_groups g ON g.snapshot_id = s.id "
+            "GROUP BY s.id ORDER BY s.id"
+        )
+        return [dict(zip(("id", "taken_at", "label", "accounts", "groups"), row)) for row in rows]
+
+    def latest_ids(self, count=2):
+        rows = self._conn.execute("SELECT id FROM snapshots ORDER BY id DESC LIMIT ?", (count,))
+        return [row[0] for row in rows][::-1]
+
+    def previous_id(self, snapshot_id):
+        row = self._conn.execute(
+            "SELECT MAX(id) FROM snapshots WHERE id < ?", (snapshot_id,)
+        ).fetchone()
+        return row[0]
+
+    def hashes(self, snapshot_id, account_id=None):
+        """{(account_id, group): hash} for a snapshot, optionally for one account."""
+        query = "SELECT account_id, group_name, hash FROM snapshot_groups WHERE snapshot_id = ?"
+        args = [snapshot_id]
+        if account_id is not None:
+            query += " AND account_id = ?"
+            args.append(account_id)
+        return {(account, group): digest for account, group, digest in self._conn.execute(query, args)}
+
+    def failures(self, snapshot_id):
+        rows = self._conn.execute(
+            "SELECT account_id, error FROM snapshot_failures WHERE snapshot_id = ?", (snapshot_id,)
+        )
+        return dict(rows.fetchall())
+
+    # --- Groups ---
+    def save_account(self, snapshot_id, account_id, groups):
+        """
+        Record an account's groups in a snapshot; returns ({group: hash},
+        number of contents new to the store). Content already stored (by
+        hash) is neither compressed nor written again.
+        """
+        digests = {}
+        rows = []
+        blobs = []
+        for group, value in groups.items():
+            digest = digests[group] = content_hash(value)
+            rows.append((snapshot_id, account_id, group, digest))
+            if digest not in self._known and not self.has_blob(digest):
+                blobs.append((digest, zlib.compress(canonical(value))))
+            self._known.add(digest)
+        with self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO blobs (hash, data) VALUES (?, ?)", blobs)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO snapshot_groups (snapshot_id, account_id, group_name, hash) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        return digests, len(blobs)
+
+    def save_failure(self, snapshot_id, account_id, error):
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO snapshot_failures (snapshot_id, account_id, error) VALUES (?, ?, ?)",
+                (snapshot_id, account_id, error),
+            )
+
+    def has_blob(self, digest):
+        return self._conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (digest,)).fetchone() is not None
+
+    def load(self, digest):
+        row = self._conn.execute("SELECT data FROM blobs WHERE hash = ?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(digest)
+        return json.loads(zlib.decompress(row[0]))
+
+    def stats(self):
+        counts = self._conn.execute(
+            "SELECT (SELECT COUNT(*) FROM snapshots), (SELECT COUNT(*) FROM snapshot_groups), "
+            "(SELECT COUNT(*) FROM blobs), (SELECT COALESCE(SUM(LENGTH(data)), 0) FROM blobs)"
+        ).fetchone()
+        return dict(zip(("snapshots", "group_refs", "distinct_groups", "blob_bytes"), counts))
+
+
+def fetch_groups(account_id, fetch, options=()):
+    """One account's settings as {group: value}: the default document's groups plus each option."""
+    groups = split_groups(fetch(account_id, None))
+    for option in options:
+        groups[OPTION_PREFIX + option] = fetch(account_id, option)
+    return groups
+
+
+def take_snapshot(store, account_ids, fetch, options=(), workers=DEFAULT_WORKERS, label=None):
+    """
+    Fetch every account's settings with up to `workers` accounts in flight
+    and record them as a new snapshot. fetch(account_id, option) returns a
+    settings document (option None for the default one) or raises. Returns
+    a summary dict including the snapshot id.
+    """
+    snapshot_id = store.create_snapshot(label)
+    previous = store.previous_id(snapshot_id)
+    previous_hashes = store.hashes(previous) if previous is not None else {}
+    summary = {"snapshot_id": snapshot_id, "accounts": 0, "failed": 0, "groups": 0,
+               "unchanged": 0, "new_contents": 0}
+    for account_id, groups, error in bounded_map(lambda account: fetch_groups(account, fetch, options),
+                                                 account_ids, workers, ordered=False):
+        if error is not None:
+            summary["failed"] += 1
+            store.save_failure(snapshot_id, account_id, str(error))
+            continue
+        summary["accounts"] += 1
+        summary["groups"] += len(groups)
+        digests, new_contents = store.save_account(snapshot_id, account_id, groups)
+        summary["new_contents"] += new_contents
+        summary["unchanged"] += sum(1 for group, digest in digests.items()
+                                    if previous_hashes.get((account_id, group)) == digest)
+    return summary
+
+
+# --- Diffs ---
+def diff_values(old, new, path=""):
+    """
+    Structural diff of two JSON values as a list of
+    {"path", "op": "added" | "removed" | "changed", "old", "new"}. Objects
+    are compared key by key; arrays and scalars as whole values.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = []
+        for key in sorted(old.keys() | new.keys()):
+            child = f"{path}.{key}" if path else key
+            if key not in new:
+                changes.append({"path": child, "op": "removed", "old": old[key], "new": None})
+            elif key not in old:
+                changes.append({"path": child, "op": "added", "old": None, "new": new[key]})
+            elif old[key] != new[key]:
+                changes.extend(diff_values(old[key], new[key], child))
+        return changes
+    if old == new:
+        return []
+    return [{"path": path, "op": "changed", "old": old, "new": new}]
+
+
+def diff_snapshots(store, old_id, new_id):
+    """
+    Yield {"account_id", "group", "status", "changes"} for every group that
+    differs between two snapshots; status is "added", "removed" or
+    "changed". Groups with equal hashes are skipped without being loaded.
+    Accounts that failed in either snapshot are left out, since a missing
+    fetch is not a configuration change.
+    """
+    old_hashes = store.hashes(old_id)
+    new_hashes = store.hashes(new_id)
+    failed = store.failures(old_id).keys() | store.failures(new_id).keys()
+    for key in sorted(old_hashes.keys() | new_hashes.keys()):
+        account_id, group = key
+        old_digest, new_digest = old_hashes.get(key), new_hashes.get(key)
+        if old_digest == new_digest or account_id in failed:
+            continue
+        old_value = store.load(old_digest) if old_digest else None
+        new_value = store.load(new_digest) if new_digest else None
+        if old_digest is None:
+            status, changes = "added", [{"path": group, "op": "added", "old": None, "new": new_value}]
+        elif new_digest is None:
+            status, changes = "removed", [{"path": group, "op": "removed", "old": old_value, "new": None}]
+        else:
+            status, changes = "changed", diff_values(old_value, new_value, group)
+        yield {"account_id": account_id, "group": group, "status": status, "changes": changes}
+
+
+# --- Command line ---
+def _account_ids(args):
+    account_ids = list(args.account or [])
+    if args.accounts_file:
+        source = sys.stdin if args.accounts_file == "-" else open(args.accounts_file, encoding="utf-8")
+        with source:
+            account_ids.extend(line.strip() for line in source if line.strip() and not line.startswith("#"))
+    # Keep the first occurrence of each ID
+    return list(dict.fromkeys(account_ids))
+
+
+def _snapshot(store, args):
+    from getaccountsettings import fetch_account_settings
+
+    account_ids = _account_ids(args)
+    if not account_ids:
+        print("No account IDs given; use --account or --accounts-file.")
+        return 1
+    summary = take_snapshot(store, account_ids,
+                            lambda account_id, option: fetch_account_settings(account_id, option),
+                            options=args.option or (), workers=args.workers, label=args.label)
+    print(f"Snapshot {summary['snapshot_id']}: {summary['accounts']} accounts, {summary['groups']} groups "
+          f"({summary['unchanged']} unchanged since the previous snapshot, "
+          f"{summary['new_contents']} new contents stored), {summary['failed']} accounts failed.")
+    return 1 if summary["failed"] else 0
+
+
+def _diff(store, args):
+    if args.old is not None and args.new is not None:
+        old_id, new_id = args.old, args.new
+    else:
+        ids = store.latest_ids(2)
+        if len(ids) < 2:
+            print("Need at least two snapshots to diff.")
+            return 1
+        old_id, new_id = ids
+    differences = 0
+    for difference in diff_snapshots(store, old_id, new_id):
+        differences += 1
+        if args.json:
+            print(json.dumps(difference))
+            continue
+        print(f"{difference['account_id']} {difference['group']} ({difference['status']})")
+        for change in difference["changes"]:
+            print(f"  {change['op']:8} {change['path']}: {json.dumps(change['old'])} -> "
+                  f"{json.dumps(change['new'])}")
+    if not args.json:
+        print(f"{differences} groups differ between snapshots {old_id} and {new_id}.")
+    return 0
+
+
+def _list(store, args):
+    for snapshot in store.snapshots():
+        taken = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot["taken_at"]))
+        label = f" {snapshot['label']}" if snapshot["label"] else ""
+        print(f"{snapshot['id']:>5}  {taken}  {snapshot['accounts']} accounts, {snapshot['groups']} groups{label}")
+    stats = store.stats()
+    print(f"{stats['distinct_groups']} distinct group contents, {stats['blob_bytes']} bytes compressed.")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snapshot and diff Zoom account settings.")
+    parser.add_argument("--db", default=DEFAULT_PATH, help="Snapshot database (default: ZOOM_SETTINGS_DB).")
+    commands = parser.add_subparsers(dest="command", required=True)
+    snapshot = commands.add_parser("snapshot", help="Fetch settings for many accounts into a new snapshot.")
+    snapshot.add_argument("--account", action="append", help="Account ID (repeatable; 'me' for your own).")
+    snapshot.add_argument("--accounts-file", help="File with one account ID per line ('-' for stdin).")
+    snapshot.add_argument("--option", action="append",
+                          help="Extra settings option group to fetch, e.g. security (repeatable).")
+    snapshot.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Accounts fetched in parallel.")
+    snapshot.add_argument("--label")
+    diff = commands.add_parser("diff", help="Show drift between two snapshots (default: the latest two).")
+    diff.add_argument("old", nargs="?", type=int)
+    diff.add_argument("new", nargs="?", type=int)
+    diff.add_argument("--json", action="store_true", help="One NDJSON record per differing group.")
+    commands.add_parser("list", help="List stored snapshots.")
+    args = parser.parse_args(argv)
+
+    handlers = {"snapshot": _snapshot, "diff": _diff, "list": _list}
+    with SettingsStore(args.db) as store:
+        try:
+            return handlers[args.command](store, args)
+        except requests.RequestException as exc:
+            print(f"Settings snapshot failed: {exc}")
+            return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+# single_flight.py
+# Usage: Coalesce identical concurrent calls into one
+#
+#   flights = SingleFlight()
+#   data = flights.do(("GET", url), lambda: fetch(url))   # concurrent callers share one fetch
+
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time. Callers that arrive while a
+    call with the same key is in flight wait for it and receive its result
+    (or its exception) instead of making their own. Nothing is remembered
+    after the call finishes, so results are never stale; results are shared
+    between callers and must be treated as read-only.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            requested = self.calls + self.coalesced
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+                "saved_ratio": round(self.coalesced / requested, 3) if requested else 0.0,
+            }
@@ -0,0 +1,344 @@
+# sync_store.py
+# Usage: Incremental local SQLite store for meetings and participant reports
+#
+#   store = SyncStore()                       # ZOOM_SYNC_DB or ./zoom_sync.db
+#   sync(store, fetch_meetings, fetch_participants)
+#   for meeting in store.meetings():
+#       names = store.participant_names(meeting["uuid"])
+
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+
+from concurrency import DEFAULT_WORKERS, bounded_map
+
+DEFAULT_PATH = os.getenv(
+    "ZOOM_SYNC_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "zoom_sync.db"),
+)
+
+# Watermark kinds, one row per user and kind in sync_state
+MEETINGS = "meetings"
+PARTICIPANTS = "participants"
+
+# List type whose meetings have all ended; its reports never change again
+PREVIOUS_MEETINGS = "previous_meetings"
+# Report data settles a while after a meeting ends; reports of meetings that
+# ended more recently are stored but fetched again on the next sync
+REPORT_GRACE = timedelta(minutes=30)
+# The meeting list's 'from' filter is a date, so re-list one day of overlap
+WATERMARK_OVERLAP = timedelta(days=1)
+# Report statuses that will not change on retry (e.g. 404 for a deleted meeting)
+PERMANENT_FAILURE_STATUSES = (400, 404)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sync_state (
+    user_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    watermark TEXT,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (user_id, kind)
+);
+CREATE TABLE IF NOT EXISTS meetings (
+    uuid TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    meeting_id TEXT NOT NULL,
+    topic TEXT,
+    start_time TEXT,
+    ended INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS meetings_user_start ON meetings (user_id, start_time);
+CREATE TABLE IF NOT EXISTS participant_reports (
+    meeting_uuid TEXT PRIMARY KEY,
+    complete INTEGER NOT NULL,
+    participant_count INTEGER NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS report_failures (
+    meeting_uuid TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    failed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS participants (
+    meeting_uuid TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (meeting_uuid, position)
+);
+"""
+
+
+def parse_time(value):
+    """Parse Zoom's ISO 8601 timestamps ('2026-01-01T10:00:00Z'); None if missing."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def meeting_ended(meeting, now=None, listed_as=None):
+    """True once a meeting's participant report can no longer change."""
+    if listed_as == PREVIOUS_MEETINGS:
+        return True
+    start = parse_time(meeting.get("start_time"))
+    if start is None:
+        return False
+    end = start + timedelta(minutes=meeting.get("duration") or 0)
+    return (now or datetime.now(timezone.utc)) >= end + REPORT_GRACE
+
+
+def report_id(meeting):
+    """Path segment for a meeting instance's report: its UUID, double-encoded where Zoom requires it."""
+    uuid = meeting.get("uuid")
+    if not uuid:
+        return str(meeting["id"])
+    if uuid.startswith("/") or "//" in uuid:
+        return quote(quote(uuid, safe=""), safe="")
+    return quote(uuid, safe="")
+
+
+class SyncStore:
+    """
+    SQLite store of meetings and their participant reports with a sync
+    watermark per user and kind. Completed reports (of meetings that have
+    ended) are written once and never fetched again. Use from one thread;
+    sync() does its network fan-out on worker threads and writes here.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # --- Watermarks ---
+    def get_watermark(self, user_id, kind):
+        row = self._conn.execute(
+            "SELECT watermark FROM sync_state WHERE user_id = ? AND kind = ?", (user_id, kind)
+        ).fetchone()
+        return row["watermark"] if row else None
+
+    def set_watermark(self, user_id, kind, watermark):
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO sync_state (user_id, kind, watermark, synced_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (user_id, kind) DO UPDATE SET watermark = excluded.watermark, "
+                "synced_at = excluded.synced_at",
+                (user_id, kind, watermark, time.time()),
+            )
+
+    # --- Meetings ---
+    def upsert_meetings(self, user_id, meetings, listed_as=None, now=None):
+        """Insert or update meetings; returns the number of meetings that were new."""
+        rows = [
+            (meeting.get("uuid") or str(meeting["id"]), user_id, str(meeting["id"]), meeting.get("topic"),
+             meeting.get("start_time"), int(meeting_ended(meeting, now, listed_as)), json.dumps(meeting))
+            for meeting in meetings
+        ]
+        with self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO meetings (uuid, user_id, meeting_id, topic, start_time, ended, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            added = self._conn.total_changes - before
+            # Existing rows: refresh details and latch 'ended' once it is set
+            self._conn.executemany(
+                "UPDATE meetings SET topic = ?, start_time = ?, ended = MAX(ended, ?), data = ? WHERE uuid = ?",
+                [(topic, start, ended, data, uuid) for uuid, _, _, topic, start, ended, data in rows],
+            )
+        return added
+
+    def refresh_ended(self, user_id, now=None):
+        """Mark stored meetings whose end (plus REPORT_GRACE) has passed."""
+        pending = self._conn.execute(
+            "SELECT uuid, data FROM meetings WHERE user_id = ? AND ended = 0", (user_id,)
+        ).fetchall()
+        ended = [(row["uuid"],) for row in pending if meeting_ended(json.loads(row["data"]), now)]
+        with self._conn:
+            self._conn.executemany("UPDATE meetings SET ended = 1 WHERE uuid = ?", ended)
+        return len(ended)
+
+    def meetings(self, user_id="me"):
+        """Stored meetings for a user, oldest first, as the API returned them."""
+        rows = self._conn.execute(
+            "SELECT data FROM meetings WHERE user_id = ? ORDER BY start_time, uuid", (user_id,)
+        )
+        return [json.loads(row["data"]) for row in rows]
+
+    def meetings_needing_reports(self, user_id, since=None):
+        """
+        (meeting, ended) pairs for every meeting without a complete report
+        or a permanent failure. With `since`, only meetings that started at
+        or after it (or have no start time) are considered.
+        """
+        rows = self._conn.execute(
+            "SELECT m.data, m.ended FROM meetings m "
+            "LEFT JOIN participant_reports r ON r.meeting_uuid = m.uuid "
+            "LEFT JOIN report_failures f ON f.meeting_uuid = m.uuid "
+            "WHERE m.user_id = ? AND (r.complete IS NULL OR r.complete = 0) AND f.meeting_uuid IS NULL "
+            "AND (? IS NULL OR m.start_time IS NULL OR m.start_time >= ?) "
+            "ORDER BY m.start_time, m.uuid",
+            (user_id, since, since),
+        ).fetchall()
+        return [(json.loads(row["data"]), bool(row["ended"])) for row in rows]
+
+    # --- Participant reports ---
+    def save_report(self, meeting, participants, complete):
+        uuid = meeting.get("uuid") or str(meeting["id"])
+        with self._conn:
+            self._conn.execute("DELETE FROM participants WHERE meeting_uuid = ?", (uuid,))
+            self._conn.executemany(
+                "INSERT INTO participants (meeting_uuid, position, name, data) VALUES (?, ?, ?, ?)",
+                [(uuid, position, participant.get("name"), json.dumps(participant))
+                 for position, participant in enumerate(participants)],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO participant_reports "
+                "(meeting_uuid, complete, participant_count, fetched_at) VALUES (?, ?, ?, ?)",
+                (uuid, int(complete), len(participants), time.time()),
+            )
+
+    def mark_report_failed(self, meeting, status):
+        """Record that a report cannot be fetched, so later syncs stop requesting it."""
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO report_failures (meeting_uuid, status, failed_at) VALUES (?, ?, ?)",
+                (meeting.get("uuid") or str(meeting["id"]), status, time.time()),
+            )
+
+    def has_report(self, meeting_uuid):
+        row = self._conn.execute(
+            "SELECT 1 FROM participant_reports WHERE meeting_uuid = ?", (meeting_uuid,)
+        ).fetchone()
+        return row is not None
+
+    def participants(self, meeting_uuid):
+        """Stored participant records of one meeting, or None if its report was never fetched."""
+        if not self.has_report(meeting_uuid):
+            return None
+        rows = self._conn.execute(
+            "SELECT data FROM participants WHERE meeting_uuid = ? ORDER BY position", (meeting_uuid,)
+        )
+        return [json.loads(row["data"]) for row in rows]
+
+    def participant_names(self, meeting_uuid):
+        if not self.has_report(meeting_uuid):
+            return None
+        rows = self._conn.execute(
+            "SELECT name FROM participants WHERE meeting_uuid = ? ORDER BY position", (meeting_uuid,)
+        )
+        return [row["name"] for row in rows]
+
+    def stats(self):
+        counts = self._conn.execute(
+            "SELECT (SELECT COUNT(*) FROM meetings) AS meetings, "
+            "(SELECT COUNT(*) FROM participant_reports WHERE complete = 1) AS complete_reports, "
+            "(SELECT COUNT(*) FROM participant_reports WHERE complete = 0) AS partial_reports, "
+            "(SELECT COUNT(*) FROM report_failures) AS failed_reports, "
+            "(SELECT COUNT(*) FROM participants) AS participants"
+        ).fetchone()
+        return dict(counts)
+
+
+def sync(store, fetch_meetings, fetch_participants, user_id="me", list_type=PREVIOUS_MEETINGS,
+         workers=DEFAULT_WORKERS, now=None):
+    """
+    Bring the store up to date and return a summary dict.
+
+    fetch_meetings(params) returns an iterable of meetings (or None on
+    failure) and is called with the list 'type' and, after the first sync,
+    a 'from' date just before the meetings watermark. fetch_participants(
+    report_id) returns an iterable of participant records (or None). Only
+    reports that are not yet complete are requested, up to `workers` at
+    a time; each report is committed as soon as it arrives, so an
+    interrupted sync resumes where it stopped. Meetings before the
+    participants watermark all have complete reports and are not looked
+    at. A report that fails with an HTTP error whose status is in
+    PERMANENT_FAILURE_STATUSES is recorded and not requested again.
+    """
+    now = now or datetime.now(timezone.utc)
+    summary = {"meetings_listed": 0, "meetings_added": 0, "reports_fetched": 0,
+               "reports_completed": 0, "reports_failed": 0, "reports_unavailable": 0}
+
+    # 1. Meetings added since the last sync
+    params = {"type": list_type}
+    watermark = store.get_watermark(user_id, MEETINGS)
+    since = parse_time(watermark)
+    if since is not None:
+        params["from"] = (since - WATERMARK_OVERLAP).date().isoformat()
+    meetings = fetch_meetings(params)
+    if meetings is None:
+        raise RuntimeError("Unable to retrieve meetings")
+    meetings = list(meetings)
+    summary["meetings_listed"] = len(meetings)
+    summary["meetings_added"] = store.upsert_meetings(user_id, meetings, list_type, now)
+    listed_starts = [meeting["start_time"] for meeting in meetings if meeting.get("start_time")]
+    starts = list(listed_starts)
+    if watermark:
+        starts.append(watermark)
+    if starts:
+        store.set_watermark(user_id, MEETINGS, max(starts))
+
+    # 2. Reports of meetings that ended, or are still running, since the last sync
+    store.refresh_ended(user_id, now)
+    reports_since = store.get_watermark(user_id, PARTICIPANTS)
+    if reports_since is not None and listed_starts:
+        # Meetings can be listed for the first time inside the re-listed overlap
+        reports_since = min([reports_since] + listed_starts)
+    pending = store.meetings_needing_reports(user_id, reports_since)
+
+    def fetch(item):
+        meeting, _ = item
+        participants = fetch_participants(report_id(meeting))
+        if participants is None:
+            raise RuntimeError(f"Unable to retrieve participants for {meeting.get('id')}")
+        return list(participants)
+
+    incomplete_starts = []
+    for (meeting, ended), participants, error in bounded_map(fetch, pending, workers, ordered=False):
+        if error is not None:
+            summary["reports_failed"] += 1
+            status = getattr(getattr(error, "response", None), "status_code", None)
+            if status in PERMANENT_FAILURE_STATUSES:
+                store.mark_report_failed(meeting, status)
+                summary["reports_unavailable"] += 1
+            else:
+                incomplete_starts.append(meeting.get("start_time"))
+            continue
+        store.save_report(meeting, participants, complete=ended)
+        summary["reports_fetched"] += 1
+        if ended:
+            summary["reports_completed"] += 1
+        else:
+            incomplete_starts.append(meeting.get("start_time"))
+
+    # Every report of a meeting that started before this watermark is complete
+    if any(start is None for start in incomplete_starts):
+        participants_watermark = None
+    elif incomplete_starts:
+        participants_watermark = min(incomplete_starts)
+    else:
+        participants_watermark = store.get_watermark(user_id, MEETINGS)
+    store.set_watermark(user_id, PARTICIPANTS, participants_watermark)
+    return summary
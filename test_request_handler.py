@@ -0,0 +1,105 @@
+# test_request_handler.py
+# Usage: python test_request_handler.py   (or: python -m pytest test_request_handler.py)
+#
+# Checks that iter_records(..., fields=...) leaves shared pages intact: a page
+# served from the response cache or to a coalesced caller is the same object
+# every caller receives, so projecting it must not modify it.
+
+import json
+import threading
+import time
+
+import requests
+
+import request_handler
+
+ENDPOINT = "https://api.zoom.us/v2/report/meetings/test-meeting/participants"
+PARTICIPANTS = [
+    {"id": "p1", "name": "Ada", "user_email": "ada@example.com", "duration": 60},
+    {"id": "p2", "name": "Grace", "user_email": "grace@example.com", "duration": 120},
+]
+
+
+class _StaticAuth:
+    def access_token(self):
+        return "test-token"
+
+    def refresh(self, stale_token=None):
+        return "test-token"
+
+    def can_refresh(self):
+        return False
+
+
+class _FakeSend:
+    """Stands in for request_handler._send, answering every call with one participants page."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def __call__(self, method, endpoint, headers=None, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        response = requests.Response()
+        response.status_code = 200
+        response.headers["Content-Type"] = "application/json"
+        response._content = json.dumps({"participants": PARTICIPANTS, "next_page_token": ""}).encode("utf-8")
+        return response
+
+
+def _install(send, cache):
+    originals = (request_handler._send, request_handler._response_cache, request_handler._auth_source)
+    request_handler._send = send
+    request_handler._response_cache = None
+    if cache:
+        request_handler.enable_response_cache(default_ttl=60)
+    request_handler.set_auth_source(_StaticAuth())
+    request_handler.set_request_coalescing(True)
+    return originals
+
+
+def _restore(originals):
+    request_handler._send, request_handler._response_cache, request_handler._auth_source = originals
+
+
+def test_fields_leave_cached_page_intact():
+    send = _FakeSend()
+    originals = _install(send, cache=True)
+    try:
+        projected = list(request_handler.iter_records(ENDPOINT, "participants", fields=["name"]))
+        full = list(request_handler.iter_records(ENDPOINT, "participants"))
+    finally:
+        _restore(originals)
+    assert send.calls == 1, "second read should be served from the cache"
+    assert projected == [{"name": "Ada"}, {"name": "Grace"}]
+    assert full == PARTICIPANTS
+
+
+def test_fields_leave_coalesced_page_intact():
+    send = _FakeSend(delay=0.2)
+    originals = _install(send, cache=False)
+    results = {}
+
+    def read(name, fields):
+        results[name] = list(request_handler.iter_records(ENDPOINT, "participants", fields=fields))
+
+    try:
+        projecting = threading.Thread(target=read, args=("projected", ["name"]))
+        projecting.start()
+        time.sleep(0.05)
+        # Joins the projecting caller's in-flight GET and receives the same page object
+        read("full", None)
+        projecting.join()
+    finally:
+        _restore(originals)
+    assert send.calls == 1, "concurrent identical GETs should share one call"
+    assert results["projected"] == [{"name": "Ada"}, {"name": "Grace"}]
+    assert results["full"] == PARTICIPANTS
+
+
+if __name__ == "__main__":
+    test_fields_leave_cached_page_intact()
+    print("Cached page intact: OK")
+    test_fields_leave_coalesced_page_intact()
+    print("Coalesced page intact: OK")
@@ -0,0 +1,247 @@
+# token_manager.py
+# Usage: Proactive, single-flight OAuth access token refresh
+
+import threading
+import time
+
+import access_request
+import token_store
+import tracing
+
+# Refresh this many seconds before the access token expires (Zoom issues 1 hour tokens)
+REFRESH_MARGIN = 300
+# Retry delay for a failed background refresh; requests fall back to the 401 path meanwhile
+RETRY_DELAY = 30
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.tokens = None
+        self.error = None
+
+
+class TokenManager:
+    """
+    Owns an access/refresh token pair. Tokens are refreshed in the background
+    shortly before they expire, and concurrent refreshes (proactive or after
+    a 401) are coalesced into a single call to refresh_func so parallel
+    workers never invalidate each other's refresh tokens.
+
+    refresh_func(refresh_token) must return Zoom's token response dict.
+    on_update(tokens) is called after every successful refresh or set_tokens().
+
+    With a `store` (see token_store), tokens are shared between processes:
+    the store's tokens take precedence over the ones passed in, tokens saved
+    by another process are picked up on the next access_token() call, and a
+    refresh first re-reads the store under its inter-process lock, so only
+    one process spends each refresh token. Every refresh is saved to the
+    store in a single atomic update.
+    """
+
+    def __init__(self, refresh_func, access_token=None, refresh_token=None,
+                 expires_in=None, margin=REFRESH_MARGIN, on_update=None, background=True, store=None):
+        self._refresh_func = refresh_func
+        self._on_update = on_update
+        self._margin = margin
+        self._background = background
+        self._store = store
+        self._lock = threading.Lock()
+        self._flight = None
+        self._timer = None
+        self._access_token = access_token
+        self._refresh_token = refresh_token
+        self._expires_at = None
+        # monotonic time of the last failed refresh; proactive refreshes wait RETRY_DELAY after it
+        self._failed_at = None
+        self.refresh_count = 0
+        # Total wall time spent in refresh_func, for overhead measurements
+        self.refresh_seconds = 0.0
+        if expires_in is not None:
+            self._expires_at = time.time() + expires_in
+            self._schedule()
+        if store is not None:
+            self._sync_from_store()
+
+    @property
+    def refresh_token(self):
+        return self._refresh_token
+
+    @property
+    def expires_at(self):
+        return self._expires_at
+
+    def can_refresh(self):
+        return bool(self._refresh_token)
+
+    def _needs_refresh(self):
+        return (
+            self._expires_at is not None
+            and self._refresh_token is not None
+            and time.time() >= self._expires_at - self._margin
+            and (self._failed_at is None or time.monotonic() - self._failed_at >= RETRY_DELAY)
+        )
+
+    def _sync_from_store(self):
+        record = self._store.load()
+        if record and record["access_token"] != self._access_token:
+            with self._lock:
+                self._install(record)
+        return record
+
+    def access_token(self):
+        """Return a usable access token, refreshing first if it is about to expire."""
+        if self._store is not None:
+            self._sync_from_store()
+        token = self._access_token
+        if self._needs_refresh():
+            try:
+                self.refresh(stale_token=token)
+            except Exception:
+                # The current token may still be valid; further proactive attempts wait
+                # RETRY_DELAY, and an expired token still refreshes through the 401 path
+                pass
+            token = self._access_token
+        return token
+
+    def set_tokens(self, tokens):
+        """Install a fresh token response, e.g. from exchange_code_for_tokens()."""
+        if self._store is not None:
+            self._store.save(tokens)
+        with self._lock:
+            self._install(tokens)
+        if self._on_update:
+            self._on_update(tokens)
+
+    def _install(self, tokens):
+        self._access_token = tokens["access_token"]
+        self._refresh_token = tokens.get("refresh_token", self._refresh_token)
+        expires_in = tokens.get("expires_in")
+        if tokens.get("expires_at") is not None:
+            self._expires_at = tokens["expires_at"]
+        else:
+            self._expires_at = time.time() + float(expires_in) if expires_in else None
+        self._schedule()
+
+    def refresh(self, stale_token=None):
+        """
+        Refresh the tokens once for all concurrent callers. If stale_token is
+        given and another caller has already replaced it, no new refresh is
+        made and the current tokens are returned.
+        """
+        with self._lock:
+            if stale_token is not None and stale_token != self._access_token:
+                return self._current()
+            flight = self._flight
+            leader = flight is None
+            if leader:
+                flight = self._flight = _Flight()
+                refresh_token = self._refresh_token
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.tokens
+
+        started = time.monotonic()
+        try:
+            with tracing.span("token.refresh", shared=self._store is not None):
+                if self._store is None:
+                    tokens = self._refresh_func(refresh_token)
+                else:
+                    tokens = self._refresh_shared(stale_token, refresh_token)
+        except BaseException as exc:
+            flight.error = exc
+            with self._lock:
+                self.refresh_seconds += time.monotonic() - started
+                self._failed_at = time.monotonic()
+                self._flight = None
+            flight.done.set()
+            self._schedule(RETRY_DELAY)
+            raise
+        with self._lock:
+            self._install(tokens)
+            self.refresh_count += 1
+            self.refresh_seconds += time.monotonic() - started
+            self._failed_at = None
+            self._flight = None
+        flight.tokens = tokens
+        flight.done.set()
+        if self._on_update:
+            self._on_update(tokens)
+        return tokens
+
+    def _refresh_shared(self, stale_token, refresh_token):
+        with self._store.lock():
+            record = self._store.load()
+            if record:
+                if stale_token is not None and record["access_token"] != stale_token and (
+                    record["expires_at"] is None or time.time() < record["expires_at"] - self._margin
+                ):
+                    # Another process refreshed while we waited for the lock
+                    tracing.current_span().set(adopted=True)
+                    return record
+                refresh_token = record["refresh_token"] or refresh_token
+            return self._store.save(self._refresh_func(refresh_token))
+
+    def _current(self):
+        return {"access_token": self._access_token, "refresh_token": self._refresh_token}
+
+    # --- Background refresh ---
+    def _schedule(self, delay=None):
+        if not self._background:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if delay is None:
+            if self._expires_at is None or self._refresh_token is None:
+                return
+            delay = max(self._expires_at - self._margin - time.time(), 0)
+        timer = threading.Timer(delay, self._background_refresh)
+        timer.daemon = True
+        self._timer = timer
+        timer.start()
+
+    def _background_refresh(self):
+        try:
+            self.refresh(stale_token=self._access_token)
+        except Exception as exc:
+            print(f"Background token refresh failed: {exc}")
+
+    def stop(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def _refresh_user_tokens(refresh_token):
+    return access_request.refresh_access_token(
+        access_request.client_id,
+        access_request.client_secret,
+        refresh_token,
+    )
+
+
+def get_manager():
+    """
+    Return the shared manager for the user-OAuth tokens, kept in
+    token_store.get_store(). Tokens in .env (ACCESS_TOKEN/REFRESH_TOKEN)
+    are only used until the first refresh or authorization is saved.
+    """
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                tokens = access_request.env_tokens()
+                _manager = TokenManager(
+                    _refresh_user_tokens,
+                    access_token=tokens["access_token"],
+                    refresh_token=tokens["refresh_token"],
+                    store=token_store.get_store(),
+                )
+    return _manager
@@ -0,0 +1,177 @@
+# token_store.py
+# Usage: Shared, multi-process store for user-OAuth tokens
+#
+#   store = get_store()                  # ZOOM_TOKEN_STORE or ./.zoom_tokens.json
+#   store.save({"access_token": ..., "refresh_token": ..., "expires_in": 3600})
+#   tokens = store.load()                # None until tokens are saved
+#
+# A path ending in .db, .sqlite or .sqlite3 selects the SQLite backend.
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from file_lock import atomic_write, locked
+
+DEFAULT_PATH = os.getenv(
+    "ZOOM_TOKEN_STORE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".zoom_tokens.json"),
+)
+DEFAULT_KEY = "default"
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+
+def _entry(tokens, previous=None):
+    """Normalize a Zoom token response into the stored record."""
+    previous = previous or {}
+    expires_at = tokens.get("expires_at")
+    if expires_at is None and tokens.get("expires_in"):
+        expires_at = time.time() + float(tokens["expires_in"])
+    return {
+        "access_token": tokens["access_token"],
+        "refresh_token": tokens.get("refresh_token") or previous.get("refresh_token"),
+        "expires_at": expires_at,
+        "updated_at": time.time(),
+    }
+
+
+class FileTokenStore:
+    """
+    Tokens in a JSON file, one record per key. Every save rewrites the file
+    once with an atomic rename under an inter-process lock, so readers in
+    other processes see the old or the new tokens, never a mix. load() only
+    re-reads the file when its size or mtime changed.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, key=DEFAULT_KEY):
+        self.path = path
+        self.key = key
+        self._lock = threading.Lock()
+        self._signature = None
+        self._records = {}
+
+    def _read(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._signature, self._records = None, {}
+            return self._records
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if signature != self._signature:
+            try:
+                with open(self.path, encoding="utf-8") as handle:
+                    self._records = json.load(handle)
+            except (FileNotFoundError, ValueError):
+                self._records = {}
+            self._signature = signature
+        return self._records
+
+    def load(self):
+        with self._lock:
+            record = self._read().get(self.key)
+            return dict(record) if record else None
+
+    def save(self, tokens):
+        with self._lock, locked(self.path):
+            records = dict(self._read())
+            records[self.key] = entry = _entry(tokens, records.get(self.key))
+            atomic_write(self.path, json.dumps(records))
+            return dict(entry)
+
+    def lock(self):
+        """Inter-process lock for a read-refresh-save sequence (separate from the save lock)."""
+        return locked(f"{self.path}.refresh")
+
+
+class SQLiteTokenStore:
+    """
+    Tokens in a SQLite table, one row per key. A save is one transaction;
+    load() skips the query when no connection has committed since the last
+    read (PRAGMA data_version).
+    """
+
+    def __init__(self, path=DEFAULT_PATH, key=DEFAULT_KEY):
+        self.path = path
+        self.key = key
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tokens ("
+            "key TEXT PRIMARY KEY, access_token TEXT NOT NULL, refresh_token TEXT, "
+            "expires_at REAL, updated_at REAL NOT NULL)"
+        )
+        self._version = None
+        self._record = None
+
+    def _select(self):
+        row = self._conn.execute(
+            "SELECT access_token, refresh_token, expires_at, updated_at FROM tokens WHERE key = ?",
+            (self.key,),
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("access_token", "refresh_token", "expires_at", "updated_at"), row))
+
+    def load(self):
+        with self._lock:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if version != self._version:
+                self._record = self._select()
+                self._version = version
+            return dict(self._record) if self._record else None
+
+    def save(self, tokens):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                entry = _entry(tokens, self._select())
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO tokens (key, access_token, refresh_token, expires_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (self.key, entry["access_token"], entry["refresh_token"], entry["expires_at"],
+                     entry["updated_at"]),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            # Our own commits do not change data_version; cache the row directly
+            self._record = entry
+            return dict(entry)
+
+    def lock(self):
+        """Inter-process lock for a read-refresh-save sequence (separate from the save lock)."""
+        return locked(f"{self.path}.refresh")
+
+    def close(self):
+        self._conn.close()
+
+
+def open_store(path=DEFAULT_PATH, key=DEFAULT_KEY):
+    if path.endswith(SQLITE_SUFFIXES):
+        return SQLiteTokenStore(path, key)
+    return FileTokenStore(path, key)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Return the shared store at ZOOM_TOKEN_STORE (default .zoom_tokens.json)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = open_store()
+    return _store
+
+
+def set_store(store):
+    """Replace the shared store, e.g. with open_store(path)."""
+    global _store
+    _store = store
+    return _store
@@ -0,0 +1,254 @@
+# tracing.py
+# Usage: Opt-in spans over the request lifecycle, exported to a local NDJSON file
+#
+#   ZOOM_TRACE=trace.ndjson python zoom_cli.py batch requests.jsonl
+#   python tracing.py summary trace.ndjson           # time per span name, with self time
+#   python tracing.py chrome trace.ndjson > trace.json   # for Perfetto / chrome://tracing
+#
+#   with span("credentials.resolve", references=2) as current:
+#       current.set(source="op")
+#
+# Without ZOOM_TRACE (or enable()), span() returns a shared no-op object.
+
+import argparse
+import atexit
+import contextvars
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+
+from metrics import percentile
+
+# Seconds between writes of buffered spans
+FLUSH_INTERVAL = 1.0
+# Buffered spans that make the exporting thread write them itself
+MAX_BUFFERED = 50000
+
+_current = contextvars.ContextVar("zoom_trace_span", default=None)
+_ids = itertools.count(1)
+_exporter = None
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    """
+    One timed operation. Spans opened while another is current (in the same
+    thread or asyncio task) become its children and share its trace id.
+    """
+
+    __slots__ = ("name", "attributes", "span_id", "parent_id", "trace_id", "start", "_started", "_token")
+
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = attributes
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        parent = _current.get()
+        self.span_id = next(_ids)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.trace_id = parent.trace_id if parent is not None else self.span_id
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self._started
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        exporter = _exporter
+        if exporter is not None:
+            exporter.export(self, duration)
+        return False
+
+
+class FileExporter:
+    """
+    Appends finished spans to `path` as NDJSON. Exporting a span only
+    buffers a tuple; a background thread serializes and writes the buffer
+    every FLUSH_INTERVAL seconds, keeping JSON encoding and file I/O off
+    the traced threads.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.pid = os.getpid()
+        self._spans = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+        self._thread.start()
+
+    def export(self, span, duration):
+        record = (span.name, span.trace_id, span.span_id, span.parent_id, span.start, duration,
+                  threading.current_thread().name, span.attributes)
+        with self._lock:
+            self._spans.append(record)
+            if len(self._spans) < MAX_BUFFERED:
+                return
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(FLUSH_INTERVAL):
+            self.flush()
+
+    def flush(self):
+        with self._write_lock:
+            with self._lock:
+                spans, self._spans = self._spans, []
+            if spans:
+                self._write(spans)
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+    def _write(self, spans):
+        lines = [
+            json.dumps({
+                "name": name,
+                "trace_id": f"{self.pid}-{trace_id}",
+                "span_id": span_id,
+                "parent_id": parent_id,
+                "start": round(start, 6),
+                "duration_ms": round(duration * 1000, 3),
+                "pid": self.pid,
+                "thread": thread,
+                "attributes": attributes,
+            }, default=str)
+            for name, trace_id, span_id, parent_id, start, duration, thread, attributes in spans
+        ]
+        # One append per batch; lines from several processes never interleave mid-line
+        with open(self.path, "a", encoding="utf-8") as handle:
+            handle.write("\n".join(lines) + "\n")
+
+
+def enable(path):
+    """Start recording spans to `path` (appended to if it exists)."""
+    global _exporter
+    disable()
+    _exporter = FileExporter(path)
+    atexit.register(_exporter.close)
+    return _exporter
+
+
+def disable():
+    global _exporter
+    exporter, _exporter = _exporter, None
+    if exporter is not None:
+        exporter.close()
+        atexit.unregister(exporter.close)
+
+
+def enabled():
+    return _exporter is not None
+
+
+def flush():
+    if _exporter is not None:
+        _exporter.flush()
+
+
+def span(name, **attributes):
+    """Context manager timing a block as a span; a no-op unless tracing is enabled."""
+    if _exporter is None:
+        return _NOOP
+    return Span(name, attributes)
+
+
+def current_span():
+    """The innermost open span, or the no-op span, to attach attributes to."""
+    return _current.get() or _NOOP
+
+
+if os.getenv("ZOOM_TRACE"):
+    enable(os.getenv("ZOOM_TRACE"))
+
+
+# --- Reading traces ---
+def read_spans(path):
+    with open(path, encoding="utf-8") as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def summarize(spans):
+    """Per span name: count, total, self time (total minus direct children) and latency percentiles."""
+    children = {}
+    for item in spans:
+        if item["parent_id"] is not None:
+            key = (item["pid"], item["parent_id"])
+            children[key] = children.get(key, 0.0) + item["duration_ms"]
+    groups = {}
+    for item in spans:
+        group = groups.setdefault(item["name"], {"durations": [], "self_ms": 0.0})
+        group["durations"].append(item["duration_ms"])
+        group["self_ms"] += max(item["duration_ms"] - children.get((item["pid"], item["span_id"]), 0.0), 0.0)
+    rows = []
+    for name, group in groups.items():
+        durations = sorted(group["durations"])
+        rows.append({
+            "name": name,
+            "count": len(durations),
+            "total_ms": round(sum(durations), 3),
+            "self_ms": round(group["self_ms"], 3),
+            "p50_ms": percentile(durations, 0.50),
+            "p99_ms": percentile(durations, 0.99),
+            "max_ms": durations[-1],
+        })
+    return sorted(rows, key=lambda row: row["self_ms"], reverse=True)
+
+
+def chrome_events(spans):
+    """Spans as Chrome trace events ("X" complete events, microseconds), one track per thread."""
+    threads = {}
+    events = []
+    for item in spans:
+        key = (item["pid"], item["thread"])
+        if key not in threads:
+            threads[key] = len(threads) + 1
+            events.append({"name": "thread_name", "ph": "M", "pid": item["pid"], "tid": threads[key],
+                           "args": {"name": item["thread"]}})
+        events.append({"name": item["name"], "ph": "X", "ts": round(item["start"] * 1e6),
+                       "dur": round(item["duration_ms"] * 1000), "pid": item["pid"], "tid": threads[key],
+                       "args": item["attributes"]})
+    return {"traceEvents": events}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize or convert a ZOOM_TRACE span file.")
+    parser.add_argument("command", choices=("summary", "chrome"))
+    parser.add_argument("path")
+    args = parser.parse_args()
+    spans = read_spans(args.path)
+    if args.command == "chrome":
+        json.dump(chrome_events(spans), sys.stdout)
+        return
+    print(f"{'span':32} {'count':>7} {'total ms':>11} {'self ms':>11} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for row in summarize(spans):
+        print(f"{row['name']:32} {row['count']:>7} {row['total_ms']:>11.1f} {row['self_ms']:>11.1f} "
+              f"{row['p50_ms']:>9.2f} {row['p99_ms']:>9.2f} {row['max_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
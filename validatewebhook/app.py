@@ -1,13 +1,21 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+import atexit
 import hashlib
 import hmac
+import json
 import os
 import logging
 import sys
+import threading
+import time
 
 # Add parent directory to sys.path to find credentials.py
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import metrics
+import tracing
 from credentials import get_credentials
+from event_log import Checkpoint, EventLog, event_key, record_size
+from pipeline import DEFAULT_QUEUE_SIZE, DEFAULT_WORKERS, EventPipeline
 
 app = Flask(__name__)
 
@@ -16,35 +24,215 @@ logging.basicConfig(level=logging.INFO)
 
 YOUR_WEBHOOK_SECRET = get_credentials("YOUR_WEBHOOK_SECRET")
 
+# Reject signed requests older than this many seconds (replay protection)
+SIGNATURE_TOLERANCE = 300
+
+# Every accepted event is persisted here before it is acknowledged
+EVENT_LOG_DIR = os.getenv(
+    "WEBHOOK_EVENT_LOG_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "events"),
+)
+_event_log = None
+_event_log_lock = threading.Lock()
+# Lowest logged event not yet handled; unhandled events are replayed on startup
+_checkpoint = None
+
+
+def _event_done(data):
+    # Handled (or failed in a handler, which a replay would not fix): let the checkpoint pass it
+    if _checkpoint is not None and '_offset' in data:
+        _checkpoint.ack(data['_offset'])
+
+
+# Events are acknowledged once queued and processed by this worker pool
+pipeline = EventPipeline(
+    workers=int(os.getenv("WEBHOOK_WORKERS", DEFAULT_WORKERS)),
+    max_queue=int(os.getenv("WEBHOOK_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)),
+    on_done=_event_done,
+)
+
+ACK_SECONDS = metrics.histogram(
+    "zoom_webhook_ack_duration_seconds", "Time to answer a webhook request, by response status.", ("status",),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 3.0))
+metrics.gauge("zoom_webhook_queue_depth", "Events waiting for a webhook worker.",
+              func=lambda: pipeline.stats()["queue_depth"])
+metrics.gauge("zoom_webhook_queue_capacity", "Webhook queue size limit.", func=lambda: pipeline.max_queue)
+metrics.gauge("zoom_webhook_events_total", "Webhook events by pipeline outcome.", ("outcome",), kind="counter",
+              func=lambda: {outcome: value for outcome, value in pipeline.stats().items()
+                            if outcome in ("accepted", "rejected", "processed", "failed")})
+
+
+def get_event_log():
+    # Opened by the process that imports the app (each gunicorn worker), so it owns the writer
+    global _event_log, _checkpoint
+    if _event_log is None:
+        with _event_log_lock:
+            if _event_log is None:
+                event_log = EventLog(EVENT_LOG_DIR, checkpoint=Checkpoint(EVENT_LOG_DIR))
+                _checkpoint = event_log.checkpoint
+                # The checkpoint is saved at most once a second while events are acked
+                atexit.register(_checkpoint.save)
+                _replay_unhandled(event_log, _checkpoint)
+                _event_log = event_log
+    return _event_log
+
+
+def _replay_unhandled(event_log, checkpoint):
+    # Events logged before a restart or crash that no handler finished, queued from a background
+    # thread; new events are tracked by append() meanwhile, so the checkpoint is held until every
+    # older record is tracked too
+    start = checkpoint.offset()
+    limit = event_log.next_offset
+    if start >= limit:
+        return
+    checkpoint.hold(start)
+
+    def replay():
+        count = 0
+        try:
+            for offset, payload in event_log.read_from(start):
+                if offset >= limit:
+                    break
+                checkpoint.track(offset, offset + record_size(payload), queued=True)
+                try:
+                    data = json.loads(payload)
+                except ValueError:
+                    checkpoint.ack(offset)
+                    continue
+                data['_offset'] = offset
+                pipeline.submit(data, block=True)
+                count += 1
+        finally:
+            checkpoint.release()
+        app.logger.info(f"Replayed {count} unhandled webhook events from offset {start}")
+
+    threading.Thread(target=replay, name="webhook-replay", daemon=True).start()
+
+
+def _open_event_log():
+    try:
+        get_event_log()
+    except Exception:
+        app.logger.exception("Unable to open the webhook event log")
+
+
+@pipeline.on("*")
+def log_event(data):
+    # Log the event type only; the full payload is available at DEBUG level
+    app.logger.info(f"Processed event: {data.get('event')}")
+    app.logger.debug(f"Event payload: {data}")
+
+
+def verify_signature(body, timestamp, signature, now=None):
+    """Check Zoom's x-zm-signature: v0=HMAC-SHA256(secret, 'v0:{timestamp}:{body}')."""
+    if not (YOUR_WEBHOOK_SECRET and timestamp and signature):
+        return False
+    try:
+        age = abs((now or time.time()) - int(timestamp))
+    except ValueError:
+        return False
+    if age > SIGNATURE_TOLERANCE:
+        return False
+    message = b"v0:" + timestamp.encode('utf-8') + b":" + body
+    expected = "v0=" + hmac.new(YOUR_WEBHOOK_SECRET.encode('utf-8'), message, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
 @app.route('/zoom-webhook', methods=['POST'])
 def validate_webhook():
+    started = time.perf_counter()
+    with tracing.span("webhook.request") as current:
+        response = handle_webhook()
+        current.set(status=response[1])
+    ACK_SECONDS.observe(time.perf_counter() - started, str(response[1]))
+    return response
+
+
+def handle_webhook():
     # Parse the incoming JSON request
-    data = request.get_json()
+    body = request.get_data()
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return 'Invalid JSON', 400
+    # Zoom always sends an object; anything else is malformed
+    if not isinstance(data, dict):
+        return 'Invalid JSON', 400
+
+    # Handle the CRC validation request
+    if data.get('event') == 'endpoint.url_validation':
+        # Get the plain token from the request
+        try:
+            plain_token = str(data['payload']['plainToken'])
+        except (KeyError, TypeError):
+            return 'Missing plainToken', 400
+
+        # Create the HMAC SHA-256 hash
+        hash_obj = hmac.new(YOUR_WEBHOOK_SECRET.encode('utf-8'),
+                            plain_token.encode('utf-8'),
+                            hashlib.sha256)
+        encrypted_token = hash_obj.hexdigest()
 
-    # Log the incoming webhook data
-    app.logger.info(f"Received data: {data}")
+        # Create the response JSON object
+        response = {
+            'plainToken': plain_token,
+            'encryptedToken': encrypted_token
+        }
 
-    # Ensure the request is a CRC validation
-    if data['event'] != 'endpoint.url_validation':
-        return 'Unexpected event type', 400
+        # Respond within 3 seconds with a 200 or 204 HTTP response code.
+        return jsonify(response), 200
 
-    # Get the plain token from the request
-    plain_token = data['payload']['plainToken']
+    # Verify the event came from Zoom before accepting it
+    with tracing.span("webhook.verify"):
+        verified = verify_signature(body,
+                                    request.headers.get('x-zm-request-timestamp'),
+                                    request.headers.get('x-zm-signature'))
+    if not verified:
+        return 'Invalid signature', 401
 
-    # Create the HMAC SHA-256 hash
-    hash_obj = hmac.new(YOUR_WEBHOOK_SECRET.encode('utf-8'), 
-                        plain_token.encode('utf-8'), 
-                        hashlib.sha256)
-    encrypted_token = hash_obj.hexdigest()
+    # A full queue asks Zoom to retry later, before anything is persisted
+    if pipeline.full():
+        return 'Event queue full', 503
 
-    # Create the response JSON object
-    response = {
-        'plainToken': plain_token,
-        'encryptedToken': encrypted_token
-    }
+    # Persist (group-committed fsync) and drop redeliveries of the same event,
+    # unless the earlier delivery was logged but never reached the queue
+    with tracing.span("webhook.persist", bytes=len(body)) as current:
+        offset, duplicate = get_event_log().append(body, event_key(body))
+        current.set(duplicate=duplicate)
+    if duplicate and not _checkpoint.needs_queue(offset):
+        return '', 204
+
+    # Hand the event to the worker pool. If the queue filled up meanwhile,
+    # answer 503: Zoom's retry is then queued through the duplicate path above.
+    data['_offset'] = offset
+    if not pipeline.submit(data):
+        app.logger.warning(f"Event queue full; event at offset {offset} waits for Zoom's retry")
+        return 'Event queue full', 503
+    _checkpoint.queued(offset)
 
     # Respond within 3 seconds with a 200 or 204 HTTP response code.
-    return jsonify(response), 200
+    return '', 204
+
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    # Webhook and Zoom API client metrics of this process, for Prometheus to scrape
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@app.route('/zoom-webhook/stats', methods=['GET'])
+def webhook_stats():
+    # Queue depth and throughput counters for backpressure monitoring
+    stats = pipeline.stats()
+    if _event_log is not None:
+        stats['event_log'] = _event_log.stats()
+    return jsonify(stats), 200
+
+
+# Open the log (recovery scans every segment) and replay unhandled events at startup, off the
+# ack path; started last so replayed events meet every registered handler
+threading.Thread(target=_open_event_log, name="webhook-event-log-open", daemon=True).start()
+
 
 if __name__ == '__main__':
     app.run(port=8000)
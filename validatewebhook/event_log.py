@@ -0,0 +1,385 @@
+# event_log.py
+# Usage: Durable, deduplicating append-only log of received webhook events
+#
+#   python event_log.py events/                 # replay every event as NDJSON
+#   python event_log.py events/ --from 123456   # replay from a byte offset
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Record header: payload length, CRC32 of key + payload, 32-byte dedupe key
+HEADER = struct.Struct("<II32s")
+SEGMENT_SUFFIX = ".log"
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+# How long the flusher waits to gather more appends into one fsync
+DEFAULT_GROUP_WINDOW = 0.002
+DEFAULT_DEDUPE_CAPACITY = 100_000
+
+
+def event_key(body):
+    """Default dedupe key: SHA-256 of the raw request body, identical on Zoom retries."""
+    return hashlib.sha256(body).digest()
+
+
+def record_size(payload):
+    """Bytes a record of `payload` takes in the log: offset + record_size() is the next record."""
+    return HEADER.size + len(payload)
+
+
+def _segment_bases(directory):
+    return sorted(
+        int(name[:-len(SEGMENT_SUFFIX)])
+        for name in os.listdir(directory)
+        if name.endswith(SEGMENT_SUFFIX) and name[:-len(SEGMENT_SUFFIX)].isdigit()
+    )
+
+
+def _segment_path(directory, base):
+    return os.path.join(directory, f"{base:020d}{SEGMENT_SUFFIX}")
+
+
+def _scan(buffer, start=0):
+    """Yield (position, key, payload) for each intact record, stopping at a torn tail."""
+    position = start
+    size = len(buffer)
+    while position + HEADER.size <= size:
+        length, checksum, key = HEADER.unpack_from(buffer, position)
+        end = position + HEADER.size + length
+        if end > size:
+            return
+        payload = buffer[position + HEADER.size:end]
+        if zlib.crc32(payload, zlib.crc32(key)) != checksum:
+            return
+        yield position, key, payload
+        position = end
+
+
+def replay(directory, offset=0):
+    """
+    Yield (offset, payload) for every durable record at or after `offset`,
+    reading each segment through a read-only memory map. Safe to run from a
+    separate process while a writer is appending.
+    """
+    bases = _segment_bases(directory)
+    for index, base in enumerate(bases):
+        next_base = bases[index + 1] if index + 1 < len(bases) else None
+        if next_base is not None and next_base <= offset:
+            continue
+        path = _segment_path(directory, base)
+        if os.path.getsize(path) == 0:
+            continue
+        with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for position, _, payload in _scan(mapped, max(offset - base, 0)):
+                yield base + position, payload
+
+
+class EventLog:
+    """
+    Append-only, segmented event log with a dedupe index.
+
+    append() writes a record and, with sync=True, waits until it is on
+    disk. A background flusher fsyncs in groups, so concurrent appenders
+    share one fsync instead of paying for one each. Offsets are global byte
+    positions; segments are named by the offset of their first record.
+    Keys already seen within the last `dedupe_capacity` records are not
+    written again. Only one process may write a directory at a time.
+    With a Checkpoint, every new record is registered with it as part of
+    the append, so the checkpoint can never move past an unhandled event,
+    and segments that lie wholly before the saved checkpoint are deleted
+    on open and whenever a segment is rolled.
+    """
+
+    def __init__(self, directory, segment_bytes=DEFAULT_SEGMENT_BYTES,
+                 group_window=DEFAULT_GROUP_WINDOW, dedupe_capacity=DEFAULT_DEDUPE_CAPACITY, checkpoint=None):
+        self.directory = directory
+        self.checkpoint = checkpoint
+        self.segment_bytes = segment_bytes
+        self.group_window = group_window
+        self.dedupe_capacity = dedupe_capacity
+        os.makedirs(directory, exist_ok=True)
+        self._lock_handle = open(os.path.join(directory, "writer.lock"), "a+")
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._lock_handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._lock_handle.close()
+                raise RuntimeError(f"Another process is already writing to {directory}.")
+        self._cond = threading.Condition()
+        self._index = OrderedDict()
+        self._written = 0
+        self._durable = 0
+        self._closed = False
+        self.appended = 0
+        self.duplicates = 0
+        self.fsyncs = 0
+        self._recover()
+        if checkpoint is not None:
+            with self._cond:
+                self._prune_locked(checkpoint.committed())
+        self._flusher = threading.Thread(target=self._flush_loop, name="event-log-flusher", daemon=True)
+        self._flusher.start()
+
+    # --- Recovery ---
+    def _recover(self):
+        bases = _segment_bases(self.directory) or [0]
+        for base in bases:
+            path = _segment_path(self.directory, base)
+            if not os.path.exists(path) or os.path.getsize(path) == 0:
+                end = 0
+            else:
+                with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    end = 0
+                    for position, key, payload in _scan(mapped):
+                        self._remember(key, base + position)
+                        end = position + HEADER.size + len(payload)
+        # Drop any torn write left by a crash in the last segment
+        self._base = bases[-1]
+        self._file = open(_segment_path(self.directory, self._base), "ab")
+        self._file.truncate(end)
+        self._position = end
+        self._durable = self._written = self.next_offset
+
+    def _remember(self, key, offset):
+        self._index[key] = offset
+        if len(self._index) > self.dedupe_capacity:
+            self._index.popitem(last=False)
+
+    @property
+    def next_offset(self):
+        return self._base + self._position
+
+    # --- Writing ---
+    def append(self, payload, key=None, sync=True):
+        """
+        Append `payload` (bytes) and return (offset, duplicate). For a
+        duplicate key nothing is written and the original offset is returned.
+        """
+        key = key if key is not None else event_key(payload)
+        if len(key) != 32:
+            key = hashlib.sha256(key).digest()
+        record = HEADER.pack(len(payload), zlib.crc32(payload, zlib.crc32(key)), key) + payload
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Event log is closed.")
+            existing = self._index.get(key)
+            if existing is not None:
+                self.duplicates += 1
+                return existing, True
+            if self._position and self._position + len(record) > self.segment_bytes:
+                self._roll()
+            offset = self.next_offset
+            self._file.write(record)
+            self._position += len(record)
+            self._written = self.next_offset
+            self._remember(key, offset)
+            if self.checkpoint is not None:
+                self.checkpoint.track(offset, self.next_offset)
+            self.appended += 1
+            self._cond.notify_all()
+            if sync:
+                while self._durable <= offset and not self._closed:
+                    self._cond.wait()
+        return offset, False
+
+    def _roll(self):
+        self._sync_locked()
+        self._file.close()
+        self._base = self.next_offset
+        self._position = 0
+        self._file = open(_segment_path(self.directory, self._base), "ab")
+        if self.checkpoint is not None:
+            self._prune_locked(self.checkpoint.committed())
+
+    def prune(self, offset):
+        """Delete the segments whose records all lie before `offset`; returns how many."""
+        with self._cond:
+            return self._prune_locked(offset)
+
+    def _prune_locked(self, offset):
+        bases = _segment_bases(self.directory)
+        removed = 0
+        # A segment ends where the next begins; the segment being written is never removed
+        for base, next_base in zip(bases, bases[1:]):
+            if next_base > offset or base == self._base:
+                break
+            os.remove(_segment_path(self.directory, base))
+            removed += 1
+        return removed
+
+    def _sync_locked(self):
+        target = self._written
+        if target <= self._durable:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.fsyncs += 1
+        self._durable = target
+        self._cond.notify_all()
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while self._written <= self._durable and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+            if self.group_window:
+                # Let other appenders join this commit group
+                time.sleep(self.group_window)
+            with self._cond:
+                if self._closed:
+                    return
+                self._sync_locked()
+
+    def flush(self):
+        with self._cond:
+            self._sync_locked()
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._sync_locked()
+            self._closed = True
+            self._file.close()
+            self._cond.notify_all()
+        self._flusher.join()
+        self._lock_handle.close()
+
+    def read_from(self, offset=0):
+        """Replay this log's durable records; see replay()."""
+        with self._cond:
+            durable = self._durable
+        for record_offset, payload in replay(self.directory, offset):
+            if record_offset >= durable:
+                return
+            yield record_offset, payload
+
+    def stats(self):
+        with self._cond:
+            return {
+                "next_offset": self.next_offset,
+                "appended": self.appended,
+                "duplicates": self.duplicates,
+                "fsyncs": self.fsyncs,
+                "segments": len(_segment_bases(self.directory)),
+            }
+
+
+class Checkpoint:
+    """
+    Tracks which logged events have been handed to a consumer and which it
+    has finished. offset() is the lowest offset not yet acknowledged, or
+    the end of the last tracked record, so every record before it is done.
+    It is saved to `checkpoint` in the log directory, at most every
+    `interval` seconds, and a restart replays the log from there: delivery
+    is at least once.
+    """
+
+    FILENAME = "checkpoint"
+
+    def __init__(self, directory, interval=1.0):
+        self.path = os.path.join(directory, self.FILENAME)
+        self.interval = interval
+        self._lock = threading.Lock()
+        # offset -> True once queued for a consumer, False while waiting for a queue slot
+        self._pending = {}
+        try:
+            with open(self.path, encoding="utf-8") as handle:
+                self._next = int(handle.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            self._next = 0
+        self._saved = self._next
+        self._saved_at = 0.0
+        self._hold = None
+
+    def offset(self):
+        with self._lock:
+            candidates = list(self._pending)
+            if self._hold is not None:
+                candidates.append(self._hold)
+            return min(candidates) if candidates else self._next
+
+    def committed(self):
+        """The offset last saved; records before it are never replayed."""
+        with self._lock:
+            return self._saved
+
+    def hold(self, offset):
+        """Keep the checkpoint at or before `offset` until release(), e.g. while replay tracks old records."""
+        with self._lock:
+            self._hold = offset
+
+    def release(self):
+        with self._lock:
+            self._hold = None
+
+    def track(self, offset, end, queued=False):
+        """Register the logged record [offset, end) that must be acknowledged before the checkpoint passes it."""
+        with self._lock:
+            self._pending.setdefault(offset, queued)
+            self._next = max(self._next, end)
+
+    def needs_queue(self, offset):
+        """True for a logged event that is unacknowledged and not in a consumer's queue."""
+        with self._lock:
+            return self._pending.get(offset) is False
+
+    def queued(self, offset, queued=True):
+        with self._lock:
+            if offset in self._pending:
+                self._pending[offset] = queued
+
+    def ack(self, offset):
+        with self._lock:
+            self._pending.pop(offset, None)
+            due = time.monotonic() - self._saved_at >= self.interval
+        if due:
+            self.save()
+
+    def save(self):
+        committed = self.offset()
+        with self._lock:
+            # A concurrent save may already have written a later offset
+            if committed <= self._saved:
+                return
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as handle:
+                handle.write(str(committed))
+            os.replace(temp_path, self.path)
+            self._saved = committed
+            self._saved_at = time.monotonic()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a webhook event log as NDJSON.")
+    parser.add_argument("directory")
+    parser.add_argument("--from", dest="offset", type=int, default=0, help="Byte offset to start from.")
+    args = parser.parse_args()
+    out = sys.stdout
+    count = 0
+    started = time.monotonic()
+    for offset, payload in replay(args.directory, args.offset):
+        out.write(json.dumps({"offset": offset, "event": json.loads(payload)}))
+        out.write("\n")
+        count += 1
+    elapsed = time.monotonic() - started
+    print(f"Replayed {count} events in {elapsed:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# pipeline.py
+# Usage: Bounded in-process queue and worker pool for Zoom webhook events
+
+import logging
+import queue
+import threading
+import time
+
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_SIZE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+class EventPipeline:
+    """
+    Hands webhook events from the request thread to a pool of worker
+    threads. submit() never blocks: when the queue is full it returns False
+    so the caller can answer with a 503 and let Zoom redeliver later.
+    Handlers are registered per event type with on(); "*" receives every
+    event. Workers start on the first submit, after any fork by gunicorn.
+    on_done(event), if given, is called after each event's handlers ran,
+    whether or not they raised.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_queue=DEFAULT_QUEUE_SIZE, on_done=None):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.on_done = on_done
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._handlers = {}
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.accepted = 0
+        self.rejected = 0
+        self.processed = 0
+        self.failed = 0
+        self.max_depth = 0
+        self.busy_seconds = 0.0
+        self.queue_wait_seconds = 0.0
+
+    def on(self, event_type):
+        """Decorator registering a handler(event_dict) for an event type."""
+        def register(handler):
+            self._handlers.setdefault(event_type, []).append(handler)
+            return handler
+        return register
+
+    def _start(self):
+        with self._start_lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"webhook-worker-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def full(self):
+        return self._queue.full()
+
+    def submit(self, event, block=False):
+        """Enqueue an event; without block, False means the queue is full."""
+        if not self._threads:
+            self._start()
+        try:
+            self._queue.put((time.monotonic(), event), block=block)
+        except queue.Full:
+            with self._stats_lock:
+                self.rejected += 1
+            return False
+        depth = self._queue.qsize()
+        with self._stats_lock:
+            self.accepted += 1
+            if depth > self.max_depth:
+                self.max_depth = depth
+        return True
+
+    def _dispatch(self, event):
+        handlers = self._handlers.get(event.get("event"), []) + self._handlers.get("*", [])
+        for handler in handlers:
+            handler(event)
+
+    def _work(self):
+        while True:
+            enqueued_at, event = self._queue.get()
+            started = time.monotonic()
+            try:
+                self._dispatch(event)
+                ok = True
+            except Exception:
+                logger.exception("Webhook handler failed for %s", event.get("event"))
+                ok = False
+            if self.on_done is not None:
+                try:
+                    self.on_done(event)
+                except Exception:
+                    logger.exception("Webhook on_done callback failed")
+            with self._stats_lock:
+                self.busy_seconds += time.monotonic() - started
+                self.queue_wait_seconds += started - enqueued_at
+                if ok:
+                    self.processed += 1
+                else:
+                    self.failed += 1
+            self._queue.task_done()
+
+    def join(self):
+        """Block until every queued event has been handled."""
+        self._queue.join()
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self.max_queue,
+                "max_depth": self.max_depth,
+                "accepted": self.accepted,
+                "rejected": self.rejected,
+                "processed": self.processed,
+                "failed": self.failed,
+                "workers": self.workers,
+                "busy_seconds": round(self.busy_seconds, 3),
+                "queue_wait_seconds": round(self.queue_wait_seconds, 3),
+            }
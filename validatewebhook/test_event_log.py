@@ -0,0 +1,57 @@
+# test_event_log.py
+# Usage: python test_event_log.py   (or: python -m pytest test_event_log.py)
+#
+# Checks that a saved Checkpoint lands on a record boundary, so a restart
+# replays every event logged after it, and that segments wholly before the
+# saved checkpoint are deleted.
+
+import os
+import tempfile
+
+from event_log import Checkpoint, EventLog, _segment_bases
+
+
+def _open(directory, **options):
+    return EventLog(directory, checkpoint=Checkpoint(directory), group_window=0, **options)
+
+
+def test_checkpoint_replays_events_logged_after_it():
+    directory = tempfile.mkdtemp(prefix="event-log-test-")
+    log = _open(directory)
+    first, _ = log.append(b'{"event": "first"}')
+    # Handled while idle: nothing pending, so the saved offset is the end of the first record
+    log.checkpoint.ack(first)
+    log.checkpoint.save()
+    second, _ = log.append(b'{"event": "second"}')
+    log.close()
+
+    # Restart with the second event never handled
+    log = _open(directory)
+    start = log.checkpoint.offset()
+    assert start == second
+    assert [payload for _, payload in log.read_from(start)] == [b'{"event": "second"}']
+    log.close()
+
+
+def test_segments_before_the_checkpoint_are_pruned():
+    directory = tempfile.mkdtemp(prefix="event-log-test-")
+    log = _open(directory, segment_bytes=128)
+    offsets = [log.append(b'{"event": "%d"}' % number + b" " * 40)[0] for number in range(6)]
+    assert len(_segment_bases(directory)) == 6
+    for offset in offsets[:4]:
+        log.checkpoint.ack(offset)
+    log.checkpoint.save()
+    log.close()
+
+    log = _open(directory, segment_bytes=128)
+    assert _segment_bases(directory) == offsets[4:]
+    assert [offset for offset, _ in log.read_from(log.checkpoint.offset())] == offsets[4:]
+    log.close()
+    assert not os.path.exists(os.path.join(directory, f"{offsets[0]:020d}.log"))
+
+
+if __name__ == "__main__":
+    test_checkpoint_replays_events_logged_after_it()
+    print("Replay after checkpoint: OK")
+    test_segments_before_the_checkpoint_are_pruned()
+    print("Segment retention: OK")
@@ -2,14 +2,36 @@
 # zoom_cli.py
 # --- NEED TO TEST ---
 # Usage: Command-line interface for Zoom API authorization and requests
+#
+#   python zoom_cli.py                                  # interactive menu
+#   python zoom_cli.py batch requests.jsonl --concurrency 16 > results.ndjson
+#   cat requests.jsonl | python zoom_cli.py batch --order completion
+#   python zoom_cli.py batch requests.jsonl --metrics     # also print metrics to stderr
+#   python zoom_cli.py stats --url http://localhost:5000/metrics   # a running process's metrics
+#   ZOOM_PROFILE=sample python zoom_cli.py batch requests.jsonl   # profile any action (see profiling.py)
+#   ZOOM_TRACE=trace.ndjson python zoom_cli.py batch requests.jsonl   # record spans (see tracing.py)
+#
+# Batch specs are JSON lines like {"method": "GET", "endpoint": "/users/me",
+# "params": {...}, "json": {...}, "id": "anything"}; endpoints starting with
+# '/' are relative to the API base URL.
 
+import argparse
+import contextlib
 import json
 import sys
+import time
 
 import requests
 
 import access_request
-from request_handler import get_user_info, make_request
+import http_client
+import metrics
+import profiling
+import token_manager
+from concurrency import DEFAULT_WORKERS, bounded_map
+from metrics import percentile
+from rate_limiter import PRIORITY_BULK, PRIORITY_INTERACTIVE
+from request_handler import API_BASE_URL, get_user_info, make_request
 
 
 def _require_credentials():
@@ -50,26 +72,20 @@ def authorize():
     except requests.RequestException as exc:
         print(f"Authorization failed: {exc}")
         return
-    access_request.access_token = tokens["access_token"]
-    access_request.refresh_token = tokens["refresh_token"]
+    token_manager.get_manager().set_tokens(tokens)
     print("Authorized successfully.")
 
 
 def refresh_tokens():
-    if not access_request.refresh_token:
+    manager = token_manager.get_manager()
+    if not manager.refresh_token:
         print("No refresh token available. Authorize first.")
         return
     try:
-        tokens = access_request.refresh_access_token(
-            access_request.client_id,
-            access_request.client_secret,
-            access_request.refresh_token,
-        )
+        manager.refresh()
     except requests.RequestException as exc:
         print(f"Token refresh failed: {exc}")
         return
-    access_request.access_token = tokens["access_token"]
-    access_request.refresh_token = tokens["refresh_token"]
     print("Tokens refreshed.")
 
 
@@ -99,19 +115,147 @@ def make_custom_request():
             print("Params must be a JSON object.")
             return
     try:
-        data = make_request(method=method, endpoint=endpoint, params=params)
+        data = make_request(
+            method=method,
+            endpoint=endpoint,
+            params=params,
+            priority=PRIORITY_INTERACTIVE,
+        )
     except requests.RequestException as exc:
         print(f"Request failed: {exc}")
         return
     print(json.dumps(data, indent=2))
 
 
-def main():
+# --- Batch mode ---
+def read_specs(lines):
+    """Yield (index, spec, error) for every non-blank JSONL line."""
+    index = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            spec = json.loads(line)
+            if not isinstance(spec, dict) or not spec.get("endpoint"):
+                raise ValueError("each line must be a JSON object with an 'endpoint'")
+        except ValueError as exc:
+            yield index, None, f"Invalid spec: {exc}"
+        else:
+            yield index, spec, None
+        index += 1
+
+
+def run_spec(item):
+    """Send one batch spec through make_request; returns its NDJSON result record."""
+    index, spec, error = item
+    result = {"index": index}
+    if spec is not None and "id" in spec:
+        result["id"] = spec["id"]
+    if error is not None:
+        return {**result, "ok": False, "error": error}
+    endpoint = spec["endpoint"]
+    if endpoint.startswith("/"):
+        endpoint = f"{API_BASE_URL}{endpoint}"
+    started = time.perf_counter()
+    try:
+        data = make_request(
+            method=spec.get("method", "GET"),
+            endpoint=endpoint,
+            params=spec.get("params"),
+            json=spec.get("json"),
+            priority=PRIORITY_BULK,
+        )
+    except requests.RequestException as exc:
+        response = getattr(exc, "response", None)
+        result.update(ok=False, status=response.status_code if response is not None else None, error=str(exc))
+    else:
+        result.update(ok=True, data=data)
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return result
+
+
+def run_batch(lines, out, concurrency=DEFAULT_WORKERS, ordered=True):
+    """Run every spec in `lines`, writing one NDJSON result per spec to `out`; returns a summary dict."""
+    started = time.perf_counter()
+    count = errors = 0
+    latencies = []
+    for item, result, error in bounded_map(run_spec, read_specs(lines), concurrency, ordered=ordered):
+        if error is not None:
+            # e.g. no access token yet; reported per spec like any other failure
+            result = {"index": item[0], "ok": False, "error": str(error)}
+        count += 1
+        if not result["ok"]:
+            errors += 1
+        if "elapsed_ms" in result:
+            latencies.append(result["elapsed_ms"])
+        # decode="raw" bodies are bytes
+        out.write(json.dumps(result, default=lambda value: value.decode("utf-8", "replace")) + "\n")
+        out.flush()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(count / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50),
+        "p90_ms": percentile(latencies, 0.90),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": latencies[-1] if latencies else 0.0,
+    }
+
+
+def batch(args):
+    source = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8")
+    try:
+        # Token refresh messages would corrupt the NDJSON stream; send them to stderr
+        out = sys.stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            summary = run_batch(source, out, args.concurrency, ordered=args.order == "input")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    # Results own stdout; the summary goes to stderr so the NDJSON stays parseable
+    print(
+        f"{summary['requests']} requests in {summary['elapsed_seconds']}s "
+        f"({summary['throughput_rps']} req/s), {summary['errors']} errors "
+        f"({summary['error_rate']:.2%}), latency p50 {summary['p50_ms']} ms, "
+        f"p90 {summary['p90_ms']} ms, p99 {summary['p99_ms']} ms, max {summary['max_ms']} ms",
+        file=sys.stderr,
+    )
+    if args.metrics:
+        print(metrics.render(), end="", file=sys.stderr)
+    return 1 if summary["errors"] else 0
+
+
+def show_metrics():
+    # Metrics of this process: API latency, responses, retries and token calls so far
+    print(metrics.render(), end="")
+
+
+def stats(args):
+    # Metrics live in the process that made the calls, e.g. a running webhook app's /metrics route
+    try:
+        response = http_client.get_session().get(args.url, timeout=10)
+        response.raise_for_status()
+    except requests.RequestException as exc:
+        print(f"Unable to fetch metrics from {args.url}: {exc}", file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(metrics.parse_text(response.text), indent=2))
+    else:
+        print(response.text, end="")
+    return 0
+
+
+def interactive():
     actions = {
         "1": authorize,
         "2": show_user_info,
         "3": refresh_tokens,
         "4": make_custom_request,
+        "5": show_metrics,
         "0": lambda: sys.exit(0),
     }
     while True:
@@ -121,6 +265,7 @@ def main():
             "2. Get current user info\n"
             "3. Refresh tokens\n"
             "4. Custom request\n"
+            "5. Show metrics\n"
             "0. Exit"
         )
         choice = input("Select option: ").strip()
@@ -131,5 +276,31 @@ def main():
         action()
 
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Zoom API command-line interface.")
+    commands = parser.add_subparsers(dest="command")
+    batch_parser = commands.add_parser("batch",
+                                       help="Run JSONL request specs concurrently, printing NDJSON results.")
+    batch_parser.add_argument("file", nargs="?", default="-", help="JSONL file of request specs (default: stdin).")
+    batch_parser.add_argument("--concurrency", type=int, default=DEFAULT_WORKERS,
+                              help="Requests in flight at once.")
+    batch_parser.add_argument("--order", choices=("input", "completion"), default="input",
+                              help="Emit results in input order or as they complete.")
+    batch_parser.add_argument("--metrics", action="store_true",
+                              help="Print the run's metrics in Prometheus text format to stderr.")
+    stats_parser = commands.add_parser(
+        "stats", help="Print a running process's metrics. Metrics are per process, so a new CLI "
+                      "process has none of its own; use batch --metrics for a batch run's.")
+    stats_parser.add_argument("--url", required=True,
+                              help="The process's metrics endpoint, e.g. http://localhost:5000/metrics.")
+    stats_parser.add_argument("--json", action="store_true", help="Print the samples as JSON instead.")
+    args = parser.parse_args(argv)
+    if args.command == "batch":
+        sys.exit(batch(args))
+    if args.command == "stats":
+        sys.exit(stats(args))
+    interactive()
+
+
 if __name__ == "__main__":
-    main()
+    profiling.run_main(main)
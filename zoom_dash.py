@@ -1,49 +1,197 @@
-import requests
+import argparse
 import os
+import requests
+import attendance
+import rate_limiter
+import sync_store
+from concurrency import DEFAULT_WORKERS, bounded_map
 from credentials import get_credentials
-
-# Enter access token
-access_token = get_credentials("ZOOM_ACCESSTOKEN")
+from S2Saccesstoken import get_s2s_token
+from pagination import DEFAULT_PAGE_SIZE, paginate
+from zoom_urls import API_BASE_URL
 
 # Set up the base URL for API requests
-base_url = "https://api.zoom.us/v2"
+base_url = API_BASE_URL
+
+_headers = None
 
-# Set up the headers with the access token
-headers = {
-    "Content-Type": "application/json",
-    "Authorization": f"Bearer {access_token}"
-}
+# Set up the headers with the access token on first use
+def get_headers():
+    global _headers
+    if _headers is None:
+        # Enter access token, or fall back to the cached S2S token
+        access_token = get_credentials("ZOOM_ACCESSTOKEN") or get_s2s_token()
+        _headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {access_token}"
+        }
+    return _headers
+
+# Define a function that fetches one page of a list endpoint
+def _page_fetcher(url):
+    def fetch_page(params):
+        response = rate_limiter.send("GET", url, headers=get_headers(), params=params)
+        response.raise_for_status()
+        return response.json()
+    return fetch_page
 
 # Define a function to get a list of all meetings
-def get_meetings():
+def get_meetings(page_size=DEFAULT_PAGE_SIZE, prefetch=False, params=None):
     url = f"{base_url}/users/me/meetings"
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        meetings = response.json()["meetings"]
-        return meetings
-    else:
+    try:
+        return paginate(_page_fetcher(url), "meetings", params=params, page_size=page_size, prefetch=prefetch)
+    except requests.RequestException:
         return None
 
-# Define a function to get a list of all participants in a meeting
-def get_participants(meeting_id):
+# Define a function to page through a meeting's participant report, raising on errors
+def iter_participants(meeting_id, page_size=DEFAULT_PAGE_SIZE, prefetch=False):
     url = f"{base_url}/report/meetings/{meeting_id}/participants"
-    response = requests.get(url, headers=headers)
-    if response.status_code == 200:
-        participants = response.json()["participants"]
-        return participants
-    else:
+    return paginate(_page_fetcher(url), "participants", page_size=page_size, prefetch=prefetch)
+
+# Define a function to get a list of all participants in a meeting
+def get_participants(meeting_id, page_size=DEFAULT_PAGE_SIZE, prefetch=False):
+    try:
+        return iter_participants(meeting_id, page_size=page_size, prefetch=prefetch)
+    except requests.RequestException:
         return None
 
-# Get a list of all meetings
-meetings = get_meetings()
-# print(meetings)
+# Define a function to collect the participant names for one meeting
+def collect_participant_names(meeting):
+    participants = get_participants(meeting["id"], prefetch=True)
+    if participants is None:
+        return None
+    # Pages after the first are fetched while iterating, so they can fail here too
+    try:
+        return [participant["name"] for participant in participants]
+    except requests.RequestException:
+        return None
 
-# For each meeting, get a list of all participants and print their names
-for meeting in meetings:
-    participants = get_participants(meeting["id"])
-    if participants is not None:
+# Define a function to collect the full participant records for one meeting
+def collect_participants(meeting):
+    participants = get_participants(meeting["id"], prefetch=True)
+    if participants is None:
+        return None
+    try:
+        return list(participants)
+    except requests.RequestException:
+        return None
+
+# Define a function to load participant reports for many meetings into a columnar table
+def build_participant_table(meetings, workers=DEFAULT_WORKERS):
+    table = attendance.ParticipantTable()
+    failed = []
+    for meeting, participants, error in bounded_map(collect_participants, meetings, workers, ordered=False):
+        if error is not None or participants is None:
+            failed.append(meeting)
+        else:
+            table.extend(meeting.get("uuid") or str(meeting["id"]), participants)
+    return table, failed
+
+# Define a function to fetch participant names for many meetings in parallel
+def iter_participant_names(meetings, workers=DEFAULT_WORKERS, ordered=True):
+    """
+    Yield (meeting, names) pairs, fetching up to `workers` participant
+    reports at a time. names is None when the report could not be fetched.
+    """
+    for meeting, names, error in bounded_map(collect_participant_names, meetings, workers, ordered):
+        yield meeting, None if error is not None else names
+
+def print_participants(meeting, names):
+    if names is not None:
         print(f"Participants in {meeting['topic']} ({meeting['id']}):")
-        for participant in participants:
-            print(participant["name"])
+        for name in names:
+            print(name)
     else:
         print(f"Unable to retrieve participants for {meeting['topic']} ({meeting['id']})")
+
+def print_analytics(meetings, table):
+    summary = attendance.summarize(table)
+    duration = summary["duration"]
+    print(f"Attendance: {summary['rows']} participant rows across {summary['meetings']} meetings, "
+          f"{summary['unique_attendees']} unique attendees")
+    print(f"Duration (s): mean {duration['mean']}, p50 {duration['p50']}, p90 {duration['p90']}, "
+          f"p99 {duration['p99']}, max {duration['max']}")
+    print("Duration histogram: " + ", ".join(
+        f"{'<=' + str(bucket['le']) if bucket['le'] else 'more'}: {bucket['count']}"
+        for bucket in duration["histogram"]))
+    for meeting in meetings:
+        rollup = summary["per_meeting"].get(meeting.get("uuid") or str(meeting["id"]))
+        if rollup is not None:
+            print(f"{meeting['topic']} ({meeting['id']}): {rollup['rows']} rows, "
+                  f"{rollup['unique_attendees']} unique, mean {rollup['mean_duration']}s, "
+                  f"{rollup['first_join']} - {rollup['last_leave']}")
+
+# Define a function to update the local store and print every meeting from it
+def print_from_store(path, workers, offline=False, analytics=False):
+    with sync_store.SyncStore(path) as store:
+        if not offline:
+            try:
+                summary = sync_store.sync(
+                    store,
+                    lambda params: get_meetings(params=params),
+                    # Errors propagate so the store can record reports that no longer exist (404)
+                    lambda report_id: iter_participants(report_id, prefetch=True),
+                    workers=workers,
+                )
+            except RuntimeError as exc:
+                print(exc)
+                return
+            except requests.RequestException:
+                # Meetings pages after the first are fetched while sync() reads them
+                print("Unable to retrieve meetings")
+                return
+            print(f"Synced {summary['meetings_added']} new meetings and "
+                  f"{summary['reports_fetched']} participant reports "
+                  f"({summary['reports_failed']} failed).")
+        if analytics:
+            print_analytics(store.meetings(), attendance.ParticipantTable.from_store(store))
+            return
+        for meeting in store.meetings():
+            print_participants(meeting, store.participant_names(meeting.get("uuid") or str(meeting["id"])))
+
+def main():
+    parser = argparse.ArgumentParser(description="List meetings and their participants.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Participant reports fetched in parallel (1 = serial).")
+    parser.add_argument("--order", choices=("input", "completion"), default="input",
+                        help="Print meetings in list order or as soon as each report arrives.")
+    parser.add_argument("--store", nargs="?", const=sync_store.DEFAULT_PATH, metavar="PATH",
+                        help="Sync ended meetings into a local SQLite store and print from it.")
+    parser.add_argument("--offline", action="store_true",
+                        help="Print from the store without contacting the API (implies --store).")
+    parser.add_argument("--analytics", action="store_true",
+                        help="Print attendance totals, duration distribution and per-meeting rollups.")
+    args = parser.parse_args()
+
+    if args.store or args.offline:
+        print_from_store(args.store or sync_store.DEFAULT_PATH, args.workers, args.offline, args.analytics)
+        return
+
+    # Get a list of all meetings
+    meetings = get_meetings()
+    if meetings is None:
+        print("Unable to retrieve meetings")
+        return
+
+    if args.analytics:
+        try:
+            meetings = list(meetings)
+        except requests.RequestException:
+            print("Unable to retrieve meetings")
+            return
+        table, failed = build_participant_table(meetings, args.workers)
+        for meeting in failed:
+            print(f"Unable to retrieve participants for {meeting['topic']} ({meeting['id']})")
+        print_analytics(meetings, table)
+        return
+
+    # For each meeting, get a list of all participants and print their names.
+    # Later pages of the meeting list are fetched while iterating.
+    try:
+        for meeting, names in iter_participant_names(meetings, args.workers, args.order == "input"):
+            print_participants(meeting, names)
+    except requests.RequestException:
+        print("Unable to retrieve meetings")
+
+if __name__ == "__main__":
+    main()
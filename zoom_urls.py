@@ -0,0 +1,11 @@
+# zoom_urls.py
+# Usage: Base URLs for the Zoom REST API and OAuth endpoints
+# Override them (e.g. to point at benchmarks/mock_zoom_server.py) with
+# ZOOM_API_BASE_URL and ZOOM_OAUTH_BASE_URL before importing other modules.
+
+import os
+
+API_BASE_URL = os.getenv("ZOOM_API_BASE_URL", "https://api.zoom.us/v2").rstrip("/")
+OAUTH_BASE_URL = os.getenv("ZOOM_OAUTH_BASE_URL", "https://zoom.us/oauth").rstrip("/")
+OAUTH_TOKEN_URL = f"{OAUTH_BASE_URL}/token"
+OAUTH_AUTHORIZE_URL = f"{OAUTH_BASE_URL}/authorize"